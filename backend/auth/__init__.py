@@ -1,4 +1,12 @@
 from .jwt_handler import create_access_token, verify_token
-from .password import hash_password, verify_password
+from .password import (
+    hash_password, verify_password, hash_password_async, verify_password_async,
+    hashing_pool, HashingPoolBusy
+)
+from .principal_cache import Principal, principal_cache
 
-__all__ = ["create_access_token", "verify_token", "hash_password", "verify_password"]
\ No newline at end of file
+__all__ = [
+    "create_access_token", "verify_token", "hash_password", "verify_password",
+    "hash_password_async", "verify_password_async", "hashing_pool", "HashingPoolBusy",
+    "Principal", "principal_cache"
+]
\ No newline at end of file
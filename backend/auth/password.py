@@ -1,9 +1,83 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
 from passlib.context import CryptContext
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt releases the GIL, so a few threads use a few cores
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Hashing jobs allowed to wait or run at once; beyond that login answers 503
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "256"))
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class HashingPoolBusy(Exception):
+    """Raised when the hashing queue is full"""
+
+
+class HashingPool:
+    """
+    Dedicated executor for bcrypt work, so a burst of logins cannot occupy
+    the server threadpool that every other endpoint runs on.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def submit(self, fn: Callable[..., Any], *args) -> Future:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise HashingPoolBusy()
+            self._pending += 1
+        return self._executor.submit(self._run, fn, *args)
+
+    def _run(self, fn, *args):
+        with self._lock:
+            self._running += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._pending -= 1
+                self._completed += 1
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Run on the pool without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "running": self._running,
+                "queue_depth": self._pending - self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+
+hashing_pool = HashingPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await hashing_pool.run(verify_password, plain_password, hashed_password)
+
+async def hash_password_async(password: str) -> str:
+    return await hashing_pool.run(hash_password, password)
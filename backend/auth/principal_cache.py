@@ -0,0 +1,104 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from models.user import User, UserRole
+from services.cache_sync import on_invalidation, publish_invalidation
+
+# 0 disables the cache: every request then loads the user from the database
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "300"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Authenticated user as seen by the routers (same fields as User, no session)"""
+    id: int
+    username: str
+    role: UserRole
+    name: str
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(id=user.id, username=user.username, role=user.role, name=user.name)
+
+
+class PrincipalCache:
+    """Bounded TTL cache of principals keyed by user_id"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every eviction; a load that overlapped one is not stored
+        self.generation = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return principal
+
+    def put(self, principal: Principal, generation: int):
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[principal.id] = (principal, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def evict(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self.generation += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_SIZE)
+on_invalidation("principal", lambda value: principal_cache.evict(int(value)))
+
+
+# Evict on every ORM update/delete of a user (role change, rename, deletion).
+# Eviction happens at flush and again after commit, so a request that reloads
+# the user in between cannot keep the pre-commit row cached.
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _evict_changed_user(mapper, connection, target):
+    principal_cache.evict(target.id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("evicted_principals", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_committed_users(session):
+    for user_id in session.info.pop("evicted_principals", ()):
+        principal_cache.evict(user_id)
+        publish_invalidation("principal", str(user_id))
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_evicted_users(session):
+    session.info.pop("evicted_principals", None)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Сравнение пропускной способности (запросов/с) синхронного и асинхронного
+(ASYNC_DB=true) режимов. Для каждого режима запускается отдельный процесс
+uvicorn на одной и той же временной базе, затем клиенты в течение заданного
+времени запрашивают список вопросов теста и /student/my-results/.
+
+Использование: python -m benchmarks.async_vs_sync [клиентов] [секунд]
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import httpx
+from benchmarks.common import BACKEND_DIR, percentile, create_schema, seed_test, seed_students
+from sqlalchemy.orm import Session
+from database import engine, DATABASE_URL
+from auth.jwt_handler import create_access_token
+
+PORT = 8765
+
+
+def start_server(async_db: bool) -> subprocess.Popen:
+    env = dict(os.environ, DATABASE_URL=DATABASE_URL, ASYNC_DB="true" if async_db else "false")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(PORT), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_until_ready(base_url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("Сервер не запустился")
+
+
+async def client_loop(client, token, test_id, deadline, latencies):
+    headers = {"Authorization": f"Bearer {token}"}
+    urls = [f"/student/test/{test_id}/questions", "/student/my-results/"]
+    i = 0
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        response = await client.get(urls[i % len(urls)], headers=headers)
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - started) * 1000)
+        i += 1
+
+
+async def load(base_url, tokens, test_id, seconds):
+    latencies = []
+    limits = httpx.Limits(max_connections=len(tokens))
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        deadline = time.monotonic() + seconds
+        await asyncio.gather(*[client_loop(client, token, test_id, deadline, latencies) for token in tokens])
+    return latencies
+
+
+def measure(label, async_db, tokens, test_id, seconds):
+    server = start_server(async_db)
+    base_url = f"http://127.0.0.1:{PORT}"
+    try:
+        wait_until_ready(base_url)
+        asyncio.run(load(base_url, tokens, test_id, 1))  # прогрев кэшей
+        latencies = asyncio.run(load(base_url, tokens, test_id, seconds))
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"{label:<6} запросов/с: {len(latencies) / seconds:8.1f}   "
+          f"p50: {percentile(latencies, 50):7.1f} мс   p99: {percentile(latencies, 99):7.1f} мс")
+
+
+if __name__ == "__main__":
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    seconds = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    create_schema()
+    with Session(engine) as db:
+        test_id = seed_test(db, 150).id
+        student_ids = seed_students(db, clients)
+    tokens = [
+        create_access_token({"sub": f"bench_student_{i}", "role": "student", "user_id": user_id})
+        for i, user_id in enumerate(student_ids)
+    ]
+
+    print(f"Клиентов: {clients}, длительность: {seconds} с\n")
+    measure("sync", False, tokens, test_id, seconds)
+    measure("async", True, tokens, test_id, seconds)
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Проверка планов запросов (EXPLAIN QUERY PLAN, SQLite): горячие запросы по
+test_id / user_id / question_id должны использовать индексы, а не полный
+просмотр таблиц. Завершается с кодом 1, если какой-то запрос сканирует таблицу.
+
+Использование: python -m benchmarks.check_query_plans
+"""
+
+import sys
+from benchmarks.common import create_schema
+from database import engine
+from migrations import upgrade_indexes
+from tests.helpers import HOT_QUERIES, query_plan, is_full_scan
+
+
+if __name__ == "__main__":
+    create_schema()
+    upgrade_indexes()
+
+    failures = 0
+    with engine.connect() as conn:
+        for name, statement in HOT_QUERIES.items():
+            plan = query_plan(conn, statement)
+            ok = not any(is_full_scan(detail) for detail in plan)
+            failures += not ok
+            print(f"{'✅' if ok else '❌'} {name}")
+            for detail in plan:
+                print(f"     {detail}")
+
+    sys.exit(1 if failures else 0)
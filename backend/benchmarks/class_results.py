@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк обзора результатов класса: просмотр студентов по одному через
+прежний get_student_results (запрос на каждого студента и на каждый его
+результат) против /teacher/tests/{id}/results (services.class_results:
+страница keyset-запросом с LIMIT и сводная статистика агрегатами SQL, так что
+время страницы почти не зависит от размера класса).
+
+Использование: python -m benchmarks.class_results [студентов ...]
+"""
+
+import sys
+from benchmarks.common import QueryCounter, timer, create_schema, seed_test
+from benchmarks.export_results import seed_results
+from benchmarks.student_review import legacy_results
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from database import engine
+from models import TestResult
+from schemas.class_results import ClassResultsResponse
+from services.class_results import load_class_results
+from services.pagination import PageParams
+
+PAGE_SIZE = 50
+
+
+def student_by_student(db: Session, test_id: int):
+    user_ids = db.scalars(select(TestResult.user_id).where(TestResult.test_id == test_id)).all()
+    for user_id in user_ids:
+        legacy_results(db, user_id)
+
+
+def first_page(db: Session, test_id: int):
+    overview = load_class_results(db, test_id, PageParams(limit=PAGE_SIZE, sort="-score"))
+    ClassResultsResponse.model_validate(overview).model_dump()
+
+
+def overview_pages(db: Session, test_id: int, limit):
+    cursor, pages = None, 0
+    while True:
+        overview = load_class_results(db, test_id, PageParams(limit=limit, cursor=cursor, sort="-score"))
+        ClassResultsResponse.model_validate(overview).model_dump()
+        pages += 1
+        cursor = overview.next_cursor
+        if cursor is None:
+            return pages, overview.summary
+
+
+def measure(label, call):
+    with Session(engine) as db, QueryCounter() as counter, timer() as elapsed:
+        result = call(db)
+    print(f"  {label:<28} {elapsed['seconds']:7.3f} с   запросов: {counter.count:5}")
+    return result
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100, 1000]
+    create_schema()
+
+    for count in sizes:
+        with Session(engine) as db:
+            test_id = seed_test(db, 30, title=f"Class {count}").id
+            seed_results(db, test_id, count)
+
+        print(f"Студентов: {count}")
+        measure("по одному студенту (до)", lambda db: student_by_student(db, test_id))
+        measure("обзор, одна страница", lambda db: first_page(db, test_id))
+        pages, summary = measure(f"обзор, все страницы по {PAGE_SIZE}", lambda db: overview_pages(db, test_id, PAGE_SIZE))
+        measure("обзор без limit", lambda db: overview_pages(db, test_id, None))
+        print(f"  📊 страниц: {pages}, среднее {summary.mean:.1f}, медиана {summary.median:.1f}, "
+              f"p90 {summary.percentiles['p90']:.1f}")
@@ -0,0 +1,45 @@
+"""
+Общие утилиты для бенчмарков: временная база данных, счетчик SQL-запросов
+и генерация тестовых данных.
+
+Модуль нужно импортировать до database, чтобы бенчмарк не трогал рабочую базу.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+WORK_DIR = tempfile.mkdtemp(prefix="synapse_bench_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(WORK_DIR, 'benchmark.db')}")
+
+from database import engine, Base
+from tests.helpers import CATEGORY_NAMES, OPTIONS, QueryCounter, seed_test, seed_students  # noqa: F401
+
+
+@contextmanager
+def timer():
+    result = {"seconds": 0.0}
+    started = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result["seconds"] = time.perf_counter() - started
+
+
+def percentile(values, q):
+    """Перцентиль q (0-100) методом ближайшего ранга"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def create_schema():
+    Base.metadata.create_all(bind=engine)
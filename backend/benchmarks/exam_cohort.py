@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Моделирование группы студентов, проходящих экзамен через серверные сессии:
+каждый студент открывает попытку, в течение окна экзамена сохраняет ответы
+по одному (иногда меняет ответ, повторяет запрос или перезагружает страницу)
+и в конце завершает попытку. Проверяется, что после перезагрузки сервер
+отдает все сохраненные ответы и что итоговый балл совпадает с баллом по
+последним ответам студента. Печатаются задержки автосохранения и завершения.
+Сравнение с записью каждого ответа отдельной транзакцией: ANSWER_BUFFER=0.
+
+Использование: python -m benchmarks.exam_cohort [студентов] [окно экзамена, с]
+"""
+
+import asyncio
+import random
+import sys
+import time
+import httpx
+from benchmarks.common import percentile, create_schema, seed_test, seed_students, OPTIONS
+from sqlalchemy.orm import Session
+from database import engine
+from auth.jwt_handler import create_access_token
+from services.write_queue import write_queue
+from services.exam_sessions import answer_buffer
+
+NUM_QUESTIONS = 30
+CHANGE_PROBABILITY = 0.2
+RETRY_PROBABILITY = 0.1
+RELOAD_PROBABILITY = 0.2
+
+
+class Cohort:
+    def __init__(self, client, test_id, question_ids, key, window):
+        self.client = client
+        self.test_id = test_id
+        self.question_ids = question_ids
+        self.key = key
+        self.window = window
+        self.autosave_ms = []
+        self.finalize_ms = []
+        self.autosaves = 0
+        self.errors = []
+
+    async def timed(self, latencies, method, url, **kwargs):
+        started = time.perf_counter()
+        response = await self.client.request(method, url, **kwargs)
+        latencies.append((time.perf_counter() - started) * 1000)
+        return response
+
+    def check(self, response, expected=200):
+        if response.status_code != expected:
+            self.errors.append(f"{response.request.url.path}: {response.status_code} {response.text[:120]}")
+        return response
+
+    async def save(self, headers, attempt_id, question_id, answer, revision):
+        self.autosaves += 1
+        url = f"/student/attempts/{attempt_id}/answers/{question_id}"
+        body = {"answer": answer, "revision": revision}
+        self.check(await self.timed(self.autosave_ms, "PATCH", url, json=body, headers=headers), 204)
+
+    async def student(self, token):
+        headers = {"Authorization": f"Bearer {token}"}
+        attempt = self.check(await self.client.post(f"/student/tests/{self.test_id}/attempts", headers=headers)).json()
+        attempt_id = attempt["id"]
+        answers, revisions = {}, {}
+        pause = self.window / len(self.question_ids)
+
+        for question_id in random.sample(self.question_ids, len(self.question_ids)):
+            await asyncio.sleep(random.uniform(0, 2 * pause))
+            answer = random.choice(OPTIONS + ["Не знаю"])
+            revisions[question_id] = revisions.get(question_id, 0) + 1
+            answers[question_id] = answer
+            await self.save(headers, attempt_id, question_id, answer, revisions[question_id])
+            if random.random() < RETRY_PROBABILITY:
+                # A retried request must change nothing
+                await self.save(headers, attempt_id, question_id, answer, revisions[question_id])
+            if random.random() < CHANGE_PROBABILITY:
+                answer = random.choice(OPTIONS)
+                revisions[question_id] += 1
+                answers[question_id] = answer
+                await self.save(headers, attempt_id, question_id, answer, revisions[question_id])
+            if random.random() < RELOAD_PROBABILITY / len(self.question_ids):
+                restored = self.check(await self.client.post(
+                    f"/student/tests/{self.test_id}/attempts", headers=headers
+                )).json()
+                if {int(q): a for q, a in restored["answers"].items()} != answers:
+                    self.errors.append(f"attempt {attempt_id}: restored answers differ")
+
+        result = self.check(await self.timed(
+            self.finalize_ms, "POST", f"/student/attempts/{attempt_id}/finalize", headers=headers
+        )).json()
+        expected = sum(answers[q] == self.key[q] for q in self.question_ids) / len(self.question_ids) * 100
+        if abs(result.get("score", -1) - expected) > 1e-9:
+            self.errors.append(f"attempt {attempt_id}: score {result.get('score')} instead of {expected}")
+
+
+async def run(students: int, window: float) -> bool:
+    from main import app
+
+    create_schema()
+    with Session(engine) as db:
+        test = seed_test(db, NUM_QUESTIONS)
+        test_id = test.id
+        key = {q.id: q.correct_answer for q in test.questions}
+        student_ids = seed_students(db, students, prefix="cohort")
+    tokens = [
+        create_access_token({"sub": f"cohort_{i}", "role": "student", "user_id": user_id})
+        for i, user_id in enumerate(student_ids)
+    ]
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+        cohort = Cohort(client, test_id, list(key), key, window)
+        started = time.perf_counter()
+        await asyncio.gather(*[cohort.student(token) for token in tokens])
+        total = time.perf_counter() - started
+
+    print(f"Студентов: {students}, вопросов: {NUM_QUESTIONS}, окно экзамена: {window:.0f} с, время: {total:.1f} с")
+    print(f"📝 Автосохранений: {cohort.autosaves} ({cohort.autosaves / total:.0f}/с)   "
+          f"p50: {percentile(cohort.autosave_ms, 50):.1f} мс   p99: {percentile(cohort.autosave_ms, 99):.1f} мс")
+    print(f"✅ Завершений: {len(cohort.finalize_ms)}   "
+          f"p50: {percentile(cohort.finalize_ms, 50):.1f} мс   p99: {percentile(cohort.finalize_ms, 99):.1f} мс")
+    if write_queue is not None:
+        print(f"Статистика очереди: {write_queue.stats()}")
+    if answer_buffer is not None:
+        print(f"Буфер ответов: {answer_buffer.stats()}")
+    for error in cohort.errors[:5]:
+        print(f"  ❌ {error}")
+    return not cohort.errors
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    students = int(args[0]) if args else 100
+    window = float(args[1]) if len(args) > 1 else 10
+    sys.exit(0 if asyncio.run(run(students, window)) else 1)
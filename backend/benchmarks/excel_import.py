@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк загрузки вопросов из Excel: прежний путь (три apply-лямбды в
+excel_to_csv_converter.py, запись CSV и повторный разбор CSV загрузчиком)
+против векторной подготовки services.question_excel с передачей записей
+прямо в импорт. Шаблон из create_excel_template.py масштабируется до
+заданного числа строк; чтение листа (pd.read_excel) одинаково для обоих
+путей и замеряется отдельно.
+
+Использование: python -m benchmarks.excel_import [строк ...]
+"""
+
+import csv
+import os
+import sys
+import pandas as pd
+from benchmarks.common import timer, create_schema, seed_test, CATEGORY_NAMES, WORK_DIR
+from sqlalchemy.orm import Session
+from database import engine
+from services.question_excel import read_question_sheet, prepare_question_records
+from services.question_import import QuestionImporter, import_questions
+
+TEMPLATE_ROWS = 150
+
+
+def write_template(path: str, count: int):
+    """Шаблон на TEMPLATE_ROWS строк, повторенный до count строк"""
+    template = pd.DataFrame({
+        "category": [CATEGORY_NAMES[i % len(CATEGORY_NAMES)] for i in range(TEMPLATE_ROWS)],
+        "text": [f"Вопрос {i + 1}: какая органелла отвечает за синтез белка?" for i in range(TEMPLATE_ROWS)],
+        "options": ["Рибосома; Митохондрия; Ядро; Лизосома; Эндоплазматическая сеть"] * TEMPLATE_ROWS,
+        "correct_answer": ["Рибосома"] * TEMPLATE_ROWS,
+        "image_url": [""] * TEMPLATE_ROWS,
+        "table_data": [""] * TEMPLATE_ROWS,
+    })
+    repeats = -(-count // TEMPLATE_ROWS)
+    pd.concat([template] * repeats, ignore_index=True).head(count).to_excel(path, index=False)
+
+
+def legacy_convert(df: pd.DataFrame, csv_path: str):
+    """Преобразование из прежнего convert_excel_to_csv"""
+    df['options'] = df['options'].apply(lambda x: str(x).split(';') if pd.notna(x) else [])
+    df['options'] = df['options'].apply(lambda x: [opt.strip() for opt in x] if isinstance(x, list) else [])
+    df['options'] = df['options'].apply(lambda x: str(x).replace("'", '"') if x else '[]')
+    df['image_url'] = df.get('image_url', '').fillna('')
+    df['table_data'] = df.get('table_data', '').fillna('')
+    df.to_csv(csv_path, index=False, encoding='utf-8')
+
+
+def legacy_path(db: Session, excel_path: str, test_id: int, timings: dict) -> int:
+    csv_path = excel_path.replace(".xlsx", ".csv")
+    with timer() as elapsed:
+        df = pd.read_excel(excel_path)
+    timings["read"] = elapsed["seconds"]
+    with timer() as elapsed:
+        legacy_convert(df, csv_path)
+    timings["prepare"] = elapsed["seconds"]
+    with timer() as elapsed, open(csv_path, encoding="utf-8") as file:
+        added = import_questions(db, test_id, enumerate(csv.DictReader(file), 1)).rows_imported
+    timings["load"] = elapsed["seconds"]
+    return added
+
+
+def direct_path(db: Session, excel_path: str, test_id: int, timings: dict) -> int:
+    with timer() as elapsed:
+        df = read_question_sheet(excel_path)
+    timings["read"] = elapsed["seconds"]
+    with timer() as elapsed:
+        records, errors = prepare_question_records(df)
+    timings["prepare"] = elapsed["seconds"]
+    with timer() as elapsed:
+        importer = QuestionImporter(db, test_id)
+        for row_number, record in records:
+            importer.add_normalized(row_number, record)
+        added = importer.finish().rows_imported
+    timings["load"] = elapsed["seconds"]
+    return added
+
+
+def measure(label, upload, excel_path, count):
+    timings = {}
+    with Session(engine) as db:
+        test_id = seed_test(db, 0, title=f"Excel {label} {count}").id
+        added = upload(db, excel_path, test_id, timings)
+    print(f"  {label:<8} чтение: {timings['read']:6.2f} с   подготовка: {timings['prepare']:6.2f} с   "
+          f"загрузка в БД: {timings['load']:6.2f} с   без чтения: {timings['prepare'] + timings['load']:6.2f} с   "
+          f"загружено: {added}")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [TEMPLATE_ROWS, 10000, 100000]
+    create_schema()
+
+    for count in sizes:
+        excel_path = os.path.join(WORK_DIR, f"questions_{count}.xlsx")
+        write_template(excel_path, count)
+        print(f"Строк: {count}")
+        measure("прежний", legacy_path, excel_path, count)
+        measure("прямой", direct_path, excel_path, count)
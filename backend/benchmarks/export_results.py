@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк экспорта результатов: время, количество SQL-запросов и пиковая
+память (tracemalloc) при потоковой выгрузке CSV, Parquet, Arrow IPC и XLSX для
+разного числа результатов.
+Пиковая память не должна расти вместе с количеством результатов.
+Сначала проверяется, что результаты со старым форматом category_breakdown
+(число вместо {"percentage": ...}) выгружаются во всех форматах полностью и
+с теми же значениями, что и в CSV; при ошибке код возврата ненулевой.
+
+Использование: python -m benchmarks.export_results [результатов ...]
+"""
+
+import csv
+import io
+import random
+import sys
+import tracemalloc
+from benchmarks.common import QueryCounter, timer, create_schema, seed_test, seed_students, CATEGORY_NAMES
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from database import engine
+from models import TestResult
+from services.exports import EXPORTERS, export_category_names
+
+
+def seed_results(db: Session, test_id: int, count: int):
+    student_ids = seed_students(db, count, prefix=f"export_{test_id}")
+    rows = []
+    for user_id in student_ids:
+        breakdown = {}
+        for name in CATEGORY_NAMES:
+            correct = random.randint(0, 25)
+            breakdown[name] = {"correct": correct, "total": 25, "percentage": correct / 25 * 100}
+        rows.append({"user_id": user_id, "test_id": test_id, "score": random.random() * 100,
+                     "category_breakdown": breakdown})
+    db.execute(insert(TestResult), rows)
+    db.commit()
+
+
+# Форматы category_breakdown, встречающиеся в старых результатах
+LEGACY_BREAKDOWNS = [
+    lambda name, i: {"correct": i, "total": 4, "percentage": i * 25.0},
+    lambda name, i: i * 25,
+    lambda name, i: float(i * 25),
+    lambda name, i: str(i * 25),
+    lambda name, i: None,
+]
+
+
+def read_export(export_format, data: bytes) -> list:
+    """Строки выгрузки (без заголовка) как списки значений"""
+    if export_format == "csv":
+        return list(csv.reader(io.StringIO(data.decode("utf-8"))))[1:]
+    if export_format == "xlsx":
+        from openpyxl import load_workbook
+        header, *rows = load_workbook(io.BytesIO(data), read_only=True).active.iter_rows(values_only=True)
+        # Пустые ячейки в конце строки не сохраняются
+        return [list(row) + [None] * (len(header) - len(row)) for row in rows]
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    table = pq.read_table(io.BytesIO(data)) if export_format == "parquet" else pa.ipc.open_stream(data).read_all()
+    return [list(row.values()) for row in table.to_pylist()]
+
+
+def check_legacy_breakdowns() -> bool:
+    with Session(engine) as db:
+        test_id = seed_test(db, 30, title="Export legacy").id
+        student_ids = seed_students(db, 20, prefix="export_legacy")
+        db.execute(insert(TestResult), [
+            {"user_id": user_id, "test_id": test_id, "score": 50.0,
+             "category_breakdown": {name: LEGACY_BREAKDOWNS[(i + j) % len(LEGACY_BREAKDOWNS)](name, j % 5)
+                                    for j, name in enumerate(CATEGORY_NAMES)}}
+            for i, user_id in enumerate(student_ids)
+        ])
+        db.commit()
+        category_names = export_category_names(db, test_id)
+
+    # Маленькие страницы: часть страниц в новом формате, часть со старыми значениями
+    exports = {
+        export_format.value: read_export(export_format.value, b"".join(exporter(test_id, category_names, page_size=3)))
+        for export_format, exporter in EXPORTERS.items()
+    }
+    expected = [[float(value) if value else None for value in row[3:]] for row in exports["csv"]]
+    ok = True
+    for export_format, rows in exports.items():
+        categories = [[float(value) if value not in (None, "") else None for value in row[3:]] for row in rows]
+        if categories != expected:
+            print(f"❌ {export_format}: {len(rows)} из {len(student_ids)} строк, значения категорий не совпадают с CSV")
+            ok = False
+    if ok:
+        print(f"✅ Старый формат category_breakdown: {len(student_ids)} строк во всех форматах совпадают с CSV")
+    return ok
+
+
+def measure(label, export):
+    tracemalloc.start()
+    with QueryCounter() as counter, timer() as elapsed:
+        size = sum(len(chunk) for chunk in export())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<8} {size / 1024:10.0f} КБ   {elapsed['seconds']:6.2f} с   "
+          f"запросов: {counter.count:4}   пик памяти: {peak / 1024 / 1024:6.1f} МБ")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 50000]
+    create_schema()
+    if not check_legacy_breakdowns():
+        sys.exit(1)
+
+    for count in sizes:
+        with Session(engine) as db:
+            test_id = seed_test(db, 30, title=f"Export {count}").id
+            seed_results(db, test_id, count)
+            category_names = export_category_names(db, test_id)
+
+        print(f"Результатов: {count}")
+        for export_format, exporter in EXPORTERS.items():
+            measure(export_format.value, lambda: exporter(test_id, category_names))
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк анализа заданий: построчный расчет p-значений, точечно-бисериальной
+корреляции и KR-20 по строкам StudentAnswer на Python против матричного
+расчета services.item_analysis (NumPy), плюс время повторного запроса из кэша.
+Ответы генерируются по простой модели способности студентов, поэтому
+метрики имеют осмысленные значения.
+
+Использование: python -m benchmarks.item_analysis [студентов ...]
+"""
+
+import math
+import random
+import sys
+from collections import defaultdict
+from benchmarks.common import QueryCounter, timer, create_schema, seed_test, seed_students
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from database import engine
+from models import Question, StudentAnswer, TestResult
+from services.item_analysis import get_item_analysis, load_response_matrix, analyze_responses
+
+NUM_QUESTIONS = 150
+
+
+def seed_answers(db: Session, test, count: int):
+    questions = [(q.id, q.options, q.correct_answer) for q in test.questions]
+    difficulty = [random.gauss(0, 1) for _ in questions]
+    student_ids = seed_students(db, count, prefix=f"items_{test.id}")
+    answers, results = [], []
+    for user_id in student_ids:
+        ability = random.gauss(0, 1)
+        correct = 0
+        for (question_id, options, correct_answer), b in zip(questions, difficulty):
+            if random.random() < 1 / (1 + math.exp(-(ability - b) * 1.7)):
+                answer = correct_answer
+                correct += 1
+            else:
+                answer = random.choice([option for option in options if option != correct_answer] + ["Не знаю"])
+            answers.append({"user_id": user_id, "question_id": question_id, "answer": answer,
+                            "is_correct": answer == correct_answer})
+        results.append({"user_id": user_id, "test_id": test.id, "score": correct / len(questions) * 100,
+                        "category_breakdown": {}})
+    db.execute(insert(StudentAnswer), answers)
+    db.execute(insert(TestResult), results)
+    db.commit()
+
+
+def row_by_row(db: Session, test_id: int):
+    """Прежний подход: обход ответов по одному и расчет в словарях"""
+    key = dict(db.execute(select(Question.id, Question.correct_answer).where(Question.test_id == test_id)).all())
+    scored = defaultdict(dict)
+    for answer in db.query(StudentAnswer).join(Question).filter(Question.test_id == test_id):
+        scored[answer.user_id][answer.question_id] = 1 if answer.answer == key[answer.question_id] else 0
+    totals = {user_id: sum(items.values()) for user_id, items in scored.items()}
+    students = len(scored)
+    p_values, discrimination = {}, {}
+    for question_id in key:
+        item = [scored[user_id].get(question_id, 0) for user_id in scored]
+        rest = [totals[user_id] - value for user_id, value in zip(scored, item)]
+        p = sum(item) / students
+        mean_rest = sum(rest) / students
+        cov = sum((x - p) * (r - mean_rest) for x, r in zip(item, rest)) / students
+        sd_x = math.sqrt(sum((x - p) ** 2 for x in item) / students)
+        sd_r = math.sqrt(sum((r - mean_rest) ** 2 for r in rest) / students)
+        p_values[question_id] = p
+        discrimination[question_id] = cov / (sd_x * sd_r) if sd_x and sd_r else None
+    mean_total = sum(totals.values()) / students
+    variance = sum((t - mean_total) ** 2 for t in totals.values()) / students
+    k = len(key)
+    kr20 = k / (k - 1) * (1 - sum(p * (1 - p) for p in p_values.values()) / variance)
+    return p_values, discrimination, kr20
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 5000]
+    create_schema()
+
+    for count in sizes:
+        with Session(engine) as db:
+            test = seed_test(db, NUM_QUESTIONS, title=f"Items {count}")
+            seed_answers(db, test, count)
+            test_id = test.id
+
+        print(f"Студентов: {count}, вопросов: {NUM_QUESTIONS}, ответов: {count * NUM_QUESTIONS}")
+        with Session(engine) as db:
+            with QueryCounter() as counter, timer() as elapsed:
+                p_values, discrimination, kr20 = row_by_row(db, test_id)
+            print(f"  построчно   {elapsed['seconds']:7.2f} с   запросов: {counter.count:3}   KR-20: {kr20:.4f}")
+
+            with QueryCounter() as counter, timer() as load:
+                matrix = load_response_matrix(db, test_id)
+            with timer() as compute:
+                analysis = analyze_responses(test_id, matrix)
+            print(f"  NumPy       {load['seconds'] + compute['seconds']:7.2f} с   запросов: {counter.count:3}   "
+                  f"KR-20: {analysis.kr20:.4f}   (загрузка {load['seconds']:.2f} с, расчет {compute['seconds']:.3f} с)")
+            assert all(abs(item.p_value - p_values[item.question_id]) < 1e-9 for item in analysis.items)
+
+            get_item_analysis(db, test_id)
+            with QueryCounter() as counter, timer() as cached:
+                get_item_analysis(db, test_id)
+            print(f"  из кэша     {cached['seconds']:7.3f} с   запросов: {counter.count:3}")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Нагрузочный бенчмарк входа: N студентов одновременно вызывают /auth/login.
+Печатает p50/p99 времени входа и p99 времени ответа /health, который
+опрашивается во время нагрузки (показывает, не блокирует ли bcrypt остальные
+эндпоинты).
+
+По умолчанию приложение запускается в процессе; с --url нагрузка идет на
+работающий сервер (студенты bench_login_<i> с паролем "password" должны
+существовать, их создает запуск без --url на той же базе).
+
+Использование: python -m benchmarks.login_load [пользователей] [--url http://localhost:8000]
+"""
+
+import argparse
+import asyncio
+import time
+import httpx
+from benchmarks.common import percentile, create_schema, seed_students
+from sqlalchemy.orm import Session
+from database import engine
+from auth.password import hash_password, hashing_pool
+
+PASSWORD = "password"
+PREFIX = "bench_login"
+
+
+async def timed(client, method, url, **kwargs):
+    started = time.perf_counter()
+    response = await client.request(method, url, **kwargs)
+    return response.status_code, (time.perf_counter() - started) * 1000
+
+
+async def probe_health(client, stop: asyncio.Event, latencies):
+    while not stop.is_set():
+        _, elapsed = await timed(client, "GET", "/health")
+        latencies.append(elapsed)
+        await asyncio.sleep(0.01)
+
+
+async def run(users: int, base_url: str = None):
+    if base_url:
+        client = httpx.AsyncClient(base_url=base_url, timeout=120)
+    else:
+        from main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120)
+
+    async with client:
+        stop = asyncio.Event()
+        health_latencies = []
+        prober = asyncio.create_task(probe_health(client, stop, health_latencies))
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*[
+            timed(client, "POST", "/auth/login", json={"username": f"{PREFIX}_{i}", "password": PASSWORD})
+            for i in range(users)
+        ])
+        total = time.perf_counter() - started
+
+        stop.set()
+        await prober
+
+    latencies = [elapsed for status, elapsed in results if status == 200]
+    statuses = {}
+    for status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+
+    print(f"Пользователей: {users}, общее время: {total:.2f} с, ответы: {statuses}")
+    print(f"login   p50: {percentile(latencies, 50):8.1f} мс   p99: {percentile(latencies, 99):8.1f} мс")
+    print(f"health  p50: {percentile(health_latencies, 50):8.1f} мс   p99: {percentile(health_latencies, 99):8.1f} мс")
+    if not base_url:
+        print(f"Пул хеширования: {hashing_pool.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Нагрузочный бенчмарк /auth/login")
+    parser.add_argument("users", type=int, nargs="?", default=100)
+    parser.add_argument("--url", help="адрес работающего сервера")
+    args = parser.parse_args()
+
+    if not args.url:
+        create_schema()
+        with Session(engine) as db:
+            seed_students(db, args.users, prefix=PREFIX, password_hash=hash_password(PASSWORD))
+
+    asyncio.run(run(args.users, args.url))
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Проверка кэшей в многопроцессном режиме: запускается uvicorn с несколькими
+процессами (WEB_CONCURRENCY) на временной базе, студенты прогревают кэш
+вопросов теста во всех процессах, затем учитель меняет вопрос через
+PUT /teacher/questions/{id}. Измеряется, сколько времени после ответа на
+изменение какой-либо процесс еще отдает старую версию вопросов (по ETag).
+Режимы: с синхронизацией кэшей (CACHE_SYNC) и без нее для сравнения.
+
+Использование: python -m benchmarks.multi_worker [процессов] [изменений]
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import httpx
+from benchmarks.common import BACKEND_DIR, percentile, create_schema, seed_test, seed_students
+from benchmarks.async_vs_sync import wait_until_ready
+from sqlalchemy.orm import Session
+from database import engine, DATABASE_URL
+from models.user import User, UserRole
+from auth.jwt_handler import create_access_token
+
+PORT = 8766
+CACHE_SYNC_INTERVAL_MS = 500
+PROBES = 16
+# Сколько ждать, пока все процессы начнут отдавать новую версию
+STALE_TIMEOUT_S = 5
+
+
+def start_server(workers: int, cache_sync: bool) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        DATABASE_URL=DATABASE_URL,
+        WEB_CONCURRENCY=str(workers),
+        CACHE_SYNC="true" if cache_sync else "false",
+        CACHE_SYNC_INTERVAL_MS=str(CACHE_SYNC_INTERVAL_MS),
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(PORT), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+async def probe(url, headers):
+    """Параллельные запросы по новым соединениям, чтобы попасть в разные процессы"""
+    limits = httpx.Limits(max_keepalive_connections=0)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        responses = await asyncio.gather(*[client.get(url, headers=headers) for _ in range(PROBES)])
+    for response in responses:
+        response.raise_for_status()
+    return {response.headers["ETag"] for response in responses}
+
+
+async def staleness(base_url, test_id, question_id, student, teacher, round_no) -> float:
+    """Время от ответа на изменение вопроса до последнего ответа со старой версией"""
+    url = f"{base_url}/student/test/{test_id}/questions"
+    for _ in range(5):
+        etags = await probe(url, student)  # прогрев кэшей всех процессов
+    if len(etags) != 1:
+        # Предыдущее изменение так и не дошло до всех процессов
+        return float("inf")
+    old_etag = etags.pop()
+
+    async with httpx.AsyncClient(timeout=30) as client:
+        response = await client.put(
+            f"{base_url}/teacher/questions/{question_id}",
+            json={"text": f"Измененный вопрос, версия {round_no}"}, headers=teacher,
+        )
+        response.raise_for_status()
+    changed = last_stale = time.perf_counter()
+    while time.perf_counter() - changed < STALE_TIMEOUT_S:
+        etags = await probe(url, student)
+        now = time.perf_counter()
+        if old_etag in etags:
+            last_stale = now
+        elif now - last_stale > 3 * CACHE_SYNC_INTERVAL_MS / 1000:
+            return last_stale - changed
+        await asyncio.sleep(0.02)
+    return float("inf")
+
+
+def measure(label, workers, cache_sync, tokens, test_id, question_id, rounds) -> list:
+    server = start_server(workers, cache_sync)
+    base_url = f"http://127.0.0.1:{PORT}"
+    try:
+        wait_until_ready(base_url)
+        results = [
+            asyncio.run(staleness(base_url, test_id, question_id, tokens[0], tokens[1], round_no))
+            for round_no in range(rounds)
+        ]
+    finally:
+        server.terminate()
+        server.wait()
+
+    finite = [value for value in results if value != float("inf")]
+    stale = len(results) - len(finite)
+    summary = f"p50: {percentile(finite, 50) * 1000:7.0f} мс   max: {max(finite) * 1000:7.0f} мс" if finite else ""
+    print(f"{label:<16} {summary}   устаревших дольше {STALE_TIMEOUT_S} с: {stale} из {len(results)}")
+    return results
+
+
+if __name__ == "__main__":
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    create_schema()
+    with Session(engine) as db:
+        test = seed_test(db, 20)
+        test_id, question_id = test.id, test.questions[0].id
+        student_id = seed_students(db, 1)[0]
+        teacher = db.query(User).filter(User.role == UserRole.TEACHER).first()
+        tokens = [
+            {"Authorization": f"Bearer {create_access_token({'sub': 'bench_student_0', 'role': 'student', 'user_id': student_id})}"},
+            {"Authorization": f"Bearer {create_access_token({'sub': teacher.username, 'role': 'teacher', 'user_id': teacher.id})}"},
+        ]
+
+    print(f"Процессов: {workers}, изменений вопроса: {rounds}, интервал опроса: {CACHE_SYNC_INTERVAL_MS} мс\n")
+    synced = measure("cache sync", workers, True, tokens, test_id, question_id, rounds)
+    measure("без cache sync", workers, False, tokens, test_id, question_id, rounds)
+    # Задержка должна укладываться в интервал опроса с запасом на сам опрос и запросы
+    sys.exit(0 if max(synced) < 2 * CACHE_SYNC_INTERVAL_MS / 1000 + 0.5 else 1)
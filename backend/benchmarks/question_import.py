@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк массовой загрузки вопросов: построчная загрузка (как в прежнем
+bulk_upload_with_test_selection.py) против пакетного импорта
+services.question_import на сгенерированных CSV файлах.
+Построчная загрузка запускается только для файлов до LEGACY_MAX_ROWS строк.
+
+Использование: python -m benchmarks.question_import [строк ...]
+"""
+
+import csv
+import json
+import os
+import sys
+from benchmarks.common import QueryCounter, timer, create_schema, seed_test, CATEGORY_NAMES, OPTIONS, WORK_DIR
+from sqlalchemy.orm import Session
+from database import engine
+from models import Category, Question
+from services.question_import import import_questions
+
+LEGACY_MAX_ROWS = 10000
+
+
+def write_csv(path: str, count: int):
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["category", "text", "options", "correct_answer", "image_url", "table_data"])
+        for i in range(count):
+            # Каждая пятая строка - новая категория, часть строк с ошибками
+            category = CATEGORY_NAMES[i % len(CATEGORY_NAMES)] if i % 5 else f"Категория {i % 200}"
+            correct_answer = OPTIONS[i % len(OPTIONS)] if i % 1000 else ""
+            table_data = json.dumps({"rows": [["x", "y"], ["1", "2"]]}) if i % 10 == 0 else ""
+            writer.writerow([category, f"Вопрос {i + 1}: " + "текст вопроса " * 10,
+                             str(list(OPTIONS)), correct_answer, "", table_data])
+
+
+def legacy_upload(db: Session, path: str, test_id: int) -> int:
+    """Прежний алгоритм: запрос категории и отдельный INSERT на каждую строку"""
+    added = 0
+    with open(path, encoding="utf-8") as file:
+        for row in csv.DictReader(file):
+            category = db.query(Category).filter(Category.name == row["category"]).first()
+            if not category:
+                category = Category(name=row["category"])
+                db.add(category)
+                db.commit()
+                db.refresh(category)
+            db.add(Question(
+                test_id=test_id,
+                category_id=category.id,
+                text=row["text"],
+                options=json.loads(row["options"].replace("'", '"')),
+                correct_answer=row["correct_answer"],
+                image_url=row["image_url"] or None,
+                table_data=json.loads(row["table_data"]) if row["table_data"] else None
+            ))
+            added += 1
+    db.commit()
+    return added
+
+
+def engine_upload(db: Session, path: str, test_id: int) -> int:
+    with open(path, encoding="utf-8") as file:
+        report = import_questions(db, test_id, enumerate(csv.DictReader(file), 1))
+    return report.rows_imported
+
+
+def measure(label, upload, path, count):
+    with Session(engine) as db:
+        test_id = seed_test(db, 0, title=f"Import {label} {count}").id
+        with QueryCounter() as counter, timer() as elapsed:
+            added = upload(db, path, test_id)
+    print(f"  {label:<10} {elapsed['seconds']:7.2f} с   {added / elapsed['seconds']:9.0f} строк/с   "
+          f"запросов: {counter.count:6}   загружено: {added}")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    create_schema()
+
+    for count in sizes:
+        path = os.path.join(WORK_DIR, f"questions_{count}.csv")
+        write_csv(path, count)
+        print(f"Строк: {count}")
+        if count <= LEGACY_MAX_ROWS:
+            measure("построчно", legacy_upload, path, count)
+        measure("пакетно", engine_upload, path, count)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк потоковой загрузки вопросов: пиковая память (tracemalloc) и время
+загрузки JSON через json.load против потокового чтения CSV и JSON.
+Пиковая память потоковой загрузки не должна расти вместе с размером файла.
+
+Использование: python -m benchmarks.question_stream [строк ...]
+"""
+
+import json
+import os
+import sys
+import tracemalloc
+from benchmarks.common import timer, create_schema, seed_test, CATEGORY_NAMES, OPTIONS, WORK_DIR
+from benchmarks.question_import import write_csv
+from sqlalchemy.orm import Session
+from database import engine
+from services.question_import import import_questions
+from services.question_stream import stream_import_questions
+
+
+def write_json(path: str, count: int):
+    """Пишет файл в формате bulk_upload_json.py, не собирая его в памяти"""
+    with open(path, "w", encoding="utf-8") as file:
+        file.write('{"test_title": "Benchmark", "questions": [\n')
+        for i in range(count):
+            question = {
+                "category": CATEGORY_NAMES[i % len(CATEGORY_NAMES)],
+                "text": f"Вопрос {i + 1}: " + "текст вопроса " * 10,
+                "options": list(OPTIONS),
+                "correct_answer": OPTIONS[i % len(OPTIONS)],
+                "image_url": "",
+                "table_data": {"rows": [["x", "y"], ["1", "2"]]} if i % 10 == 0 else None
+            }
+            file.write(("," if i else "") + json.dumps(question, ensure_ascii=False) + "\n")
+        file.write("]}\n")
+
+
+def json_load_upload(db: Session, path: str, test_id: int) -> int:
+    with open(path, encoding="utf-8") as file:
+        data = json.load(file)
+    return import_questions(db, test_id, enumerate(data["questions"], 1)).rows_imported
+
+
+def stream_upload(db: Session, path: str, test_id: int) -> int:
+    return stream_import_questions(db, test_id, path).rows_imported
+
+
+def measure(label, upload, path, count):
+    with Session(engine) as db:
+        test_id = seed_test(db, 0, title=f"Stream {label} {count}").id
+        tracemalloc.start()
+        with timer() as elapsed:
+            added = upload(db, path, test_id)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    print(f"  {label:<12} {os.path.getsize(path) / 1024 / 1024:7.1f} МБ   {elapsed['seconds']:7.2f} с   "
+          f"пик памяти: {peak / 1024 / 1024:7.1f} МБ   загружено: {added}")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    create_schema()
+
+    for count in sizes:
+        json_path = os.path.join(WORK_DIR, f"questions_{count}.json")
+        csv_path = os.path.join(WORK_DIR, f"questions_{count}.csv")
+        write_json(json_path, count)
+        write_csv(csv_path, count)
+        print(f"Строк: {count}")
+        measure("json.load", json_load_upload, json_path, count)
+        measure("поток JSON", stream_upload, json_path, count)
+        measure("поток CSV", stream_upload, csv_path, count)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Стресс-тест SQLite: несколько сотен студентов одновременно отправляют тест.
+Проверяет, что нет ошибок "database is locked", и печатает задержки и
+статистику очереди записи (сколько транзакций потребовалось).
+
+Использование: python -m benchmarks.sqlite_stress [отправок] [--no-queue]
+  --no-queue  отключить очередь записи (SQLITE_WRITE_QUEUE=false) для сравнения
+"""
+
+import os
+import sys
+
+if "--no-queue" in sys.argv:
+    os.environ["SQLITE_WRITE_QUEUE"] = "false"
+
+import asyncio
+import time
+import httpx
+from benchmarks.common import percentile, create_schema, seed_test, seed_students
+from sqlalchemy.orm import Session
+from database import engine
+from models import TestResult
+from auth.jwt_handler import create_access_token
+from services.write_queue import write_queue
+
+
+async def submit(client, token, test_id, question_ids, latencies, errors):
+    body = {"test_id": test_id, "answers": [{"question_id": qid, "answer": "A"} for qid in question_ids]}
+    started = time.perf_counter()
+    response = await client.post("/student/submit-test/", json=body, headers={"Authorization": f"Bearer {token}"})
+    latencies.append((time.perf_counter() - started) * 1000)
+    if response.status_code != 200:
+        errors.append(response.text[:200])
+
+
+async def run(submissions: int):
+    from main import app
+
+    create_schema()
+    with Session(engine) as db:
+        test = seed_test(db, 150)
+        test_id = test.id
+        question_ids = [q.id for q in test.questions]
+        student_ids = seed_students(db, submissions)
+    tokens = [
+        create_access_token({"sub": f"bench_student_{i}", "role": "student", "user_id": user_id})
+        for i, user_id in enumerate(student_ids)
+    ]
+
+    latencies, errors = [], []
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*[submit(client, token, test_id, question_ids, latencies, errors) for token in tokens])
+        total = time.perf_counter() - started
+
+    with Session(engine) as db:
+        saved = db.query(TestResult).filter(TestResult.test_id == test_id).count()
+
+    print(f"Очередь записи: {'включена' if write_queue is not None else 'выключена'}")
+    print(f"Отправок: {submissions}, сохранено: {saved}, ошибок: {len(errors)}, время: {total:.2f} с")
+    print(f"p50: {percentile(latencies, 50):.1f} мс   p99: {percentile(latencies, 99):.1f} мс")
+    if write_queue is not None:
+        print(f"Статистика очереди: {write_queue.stats()}")
+    for error in errors[:5]:
+        print(f"  ошибка: {error}")
+    return not errors
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    submissions = int(args[0]) if args else 300
+    ok = asyncio.run(run(submissions))
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Время запуска сервера: от начала импорта main до завершения обработчиков
+startup (готовность принимать запросы). Каждый запуск - отдельный процесс на
+временной базе с заданным числом студентов: первый запуск выполняет шаги
+начальной настройки, последующие (перезапуски) только проверяют
+schema_migrations. Отдельно сравниваются SQL-запросы и время проверки при
+перезапуске с прежней последовательностью, выполнявшейся при каждом старте
+(create_all, проверка индексов и аналитики, исправление ролей, поиск учителя
+и категорий).
+
+Использование: python -m benchmarks.startup_time [студентов] [перезапусков]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+from benchmarks.common import BACKEND_DIR, QueryCounter, timer, create_schema, seed_students
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from database import engine, Base, DATABASE_URL
+from models import Category, User
+from models.user import UserRole
+from migrations import bootstrap, fix_role_values, upgrade_analytics, upgrade_indexes
+
+STARTUP_SCRIPT = """
+import time
+started = time.perf_counter()
+import asyncio, json, os
+import main
+imported = time.perf_counter()
+asyncio.run(main.app.router.startup())
+ready = time.perf_counter()
+print(json.dumps({"import": imported - started, "startup": ready - imported}))
+asyncio.run(main.app.router.shutdown())
+os._exit(0)
+"""
+
+
+def start_once() -> dict:
+    env = dict(os.environ, DATABASE_URL=DATABASE_URL)
+    output = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def legacy_startup():
+    """Проверки, которые раньше выполнялись при каждом запуске"""
+    Base.metadata.create_all(bind=engine)
+    upgrade_indexes()
+    upgrade_analytics()
+    fix_role_values()
+    with Session(engine) as db:
+        db.scalar(select(User.id).where(User.role == UserRole.TEACHER).limit(1))
+        db.scalar(select(Category.id).limit(1))
+
+
+def measure_in_process(label, func):
+    with QueryCounter() as counter, timer() as elapsed:
+        func()
+    print(f"{label:<28} SQL-запросов: {counter.count:4d}   время: {elapsed['seconds'] * 1000:8.1f} мс")
+
+
+if __name__ == "__main__":
+    students = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    restarts = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    create_schema()
+    with Session(engine) as db:
+        seed_students(db, students)
+
+    print(f"Студентов: {students}, перезапусков: {restarts}\n")
+    first = start_once()
+    print(f"Первый запуск    импорт: {first['import'] * 1000:7.0f} мс   startup: {first['startup'] * 1000:7.1f} мс")
+    runs = [start_once() for _ in range(restarts)]
+    imports = statistics.median(run["import"] for run in runs)
+    startups = statistics.median(run["startup"] for run in runs)
+    print(f"Перезапуск (мед) импорт: {imports * 1000:7.0f} мс   startup: {startups * 1000:7.1f} мс\n")
+
+    measure_in_process("bootstrap (перезапуск)", bootstrap)
+    measure_in_process("прежняя проверка при старте", legacy_startup)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Проверка количества SQL-запросов экранов просмотра студента учителем
+(/teacher/student/{id}/results и /teacher/student/{id}/test/{id}): до
+(отдельный запрос теста на каждый результат) и после (services.student_review).
+Новые версии вместе с сериализацией в схемы ответа должны выполнять одно и то
+же число запросов при любом количестве пройденных тестов; иначе скрипт
+завершается с кодом 1.
+
+Использование: python -m benchmarks.student_review [тестов ...]
+"""
+
+import sys
+from benchmarks.common import QueryCounter, timer, create_schema
+from sqlalchemy.orm import Session
+from database import engine
+from models import Question, StudentAnswer, Test, TestResult, User
+from models.user import UserRole
+from schemas.student_review import StudentResultsResponse, StudentTestReviewResponse
+from services.student_review import load_student_results, load_student_test_review
+from tests.helpers import EXPECTED_REVIEW_QUERIES, seed_history
+
+
+def legacy_results(db: Session, user_id: int):
+    """Прежняя реализация get_student_results (без HTTP-слоя)"""
+    student = db.query(User).filter(User.id == user_id, User.role == UserRole.STUDENT).first()
+    results = db.query(TestResult).filter(TestResult.user_id == user_id).all()
+    results_with_tests = []
+    for result in results:
+        test = db.query(Test).filter(Test.id == result.test_id).first()
+        results_with_tests.append({"id": result.id, "test_title": test.title, "score": result.score})
+    return {"student": student, "results": results_with_tests}
+
+
+def legacy_test_review(db: Session, user_id: int, test_id: int):
+    """Прежняя реализация get_student_test_answers (без HTTP-слоя)"""
+    student = db.query(User).filter(User.id == user_id, User.role == UserRole.STUDENT).first()
+    test = db.query(Test).filter(Test.id == test_id).first()
+    questions = db.query(Question).filter(Question.test_id == test_id).all()
+    answers = db.query(StudentAnswer).filter(
+        StudentAnswer.user_id == user_id,
+        StudentAnswer.question_id.in_([q.id for q in questions])
+    ).all()
+    result = db.query(TestResult).filter(TestResult.user_id == user_id, TestResult.test_id == test_id).first()
+    return {"student": student, "test": test, "questions": questions, "answers": answers, "result": result}
+
+
+def measure(label, call):
+    with Session(engine) as db, QueryCounter() as counter, timer() as elapsed:
+        call(db)
+    print(f"  {label:<26} запросов: {counter.count:4}   {elapsed['seconds'] * 1000:7.1f} мс")
+    return counter.count
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1, 10, 50]
+    create_schema()
+
+    failures = 0
+    for count in sizes:
+        with Session(engine) as db:
+            user_id, test_ids = seed_history(db, count)
+
+        print(f"Пройдено тестов: {count}")
+        measure("результаты (до)", lambda db: legacy_results(db, user_id))
+        queries = {
+            "results": measure("результаты (после)", lambda db: StudentResultsResponse.model_validate(
+                load_student_results(db, user_id)
+            ).model_dump()),
+        }
+        measure("ответы на тест (до)", lambda db: legacy_test_review(db, user_id, test_ids[-1]))
+        queries["test review"] = measure("ответы на тест (после)", lambda db: StudentTestReviewResponse.model_validate(
+            load_student_test_review(db, user_id, test_ids[-1])
+        ).model_dump())
+
+        for name, expected in EXPECTED_REVIEW_QUERIES.items():
+            if queries[name] != expected:
+                failures += 1
+                print(f"  ❌ {name}: {queries[name]} запросов вместо {expected}")
+
+    if failures:
+        sys.exit(1)
+    print("✅ Число запросов не зависит от количества тестов")
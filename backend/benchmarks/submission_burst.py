@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Всплеск отправок теста к дедлайну: студенты отправляют ответы в течение
+короткого окна, как в последние секунды экзамена. В режиме очереди
+(SUBMISSION_QUEUE) сервер только проверяет отправку, записывает ее в журнал
+и сразу возвращает квитанцию, а фоновые обработчики оценивают ответы.
+Печатаются задержки приема, время до появления всех результатов и статистика
+очереди; проверяется, что /student/results/{test_id} отдает результат после
+оценки и что все баллы верны.
+
+Использование: python -m benchmarks.submission_burst [отправок] [окно, с] [--sync]
+  --sync  оценивать отправку в запросе, как без очереди, для сравнения
+"""
+
+import os
+import sys
+
+os.environ["SUBMISSION_QUEUE"] = "false" if "--sync" in sys.argv else "true"
+
+import asyncio
+import random
+import time
+import httpx
+from benchmarks.common import WORK_DIR, percentile, create_schema, seed_test, seed_students
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from database import engine
+from models import TestResult
+from auth.jwt_handler import create_access_token
+
+os.environ.setdefault("SUBMISSION_JOURNAL", os.path.join(WORK_DIR, "submission_journal.db"))
+
+from services.submission_queue import submission_queue
+from services.write_queue import write_queue
+
+NUM_QUESTIONS = 30
+DRAIN_TIMEOUT_S = 120
+
+
+async def submit(client, token, body, delay, latencies, statuses, errors):
+    await asyncio.sleep(delay)
+    started = time.perf_counter()
+    response = await client.post("/student/submit-test/", json=body, headers={"Authorization": f"Bearer {token}"})
+    latencies.append((time.perf_counter() - started) * 1000)
+    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    if response.status_code not in (200, 202):
+        errors.append(f"{response.status_code} {response.text[:120]}")
+
+
+async def wait_until_graded(client, token, test_id) -> float:
+    """Ждет, пока очередь опустеет; возвращает время ожидания"""
+    started = time.perf_counter()
+    headers = {"Authorization": f"Bearer {token}"}
+    while time.perf_counter() - started < DRAIN_TIMEOUT_S:
+        if submission_queue.stats()["pending"] == 0:
+            break
+        await asyncio.sleep(0.05)
+    response = await client.get(f"/student/results/{test_id}", headers=headers)
+    if response.status_code != 200:
+        raise RuntimeError(f"результат не готов: {response.status_code} {response.text[:120]}")
+    return time.perf_counter() - started
+
+
+async def run(submissions: int, window: float) -> bool:
+    from main import app
+
+    create_schema()
+    with Session(engine) as db:
+        test = seed_test(db, NUM_QUESTIONS)
+        test_id = test.id
+        question_ids = [q.id for q in test.questions]
+        expected = sum(q.correct_answer == "A" for q in test.questions) / NUM_QUESTIONS * 100
+        student_ids = seed_students(db, submissions, prefix="burst")
+    tokens = [
+        create_access_token({"sub": f"burst_{i}", "role": "student", "user_id": user_id})
+        for i, user_id in enumerate(student_ids)
+    ]
+    body = {"test_id": test_id, "answers": [{"question_id": qid, "answer": "A"} for qid in question_ids]}
+
+    latencies, statuses, errors = [], {}, []
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            submit(client, token, body, random.uniform(0, window), latencies, statuses, errors)
+            for token in tokens
+        ])
+        accepted = time.perf_counter() - started
+
+        drain = 0.0
+        if submission_queue is not None:
+            last = tokens[-1]
+            pending = await client.get(f"/student/results/{test_id}", headers={"Authorization": f"Bearer {last}"})
+            print(f"Статус результата сразу после приема: {pending.status_code}")
+            drain = await wait_until_graded(client, last, test_id)
+
+    with Session(engine) as db:
+        results, wrong = db.execute(
+            select(func.count(), func.sum(func.abs(TestResult.score - expected) > 1e-9))
+            .where(TestResult.test_id == test_id)
+        ).one()
+
+    mode = "очередь отправок" if submission_queue is not None else "синхронная оценка"
+    print(f"Режим: {mode}, отправок: {submissions}, окно: {window:.0f} с")
+    print(f"📝 Прием: {accepted:.1f} с, ответы {statuses}   p50: {percentile(latencies, 50):.1f} мс   "
+          f"p99: {percentile(latencies, 99):.1f} мс   max: {max(latencies):.1f} мс")
+    if submission_queue is not None:
+        print(f"✅ Все результаты готовы через {drain:.2f} с после окончания приема")
+        print(f"Статистика очереди отправок: {submission_queue.stats()}")
+        submission_queue.stop()
+    if write_queue is not None:
+        print(f"Статистика очереди записи: {write_queue.stats()}")
+    print(f"Результатов в базе: {results}, с неверным баллом: {wrong or 0}")
+
+    for error in errors[:5]:
+        print(f"  ❌ {error}")
+    return not errors and results == submissions and not wrong
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    submissions = int(args[0]) if args else 1000
+    window = float(args[1]) if len(args) > 1 else 10
+    sys.exit(0 if asyncio.run(run(submissions, window)) else 1)
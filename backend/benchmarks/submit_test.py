@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк проверки теста: сколько SQL-запросов и времени занимает одна отправка
+до (запрос категории на каждый ответ, по одному INSERT на ответ) и после
+(services.grading: один JOIN-запрос и один bulk INSERT), а также с кэшем
+ключей ответов, при котором вопросы из базы не читаются вовсе.
+
+Использование: python -m benchmarks.submit_test [вопросов] [отправок]
+"""
+
+import sys
+from types import SimpleNamespace
+from benchmarks.common import QueryCounter, timer, create_schema, seed_test, seed_students
+from sqlalchemy.orm import Session
+from database import engine
+from models import Category, Question, StudentAnswer, TestResult
+from services.grading import load_answer_key, get_answer_key, grade_submission, save_graded_submission
+
+
+def legacy_submit(db: Session, user_id: int, test_id: int, answers):
+    """Прежняя реализация submit_test (без HTTP-слоя)"""
+    questions = db.query(Question).filter(Question.test_id == test_id).all()
+    questions_dict = {q.id: q for q in questions}
+    correct_answers = 0
+    category_scores = {}
+
+    for answer in answers:
+        question = questions_dict[answer.question_id]
+        is_correct = answer.answer == question.correct_answer
+        if is_correct:
+            correct_answers += 1
+        category = db.query(Category).filter(Category.id == question.category_id).first()
+        if category:
+            scores = category_scores.setdefault(category.name, {"correct": 0, "total": 0})
+            scores["total"] += 1
+            if is_correct:
+                scores["correct"] += 1
+        db.add(StudentAnswer(user_id=user_id, question_id=answer.question_id,
+                             answer=answer.answer, is_correct=is_correct))
+
+    score = correct_answers / len(questions) * 100 if questions else 0
+    db.add(TestResult(user_id=user_id, test_id=test_id, score=score, category_breakdown=category_scores))
+    db.commit()
+
+
+def engine_submit(db: Session, user_id: int, test_id: int, answers):
+    answer_key = load_answer_key(db, test_id)
+    graded = grade_submission(answer_key, user_id, answers)
+    save_graded_submission(db, user_id, test_id, graded)
+    db.commit()
+
+
+def cached_submit(db: Session, user_id: int, test_id: int, answers):
+    answer_key = get_answer_key(db, test_id)
+    graded = grade_submission(answer_key, user_id, answers)
+    save_graded_submission(db, user_id, test_id, graded)
+    db.commit()
+
+
+def run(submit, label, test_id, student_ids, answers):
+    queries = []
+    reads_question_text = False
+    with timer() as elapsed:
+        for user_id in student_ids:
+            with Session(engine) as db, QueryCounter() as counter:
+                submit(db, user_id, test_id, answers)
+            queries.append(counter.count)
+            reads_question_text |= any("questions.text" in sql for sql in counter.statements)
+
+    per_submission_ms = elapsed["seconds"] / len(student_ids) * 1000
+    print(f"{label:<10} запросов на отправку: {sum(queries) / len(queries):6.1f}   "
+          f"время на отправку: {per_submission_ms:8.2f} мс   "
+          f"читает текст вопросов: {'да' if reads_question_text else 'нет'}")
+
+
+if __name__ == "__main__":
+    num_questions = int(sys.argv[1]) if len(sys.argv) > 1 else 150
+    submissions = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    create_schema()
+    with Session(engine) as db:
+        test = seed_test(db, num_questions)
+        test_id = test.id
+        question_ids = [q.id for q in test.questions]
+        legacy_students = seed_students(db, submissions, prefix="legacy")
+        engine_students = seed_students(db, submissions, prefix="engine")
+        cached_students = seed_students(db, submissions, prefix="cached")
+
+    answers = [SimpleNamespace(question_id=qid, answer="A") for qid in question_ids]
+
+    print(f"Тест: {num_questions} вопросов, {submissions} отправок\n")
+    run(legacy_submit, "до", test_id, legacy_students, answers)
+    run(engine_submit, "после", test_id, engine_students, answers)
+    run(cached_submit, "кэш", test_id, cached_students, answers)
@@ -4,6 +4,8 @@
 Использование:
 1. Создайте JSON файл с вопросами (пример: questions.json)
 2. Запустите: python bulk_upload_json.py questions.json
+3. Для файлов, которые не помещаются в память: python bulk_upload_json.py questions.json --stream
+   (после сбоя повторите с --resume, чтобы продолжить с последнего сохраненного пакета)
 """
 
 import json
@@ -11,24 +13,15 @@ import sys
 import os
 from sqlalchemy.orm import Session
 from database import engine, Base
-from models.question import Question
-from models.category import Category
 from models.test import Test
+from services.question_import import import_questions
+from services.question_stream import stream_import_questions
+from import_cli import print_import_errors, print_progress
 
 def create_tables():
     """Создает таблицы в базе данных"""
     Base.metadata.create_all(bind=engine)
 
-def get_or_create_category(db: Session, category_name: str) -> Category:
-    """Получает или создает категорию"""
-    category = db.query(Category).filter(Category.name == category_name).first()
-    if not category:
-        category = Category(name=category_name)
-        db.add(category)
-        db.commit()
-        db.refresh(category)
-    return category
-
 def get_or_create_test(db: Session, test_title: str, teacher_id: int) -> Test:
     """Получает или создает тест"""
     test = db.query(Test).filter(Test.title == test_title).first()
@@ -39,7 +32,8 @@ def get_or_create_test(db: Session, test_title: str, teacher_id: int) -> Test:
         db.refresh(test)
     return test
 
-def upload_questions_from_json(json_file_path: str, test_title: str, teacher_id: int = 1):
+def upload_questions_from_json(json_file_path: str, test_title: str, teacher_id: int = 1,
+                               stream: bool = False, resume: bool = False):
     """
     Загружает вопросы из JSON файла
     
@@ -57,10 +51,21 @@ def upload_questions_from_json(json_file_path: str, test_title: str, teacher_id:
             }
         ]
     }
+    
+    При stream=True файл читается по одному вопросу, а каждый пакет
+    сохраняется отдельной транзакцией; resume=True продолжает прерванную загрузку.
     """
     
     create_tables()
     
+    if stream:
+        with Session(engine) as db:
+            test = get_or_create_test(db, test_title, teacher_id)
+            report = stream_import_questions(db, test.id, json_file_path, format="json", resume=resume,
+                                             on_progress=print_progress)
+        print_import_summary(report, test_title)
+        return
+    
     with open(json_file_path, 'r', encoding='utf-8') as file:
         data = json.load(file)
     
@@ -68,31 +73,19 @@ def upload_questions_from_json(json_file_path: str, test_title: str, teacher_id:
         # Получаем или создаем тест
         test = get_or_create_test(db, test_title, teacher_id)
         
-        for i, question_data in enumerate(data['questions'], 1):
-            try:
-                # Получаем или создаем категорию
-                category = get_or_create_category(db, question_data['category'])
-                
-                # Создаем вопрос
-                question = Question(
-                    test_id=test.id,
-                    category_id=category.id,
-                    text=question_data['text'],
-                    options=question_data['options'],
-                    correct_answer=question_data['correct_answer'],
-                    image_url=question_data.get('image_url'),
-                    table_data=question_data.get('table_data')
-                )
-                
-                db.add(question)
-                print(f"Добавлен вопрос {i}: {question_data['text'][:50]}...")
-                
-            except Exception as e:
-                print(f"Ошибка в вопросе {i}: {e}")
-                continue
-        
-        db.commit()
-        print(f"\nЗагрузка завершена! Добавлено {len(data['questions'])} вопросов в тест '{test_title}'")
+        # Все вопросы вставляются пакетами в одной транзакции
+        report = import_questions(db, test.id, enumerate(data['questions'], 1))
+    
+    print_import_summary(report, test_title)
+
+def print_import_summary(report, test_title: str):
+    """Выводит итог загрузки JSON файла"""
+    print_import_errors(report, "вопросе")
+    if report.resumed_after_row:
+        print(f"\nПродолжена загрузка после вопроса {report.resumed_after_row}")
+    print(f"\nЗагрузка завершена! Добавлено {report.rows_imported} из {report.rows_total} вопросов в тест '{test_title}'")
+    if report.categories_created:
+        print(f"Создано новых категорий: {report.categories_created}")
 
 def create_sample_json():
     """Создает пример JSON файла"""
@@ -133,7 +126,7 @@ def create_sample_json():
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Использование: python bulk_upload_json.py <json_file> [test_title] [teacher_id]")
+        print("Использование: python bulk_upload_json.py <json_file> [test_title] [teacher_id] [--stream] [--resume]")
         print("\nДля создания примера JSON файла запустите:")
         print("python bulk_upload_json.py --create-sample")
         sys.exit(1)
@@ -142,12 +135,16 @@ if __name__ == "__main__":
         create_sample_json()
         sys.exit(0)
     
-    json_file = sys.argv[1]
-    test_title = sys.argv[2] if len(sys.argv) > 2 else "Массовый тест"
-    teacher_id = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+    flags = {arg for arg in sys.argv[1:] if arg.startswith("--")}
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    json_file = args[0]
+    test_title = args[1] if len(args) > 1 else "Массовый тест"
+    teacher_id = int(args[2]) if len(args) > 2 else 1
+    resume = "--resume" in flags
+    stream = "--stream" in flags or resume
     
     if not os.path.exists(json_file):
         print(f"Файл {json_file} не найден!")
         sys.exit(1)
     
-    upload_questions_from_json(json_file, test_title, teacher_id) 
\ No newline at end of file
+    upload_questions_from_json(json_file, test_title, teacher_id, stream=stream, resume=resume) 
\ No newline at end of file
@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
 """
 Улучшенный скрипт для массовой загрузки вопросов с выбором теста
-Использование: python bulk_upload_with_test_selection.py <csv_file> [test_id]
+Использование: python bulk_upload_with_test_selection.py <csv_file> [test_id] [--stream] [--resume]
+
+--stream: файл читается по частям, каждый пакет сохраняется отдельной транзакцией
+--resume: продолжить прерванную потоковую загрузку с последнего сохраненного пакета
 """
 
 import csv
@@ -10,9 +13,10 @@ import os
 from sqlalchemy.orm import Session
 from database import engine, Base
 from models.question import Question
-from models.category import Category
 from models.test import Test
-from models.user import User
+from services.question_import import import_questions
+from services.question_stream import stream_import_questions
+from import_cli import print_import_errors, print_progress
 
 def create_tables():
     """Создает таблицы в базе данных"""
@@ -37,16 +41,6 @@ def list_existing_tests():
         
         return tests
 
-def get_or_create_category(db: Session, category_name: str) -> Category:
-    """Получает или создает категорию"""
-    category = db.query(Category).filter(Category.name == category_name).first()
-    if not category:
-        category = Category(name=category_name)
-        db.add(category)
-        db.commit()
-        db.refresh(category)
-    return category
-
 def get_test_by_id(test_id: int) -> Test:
     """Получает тест по ID"""
     with Session(engine) as db:
@@ -62,13 +56,15 @@ def create_new_test(title: str, description: str = None, teacher_id: int = 1) ->
         db.refresh(test)
         return test
 
-def upload_questions_to_test(csv_file_path: str, test_id: int):
+def upload_questions_to_test(csv_file_path: str, test_id: int, stream: bool = False, resume: bool = False):
     """
     Загружает вопросы в конкретный тест
     
     Args:
         csv_file_path: путь к CSV файлу
         test_id: ID теста для загрузки
+        stream: потоковая загрузка с сохранением каждого пакета
+        resume: продолжить прерванную потоковую загрузку
     """
     
     create_tables()
@@ -82,45 +78,29 @@ def upload_questions_to_test(csv_file_path: str, test_id: int):
     print(f"Загружаем вопросы в тест: {test.title} (ID: {test.id})")
     
     with Session(engine) as db:
-        with open(csv_file_path, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            
-            questions_added = 0
-            for row_num, row in enumerate(reader, 1):
-                try:
-                    # Получаем или создаем категорию
-                    category = get_or_create_category(db, row['category'])
-                    
-                    # Парсим options из строки JSON
-                    import json
-                    options = json.loads(row['options'].replace("'", '"'))
-                    
-                    # Создаем вопрос
-                    question = Question(
-                        test_id=test.id,
-                        category_id=category.id,
-                        text=row['text'],
-                        options=options,
-                        correct_answer=row['correct_answer'],
-                        image_url=row['image_url'] if row['image_url'] else None,
-                        table_data=json.loads(row['table_data']) if row['table_data'] else None
-                    )
-                    
-                    db.add(question)
-                    questions_added += 1
-                    print(f"Добавлен вопрос {row_num}: {row['text'][:50]}...")
-                    
-                except Exception as e:
-                    print(f"Ошибка в строке {row_num}: {e}")
-                    continue
-            
-            db.commit()
-            print(f"\n✅ Загрузка завершена!")
-            print(f"📊 Добавлено вопросов: {questions_added}")
-            print(f"📝 Тест: {test.title}")
-            print(f"🆔 ID теста: {test.id}")
-            
-            return True
+        if stream:
+            report = stream_import_questions(db, test.id, csv_file_path, format="csv", resume=resume,
+                                             on_progress=print_progress)
+        else:
+            with open(csv_file_path, 'r', encoding='utf-8') as file:
+                reader = csv.DictReader(file)
+                
+                # Все строки вставляются пакетами в одной транзакции
+                report = import_questions(db, test.id, enumerate(reader, 1))
+    
+    print_import_errors(report, "строке")
+    print(f"\n✅ Загрузка завершена!")
+    if report.resumed_after_row:
+        print(f"⏩ Продолжено после строки: {report.resumed_after_row}")
+    print(f"📊 Добавлено вопросов: {report.rows_imported}")
+    if report.rows_failed:
+        print(f"⚠️  Пропущено строк с ошибками: {report.rows_failed}")
+    if report.categories_created:
+        print(f"📂 Создано новых категорий: {report.categories_created}")
+    print(f"📝 Тест: {test.title}")
+    print(f"🆔 ID теста: {test.id}")
+    
+    return True
 
 def interactive_test_selection():
     """Интерактивный выбор теста"""
@@ -181,14 +161,19 @@ def interactive_test_selection():
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Использование: python bulk_upload_with_test_selection.py <csv_file> [test_id]")
+        print("Использование: python bulk_upload_with_test_selection.py <csv_file> [test_id] [--stream] [--resume]")
         print("\nПримеры:")
         print("  python bulk_upload_with_test_selection.py questions.csv")
         print("  python bulk_upload_with_test_selection.py questions.csv 1")
+        print("  python bulk_upload_with_test_selection.py questions.csv 1 --stream")
         sys.exit(1)
     
-    csv_file = sys.argv[1]
-    test_id = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    flags = {arg for arg in sys.argv[1:] if arg.startswith("--")}
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    csv_file = args[0]
+    test_id = int(args[1]) if len(args) > 1 else None
+    resume = "--resume" in flags
+    stream = "--stream" in flags or resume
     
     if not os.path.exists(csv_file):
         print(f"❌ Файл {csv_file} не найден!")
@@ -201,7 +186,7 @@ if __name__ == "__main__":
             sys.exit(0)
     
     # Загружаем вопросы
-    success = upload_questions_to_test(csv_file, test_id)
+    success = upload_questions_to_test(csv_file, test_id, stream=stream, resume=resume)
     if success:
         print("\n🎉 Загрузка успешно завершена!")
     else:
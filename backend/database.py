@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -9,10 +9,65 @@ load_dotenv()
 # Use SQLite for development, PostgreSQL for production
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./biology_test.db")
 
+# Connection pool tuning (ignored for in-memory SQLite, which uses a single connection)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# SQLite performance profile, applied to every new connection
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    # Negative cache_size is in KiB
+    "cache_size": -int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536")),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+}
+
+# Serve the hot student endpoints from async handlers on an async engine
+ASYNC_DB = os.getenv("ASYNC_DB", "false").lower() in ("1", "true", "yes")
+
+# Number of worker processes serving the app (uvicorn --workers and gunicorn read it too)
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+def is_memory_sqlite(url: str) -> bool:
+    return url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith("sqlite:"))
+
+def _engine_options(url: str) -> dict:
+    options = {"pool_pre_ping": DB_POOL_PRE_PING}
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+    if not is_memory_sqlite(url):
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+    return options
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record=None):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+def async_database_url(url: str) -> str:
+    """Map a sync DATABASE_URL to its async driver (aiosqlite / asyncpg)"""
+    scheme, _, rest = url.partition("://")
+    driver = scheme.split("+")[0]
+    if driver == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+    if driver in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg://{rest}"
+    return url
+
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+
 if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-else:
-    engine = create_engine(DATABASE_URL)
+    event.listen(engine, "connect", apply_sqlite_pragmas)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -23,4 +78,27 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async_engine = None
+AsyncSessionLocal = None
+
+if ASYNC_DB:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    ASYNC_DATABASE_URL = async_database_url(DATABASE_URL)
+    async_options = _engine_options(DATABASE_URL)
+    # check_same_thread is a sqlite3 option that aiosqlite manages itself
+    async_options.pop("connect_args", None)
+    if "pool_size" in async_options:
+        # aiosqlite defaults to NullPool; pool file databases like the sync engine
+        async_options["poolclass"] = AsyncAdaptedQueuePool
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **async_options)
+    if DATABASE_URL.startswith("sqlite"):
+        event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
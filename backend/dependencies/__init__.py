@@ -1,3 +1,4 @@
 from .auth_dependencies import get_current_user, require_teacher, require_student
+from .pagination import page_params, list_page, list_page_async
 
-__all__ = ["get_current_user", "require_teacher", "require_student"]
\ No newline at end of file
+__all__ = ["get_current_user", "require_teacher", "require_student", "page_params", "list_page", "list_page_async"]
\ No newline at end of file
@@ -1,16 +1,27 @@
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from database import get_db
+from database import SessionLocal
 from models.user import User, UserRole
 from auth.jwt_handler import verify_token
+from auth.principal_cache import Principal, principal_cache
 
 security = HTTPBearer()
 
+def load_principal(username: str) -> Optional[Principal]:
+    """Load a user from the database and cache it as a principal"""
+    generation = principal_cache.generation
+    with SessionLocal() as db:
+        user = db.query(User).filter(User.username == username).first()
+        if user is None:
+            return None
+        principal = Principal.from_user(user)
+    principal_cache.put(principal, generation)
+    return principal
+
 def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> Principal:
     token = credentials.credentials
     payload = verify_token(token)
     
@@ -27,7 +38,12 @@ def get_current_user(
             detail="Could not validate credentials",
         )
     
-    user = db.query(User).filter(User.username == username).first()
+    # Cache hit: no database session is opened at all
+    user_id = payload.get("user_id")
+    user = principal_cache.get(user_id) if user_id is not None else None
+    if user is None or user.username != username:
+        user = load_principal(username)
+    
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -36,7 +52,7 @@ def get_current_user(
     
     return user
 
-def require_teacher(current_user: User = Depends(get_current_user)) -> User:
+def require_teacher(current_user: Principal = Depends(get_current_user)) -> Principal:
     if current_user.role != UserRole.TEACHER:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -44,10 +60,10 @@ def require_teacher(current_user: User = Depends(get_current_user)) -> User:
         )
     return current_user
 
-def require_student(current_user: User = Depends(get_current_user)) -> User:
+def require_student(current_user: Principal = Depends(get_current_user)) -> Principal:
     if current_user.role != UserRole.STUDENT:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Student access required",
         )
-    return current_user
\ No newline at end of file
+    return current_user
@@ -0,0 +1,40 @@
+from typing import Any, List, Optional
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from services.pagination import (
+    MAX_PAGE_SIZE, InvalidPageRequest, Page, PageParams, SortOrder, paginate, paginate_async
+)
+
+def page_params(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; omitted returns the whole list"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    sort: str = Query("id", description="Sort field, prefixed with '-' for descending order")
+) -> PageParams:
+    return PageParams(limit=limit, cursor=cursor, sort=sort)
+
+def _send_page(response: Response, page: Page) -> List[Any]:
+    # The body stays a plain list; paging metadata goes into headers
+    response.headers.update(page.headers())
+    return page.items
+
+def list_page(db: Session, response: Response, statement: Select, order: SortOrder, params: PageParams) -> List[Any]:
+    try:
+        page = paginate(db, statement, order, params)
+    except InvalidPageRequest as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return _send_page(response, page)
+
+async def list_page_async(
+    db: AsyncSession,
+    response: Response,
+    statement: Select,
+    order: SortOrder,
+    params: PageParams
+) -> List[Any]:
+    try:
+        page = await paginate_async(db, statement, order, params)
+    except InvalidPageRequest as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return _send_page(response, page)
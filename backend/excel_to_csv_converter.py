@@ -2,11 +2,19 @@
 """
 Конвертер Excel файлов в CSV для подготовки вопросов
 Использование: python excel_to_csv_converter.py input.xlsx output.csv
+Загрузка сразу в базу данных, без CSV: python excel_to_csv_converter.py input.xlsx --test <test_id>
 """
 
 import pandas as pd
 import sys
 import os
+from sqlalchemy.orm import Session
+from database import engine, Base
+from models.test import Test
+from services.question_excel import (
+    read_question_sheet, options_json, import_excel_questions, ExcelColumnsError
+)
+from import_cli import print_import_errors
 
 def convert_excel_to_csv(excel_file: str, csv_file: str):
     """
@@ -22,33 +30,20 @@ def convert_excel_to_csv(excel_file: str, csv_file: str):
     """
     
     try:
-        # Читаем Excel файл
-        df = pd.read_excel(excel_file)
-        
-        # Проверяем обязательные колонки
-        required_columns = ['category', 'text', 'options', 'correct_answer']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        
-        if missing_columns:
-            print(f"Ошибка: Отсутствуют обязательные колонки: {missing_columns}")
-            print(f"Доступные колонки: {list(df.columns)}")
+        # Читаем Excel файл (пустые строки шаблона пропускаются)
+        try:
+            df = read_question_sheet(excel_file)
+        except ExcelColumnsError as e:
+            print(f"Ошибка: {e}")
             return False
         
-        # Обрабатываем колонку options - конвертируем в JSON формат
-        if 'options' in df.columns:
-            df['options'] = df['options'].apply(lambda x: 
-                str(x).split(';') if pd.notna(x) else []
-            )
-            df['options'] = df['options'].apply(lambda x: 
-                [opt.strip() for opt in x] if isinstance(x, list) else []
-            )
-            df['options'] = df['options'].apply(lambda x: 
-                str(x).replace("'", '"') if x else '[]'
-            )
+        # Разбиваем options по точке с запятой и записываем JSON списком
+        # векторными строковыми операциями, без json.dumps для каждой строки
+        df['options'] = options_json(df['options'])
         
         # Заполняем пустые значения
-        df['image_url'] = df.get('image_url', '').fillna('')
-        df['table_data'] = df.get('table_data', '').fillna('')
+        df['image_url'] = df['image_url'].fillna('')
+        df['table_data'] = df['table_data'].fillna('')
         
         # Сохраняем в CSV
         df.to_csv(csv_file, index=False, encoding='utf-8')
@@ -66,6 +61,30 @@ def convert_excel_to_csv(excel_file: str, csv_file: str):
         print(f"Ошибка при конвертации: {e}")
         return False
 
+def upload_excel_to_test(excel_file: str, test_id: int) -> bool:
+    """
+    Загружает вопросы из Excel файла сразу в тест, без промежуточного CSV
+    """
+    Base.metadata.create_all(bind=engine)
+    
+    with Session(engine) as db:
+        test = db.get(Test, test_id)
+        if not test:
+            print(f"Ошибка: Тест с ID {test_id} не найден!")
+            return False
+        
+        try:
+            report = import_excel_questions(db, test.id, excel_file)
+        except ExcelColumnsError as e:
+            print(f"Ошибка: {e}")
+            return False
+        
+        print_import_errors(report, "строке")
+        print(f"\n✅ Загружено вопросов: {report.rows_imported} из {report.rows_total} в тест '{test.title}'")
+        if report.categories_created:
+            print(f"📂 Создано новых категорий: {report.categories_created}")
+        return True
+
 def create_sample_excel():
     """Создает пример Excel файла"""
     sample_data = {
@@ -92,6 +111,7 @@ def create_sample_excel():
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("Использование: python excel_to_csv_converter.py <excel_file> [csv_file]")
+        print("           или: python excel_to_csv_converter.py <excel_file> --test <test_id>")
         print("\nДля создания примера Excel файла запустите:")
         print("python excel_to_csv_converter.py --create-sample")
         sys.exit(1)
@@ -101,10 +121,14 @@ if __name__ == "__main__":
         sys.exit(0)
     
     excel_file = sys.argv[1]
-    csv_file = sys.argv[2] if len(sys.argv) > 2 else excel_file.replace('.xlsx', '.csv')
     
     if not os.path.exists(excel_file):
         print(f"Файл {excel_file} не найден!")
         sys.exit(1)
     
+    if len(sys.argv) > 3 and sys.argv[2] == "--test":
+        success = upload_excel_to_test(excel_file, int(sys.argv[3]))
+        sys.exit(0 if success else 1)
+    
+    csv_file = sys.argv[2] if len(sys.argv) > 2 else excel_file.replace('.xlsx', '.csv')
     convert_excel_to_csv(excel_file, csv_file) 
\ No newline at end of file
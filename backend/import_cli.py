@@ -0,0 +1,19 @@
+"""
+Вывод хода и итогов импорта вопросов для скриптов загрузки
+(bulk_upload_json.py, bulk_upload_with_test_selection.py, excel_to_csv_converter.py)
+"""
+
+from services.question_import import MAX_REPORTED_ERRORS
+
+def print_progress(progress):
+    """Выводит прогресс потоковой загрузки"""
+    percent = f" ({progress.fraction * 100:.0f}%)" if progress.fraction is not None else ""
+    print(f"Обработано строк: {progress.rows_processed}{percent}, добавлено: {progress.rows_imported}, "
+          f"ошибок: {progress.rows_failed}")
+
+def print_import_errors(report, row_label: str):
+    """Выводит ошибки импорта (не более MAX_REPORTED_ERRORS)"""
+    for row_num, message in report.errors:
+        print(f"Ошибка в {row_label} {row_num}: {message}")
+    if report.rows_failed > len(report.errors):
+        print(f"... и еще {report.rows_failed - len(report.errors)} ошибок (показаны первые {MAX_REPORTED_ERRORS})")
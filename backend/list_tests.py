@@ -10,40 +10,37 @@ from database import engine
 from models.test import Test
 from models.question import Question
 from models.category import Category
+from services.statistics import get_question_bank_stats
 
 def list_all_tests():
     """Показывает список всех тестов"""
     with Session(engine) as db:
-        tests = db.query(Test).all()
+        stats = get_question_bank_stats(db)
+    
+    if not stats.tests:
+        print("В базе данных нет тестов.")
+        return
+    
+    print("\n" + "="*60)
+    print("📋 СПИСОК ВСЕХ ТЕСТОВ")
+    print("="*60)
+    
+    for test in stats.tests:
+        print(f"\n🆔 ID: {test.id}")
+        print(f"📝 Название: {test.title}")
+        print(f"📊 Вопросов: {test.question_count}")
         
-        if not tests:
-            print("В базе данных нет тестов.")
-            return
+        if test.description:
+            print(f"📄 Описание: {test.description}")
         
-        print("\n" + "="*60)
-        print("📋 СПИСОК ВСЕХ ТЕСТОВ")
-        print("="*60)
+        print(f"📅 Создан: {test.created_at}")
+        print(f"👤 Создатель ID: {test.created_by}")
         
-        for test in tests:
-            questions_count = db.query(Question).filter(Question.test_id == test.id).count()
-            
-            print(f"\n🆔 ID: {test.id}")
-            print(f"📝 Название: {test.title}")
-            print(f"📊 Вопросов: {questions_count}")
-            
-            if test.description:
-                print(f"📄 Описание: {test.description}")
-            
-            print(f"📅 Создан: {test.created_at}")
-            print(f"👤 Создатель ID: {test.created_by}")
-            
-            # Показываем категории вопросов
-            if questions_count > 0:
-                categories = db.query(Category).join(Question).filter(Question.test_id == test.id).distinct().all()
-                if categories:
-                    print(f"🏷️  Категории: {', '.join([cat.name for cat in categories])}")
-            
-            print("-" * 40)
+        # Показываем категории вопросов
+        if test.categories:
+            print(f"🏷️  Категории: {', '.join(test.categories)}")
+        
+        print("-" * 40)
 
 def show_test_details(test_id: int):
     """Показывает детальную информацию о конкретном тесте"""
@@ -89,42 +86,35 @@ def show_test_details(test_id: int):
 def show_test_statistics():
     """Показывает статистику по всем тестам"""
     with Session(engine) as db:
-        tests = db.query(Test).all()
-        
-        if not tests:
-            print("В базе данных нет тестов.")
-            return
-        
-        total_questions = db.query(Question).count()
-        total_categories = db.query(Category).count()
-        
-        print("\n" + "="*60)
-        print("📊 СТАТИСТИКА ПЛАТФОРМЫ")
-        print("="*60)
-        
-        print(f"\n📋 Всего тестов: {len(tests)}")
-        print(f"❓ Всего вопросов: {total_questions}")
-        print(f"🏷️  Всего категорий: {total_categories}")
-        
-        # Статистика по категориям
-        print(f"\n📈 СТАТИСТИКА ПО КАТЕГОРИЯМ:")
-        categories = db.query(Category).all()
-        for category in categories:
-            questions_count = db.query(Question).filter(Question.category_id == category.id).count()
-            if questions_count > 0:
-                print(f"   {category.name}: {questions_count} вопросов")
-        
-        # Самый большой тест
-        largest_test = None
-        max_questions = 0
-        for test in tests:
-            questions_count = db.query(Question).filter(Question.test_id == test.id).count()
-            if questions_count > max_questions:
-                max_questions = questions_count
-                largest_test = test
-        
-        if largest_test:
-            print(f"\n🏆 Самый большой тест: {largest_test.title} ({max_questions} вопросов)")
+        stats = get_question_bank_stats(db)
+    
+    if not stats.tests:
+        print("В базе данных нет тестов.")
+        return
+    
+    print("\n" + "="*60)
+    print("📊 СТАТИСТИКА ПЛАТФОРМЫ")
+    print("="*60)
+    
+    print(f"\n📋 Всего тестов: {stats.total_tests}")
+    print(f"❓ Всего вопросов: {stats.total_questions}")
+    print(f"🏷️  Всего категорий: {stats.total_categories}")
+    
+    # Статистика по категориям
+    print(f"\n📈 СТАТИСТИКА ПО КАТЕГОРИЯМ:")
+    for category in stats.categories:
+        if category.question_count > 0:
+            print(f"   {category.name}: {category.question_count} вопросов")
+    
+    # Статистика по преподавателям
+    print(f"\n👥 СТАТИСТИКА ПО ПРЕПОДАВАТЕЛЯМ:")
+    for teacher in stats.teachers:
+        print(f"   {teacher.name} ({teacher.username}): {teacher.test_count} тестов, {teacher.question_count} вопросов")
+    
+    # Самый большой тест
+    largest_test = stats.largest_test
+    if largest_test and largest_test.question_count > 0:
+        print(f"\n🏆 Самый большой тест: {largest_test.title} ({largest_test.question_count} вопросов)")
 
 if __name__ == "__main__":
     if len(sys.argv) > 1:
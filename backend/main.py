@@ -3,15 +3,19 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy.orm import Session
 import os
-from database import engine, get_db, Base
+from database import engine, get_db, Base, ASYNC_DB, async_engine
 from models import User, Category, Test, Question, StudentAnswer, TestResult
-from models.user import UserRole
-from routers import auth_router, teachers_router, students_router
+from routers import auth_router, teachers_router, students_router, exam_sessions_router
 from routers.upload import router as upload_router
-from auth.password import hash_password
-
-# Create database tables
-Base.metadata.create_all(bind=engine)
+from dependencies.auth_dependencies import require_teacher
+from auth.password import hashing_pool
+from migrations import bootstrap
+from services.cache import cache_stats
+from services.write_queue import write_queue
+from services.import_jobs import import_jobs
+from services.exam_sessions import answer_buffer
+from services.submission_queue import submission_queue
+from services.cache_sync import cache_sync
 
 app = FastAPI(
     title="Biology Testing Platform API",
@@ -26,6 +30,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Paging metadata of the list endpoints
+    expose_headers=["X-Total-Count", "X-Next-Cursor"],
 )
 
 # Create uploads directory if it doesn't exist
@@ -38,7 +44,12 @@ app.mount("/uploads", StaticFiles(directory=uploads_dir), name="uploads")
 # Include routers
 app.include_router(auth_router)
 app.include_router(teachers_router)
+if ASYNC_DB:
+    # Matched before the sync versions of the same paths
+    from routers.students_async import router as students_async_router
+    app.include_router(students_async_router)
 app.include_router(students_router)
+app.include_router(exam_sessions_router)
 app.include_router(upload_router)
 
 @app.get("/")
@@ -49,76 +60,69 @@ def root():
 def health_check():
     return {"status": "healthy"}
 
-# Utility function to fix database enum issues
-def fix_database_enum_values(db):
-    """Fix any lowercase enum values in the database"""
-    try:
-        # Fix user roles - convert any lowercase to uppercase
-        result = db.execute("UPDATE users SET role = 'STUDENT' WHERE role = 'student'")
-        student_fixes = result.rowcount
-        
-        result = db.execute("UPDATE users SET role = 'TEACHER' WHERE role = 'teacher'")  
-        teacher_fixes = result.rowcount
-        
-        if student_fixes > 0 or teacher_fixes > 0:
-            db.commit()
-            print(f"🔧 Fixed {student_fixes + teacher_fixes} role enum values in database")
-            
-    except Exception as e:
-        print(f"⚠️  Could not fix enum values: {e}")
-        db.rollback()
-
-# Initialize first teacher account and fix database issues
+@app.get("/metrics")
+def metrics(current_teacher: User = Depends(require_teacher)):
+    return {
+        "password_hashing": hashing_pool.stats(),
+        "caches": cache_stats(),
+        "cache_sync": cache_sync.stats() if cache_sync is not None else None,
+        "sqlite_write_queue": write_queue.stats() if write_queue is not None else None,
+        "question_imports": import_jobs.stats(),
+        "answer_buffer": answer_buffer.stats() if answer_buffer is not None else None,
+        "submission_queue": submission_queue.stats() if submission_queue is not None else None,
+    }
+
+@app.on_event("startup")
+def bootstrap_database():
+    # Usually one SELECT: every step already applied is recorded in schema_migrations
+    ran = bootstrap()
+    if ran:
+        print(f"✅ Database bootstrap: {', '.join(ran)}")
+
+@app.on_event("startup")
+def start_cache_sync():
+    # Picks up cache invalidations published by other workers and the import scripts
+    if cache_sync is not None:
+        cache_sync.start()
+
 @app.on_event("startup")
-def create_initial_teacher():
-    from database import SessionLocal
-    db = SessionLocal()
-    
-    try:
-        # First, fix any existing database enum issues
-        fix_database_enum_values(db)
-        
-        # Check if any teacher exists
-        existing_teacher = db.query(User).filter(User.role == UserRole.TEACHER).first()
-        
-        if not existing_teacher:
-            # Create initial teacher
-            initial_teacher = User(
-                username="admin",
-                password_hash=hash_password("admin123"),
-                role=UserRole.TEACHER,
-                name="Administrator"
-            )
-            db.add(initial_teacher)
-            db.commit()
-            print("✅ Initial teacher account created:")
-            print("   Username: admin")
-            print("   Password: admin123")
-            print("   ⚠️  Please change the password after first login!")
-        
-        # Create some default categories if none exist
-        existing_categories = db.query(Category).first()
-        if not existing_categories:
-            default_categories = [
-                Category(name="Genetics"),
-                Category(name="Molecular Biology"),
-                Category(name="Cell Biology"),
-                Category(name="Ecology"),
-                Category(name="Evolution"),
-                Category(name="Biochemistry")
-            ]
-            
-            for category in default_categories:
-                db.add(category)
-            
-            db.commit()
-            print("✅ Default categories created")
-    
-    except Exception as e:
-        print(f"❌ Error during startup: {e}")
-        db.rollback()
-    finally:
-        db.close()
+def start_submission_queue():
+    # Grades submissions journaled before the last shutdown first
+    if submission_queue is not None:
+        submission_queue.start()
+
+@app.on_event("shutdown")
+def flush_answer_buffer():
+    # Before the write queue stops, since the flush goes through it
+    if answer_buffer is not None:
+        answer_buffer.stop()
+
+@app.on_event("shutdown")
+def stop_submission_queue():
+    # Ungraded submissions stay in the journal for the next start
+    if submission_queue is not None:
+        submission_queue.stop()
+
+@app.on_event("shutdown")
+def stop_import_jobs():
+    # Before the write queue stops, since job status writes go through it
+    import_jobs.shutdown()
+
+@app.on_event("shutdown")
+def stop_write_queue():
+    if write_queue is not None:
+        write_queue.stop()
+
+@app.on_event("shutdown")
+def stop_cache_sync():
+    if cache_sync is not None:
+        cache_sync.stop()
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    # Pooled aiosqlite connections keep non-daemon threads alive otherwise
+    if async_engine is not None:
+        await async_engine.dispose()
 
 if __name__ == "__main__":
     import uvicorn
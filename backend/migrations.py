@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Обновление схемы существующей базы данных под текущие модели и начальные
+данные (учетная запись администратора, категории). Выполняются только шаги,
+еще не записанные в таблицу schema_migrations; то же делает запуск сервера.
+Если у студента несколько результатов одного теста, обновление
+останавливается со списком таких пар; --dedupe-results оставляет первый
+результат каждой пары и удаляет остальные вместе с их ответами.
+Использование: python migrations.py [--dedupe-results]
+"""
+
+import hashlib
+import sqlite3
+import sys
+from contextlib import contextmanager
+from typing import Callable, List, Set, Tuple
+from sqlalchemy import delete, func, inspect, insert, select, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.orm import Session
+from database import engine, Base, is_memory_sqlite
+import models  # noqa: F401  (registers all tables on Base.metadata)
+from models import Category, Question, SchemaMigration, StudentAnswer, TestAnalytics, TestResult, User
+from models.user import UserRole
+from auth.password import hash_password
+from services.analytics import rebuild_analytics
+
+DEFAULT_CATEGORIES = ["Genetics", "Molecular Biology", "Cell Biology", "Ecology", "Evolution", "Biochemistry"]
+
+# pg_advisory_lock key of the schema setup
+SCHEMA_LOCK_KEY = 0x5359_4E41
+
+@contextmanager
+def schema_lock(bind=engine, timeout_s: float = 120):
+    """
+    Lets one process at a time set up the schema and seed data, so worker
+    processes starting together do not race to create the same tables.
+    SQLite: an exclusive transaction on a separate <database>.lock file;
+    PostgreSQL: a session-level advisory lock.
+    """
+    url = bind.url
+    if url.get_backend_name() == "postgresql":
+        with bind.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SCHEMA_LOCK_KEY})
+        return
+    if url.get_backend_name() != "sqlite" or is_memory_sqlite(str(url)):
+        yield
+        return
+
+    lock = sqlite3.connect(f"{url.database}.lock", timeout=timeout_s, isolation_level=None)
+    try:
+        lock.execute("BEGIN EXCLUSIVE")
+        try:
+            yield
+        finally:
+            lock.execute("ROLLBACK")
+    finally:
+        lock.close()
+
+class DuplicateResultsError(Exception):
+    """The unique (user_id, test_id) index cannot be created while a student has several results of a test"""
+
+    def __init__(self, pairs: List[Tuple[int, int, int]]):
+        self.pairs = pairs
+        listed = ", ".join(f"user {user_id}/test {test_id} ({count} results)" for user_id, test_id, count in pairs[:20])
+        if len(pairs) > 20:
+            listed += f" and {len(pairs) - 20} more"
+        super().__init__(
+            f"{len(pairs)} (user_id, test_id) pairs have more than one result: {listed}. "
+            "Review them, then run `python migrations.py --dedupe-results` to keep the first result of each pair"
+        )
+
+def find_duplicate_results(conn) -> List[Tuple[int, int, int]]:
+    """(user_id, test_id, number of results) of every pair with more than one result"""
+    return [tuple(row) for row in conn.execute(
+        select(TestResult.user_id, TestResult.test_id, func.count())
+        .group_by(TestResult.user_id, TestResult.test_id)
+        .having(func.count() > 1)
+        .order_by(TestResult.test_id, TestResult.user_id)
+    )]
+
+def dedupe_results(bind=engine) -> Tuple[int, int]:
+    """
+    Maintenance command, never run by bootstrap: keep the first result of
+    each duplicated (user_id, test_id) pair and delete the others together
+    with the answers of the deleted submissions, then recompute the analytics
+    of the affected tests. Returns the numbers of deleted results and answers.
+    """
+    Base.metadata.create_all(bind=bind)
+    deleted_results = deleted_answers = 0
+    with Session(bind) as db:
+        pairs = find_duplicate_results(db)
+        for user_id, test_id, _ in pairs:
+            of_pair = (TestResult.user_id == user_id, TestResult.test_id == test_id)
+            first = db.scalar(select(func.min(TestResult.id)).where(*of_pair))
+            deleted_results += db.execute(
+                delete(TestResult).where(*of_pair, TestResult.id != first),
+                execution_options={"synchronize_session": False}
+            ).rowcount
+
+            # Answers are not linked to a result; the first submission has the first answer to each question
+            answers = (
+                StudentAnswer.user_id == user_id,
+                StudentAnswer.question_id.in_(select(Question.id).where(Question.test_id == test_id)),
+            )
+            first_answers = select(func.min(StudentAnswer.id)).where(*answers).group_by(StudentAnswer.question_id)
+            deleted_answers += db.execute(
+                delete(StudentAnswer).where(*answers, StudentAnswer.id.not_in(first_answers)),
+                execution_options={"synchronize_session": False}
+            ).rowcount
+
+        # Empty analytics are filled from all results by the schema step instead
+        if db.scalar(select(TestAnalytics.test_id).limit(1)) is not None:
+            for test_id in sorted({test_id for _, test_id, _ in pairs}):
+                rebuild_analytics(db, test_id)
+        db.commit()
+    return deleted_results, deleted_answers
+
+def upgrade_indexes(bind=engine) -> List[str]:
+    """
+    Create model indexes that are missing on already existing tables
+    (create_all only creates indexes together with new tables).
+    Returns the names of the created indexes.
+    """
+    created = []
+    with bind.begin() as conn:
+        inspector = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in sorted(table.indexes, key=lambda ix: ix.name):
+                if index.name in existing:
+                    continue
+                if index.name == "uq_test_results_user_test":
+                    # Deleting students' results is left to an explicit --dedupe-results run
+                    duplicates = find_duplicate_results(conn)
+                    if duplicates:
+                        raise DuplicateResultsError(duplicates)
+                index.create(conn)
+                created.append(index.name)
+    return created
+
+def upgrade_analytics(bind=engine) -> int:
+    """
+    Fill the analytics tables of a database that already had results before
+    they existed. Returns the number of submissions counted.
+    """
+    with Session(bind) as db:
+        if db.scalar(select(TestAnalytics.test_id).limit(1)) is not None:
+            return 0
+        if db.scalar(select(TestResult.id).limit(1)) is None:
+            return 0
+        submissions = rebuild_analytics(db)
+        db.commit()
+    if submissions:
+        print(f"✅ Analytics rebuilt from {submissions} results")
+    return submissions
+
+def upgrade_schema(bind=engine):
+    """Create missing tables and indexes"""
+    Base.metadata.create_all(bind=bind)
+    created = upgrade_indexes(bind)
+    if created:
+        print(f"✅ Created indexes: {', '.join(created)}")
+
+def fix_role_values(bind=engine):
+    """Uppercase role values stored by early versions ('student' -> 'STUDENT')"""
+    if bind.dialect.name != "sqlite":
+        # Native enum columns cannot hold the lowercase values
+        return
+    fixed = 0
+    with bind.begin() as conn:
+        for role in UserRole:
+            result = conn.execute(
+                text("UPDATE users SET role = :name WHERE role = :value"),
+                {"name": role.name, "value": role.value}
+            )
+            fixed += result.rowcount
+    if fixed:
+        print(f"🔧 Fixed {fixed} role enum values in database")
+
+def seed_admin(bind=engine):
+    """Create the initial teacher account unless a teacher already exists"""
+    with Session(bind) as db:
+        if db.scalar(select(User.id).where(User.role == UserRole.TEACHER).limit(1)) is not None:
+            return
+        db.add(User(
+            username="admin",
+            password_hash=hash_password("admin123"),
+            role=UserRole.TEACHER,
+            name="Administrator"
+        ))
+        db.commit()
+    print("✅ Initial teacher account created:")
+    print("   Username: admin")
+    print("   Password: admin123")
+    print("   ⚠️  Please change the password after first login!")
+
+def seed_categories(bind=engine):
+    """Create the default categories on a database without any"""
+    with Session(bind) as db:
+        if db.scalar(select(Category.id).limit(1)) is not None:
+            return
+        db.add_all([Category(name=name) for name in DEFAULT_CATEGORIES])
+        db.commit()
+    print("✅ Default categories created")
+
+def schema_fingerprint(metadata=Base.metadata) -> str:
+    """Hash of every table, column and index of the models; changes with the models"""
+    parts = []
+    for table in metadata.sorted_tables:
+        parts.append(f"table {table.name}")
+        for column in table.columns:
+            parts.append(f"column {column.name} {column.type} {column.nullable} {column.primary_key}")
+        for index in sorted(table.indexes, key=lambda ix: ix.name):
+            parts.append(f"index {index.name} {[column.name for column in index.columns]} {index.unique}")
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()[:16]
+
+def bootstrap_steps() -> List[Tuple[str, Callable]]:
+    """
+    Steps in the order they run. The schema step is named after the model
+    fingerprint, so it runs again after every model change; the data steps
+    run once per database.
+    """
+    return [
+        (f"schema-{schema_fingerprint()}", upgrade_schema),
+        ("backfill-analytics", upgrade_analytics),
+        ("fix-role-values", fix_role_values),
+        ("seed-admin", seed_admin),
+        ("seed-categories", seed_categories),
+    ]
+
+def applied_migrations(bind=engine) -> Set[str]:
+    try:
+        with bind.connect() as conn:
+            return set(conn.scalars(select(SchemaMigration.name)))
+    except (OperationalError, ProgrammingError):
+        # No schema_migrations table yet: a new database, or one set up before it existed
+        return set()
+
+def bootstrap(bind=engine) -> List[str]:
+    """
+    Bring the database up to date and return the names of the steps run.
+    On an up-to-date database this is a single SELECT of schema_migrations;
+    otherwise the missing steps run under schema_lock, each recorded as it
+    finishes, so worker processes starting together run every step once.
+    """
+    steps = bootstrap_steps()
+    if {name for name, _ in steps} <= applied_migrations(bind):
+        return []
+
+    ran = []
+    with schema_lock(bind):
+        # Another process may have finished while this one waited for the lock
+        applied = applied_migrations(bind)
+        for name, step in steps:
+            if name in applied:
+                continue
+            step(bind)
+            with bind.begin() as conn:
+                conn.execute(insert(SchemaMigration).values(name=name))
+            ran.append(name)
+    return ran
+
+if __name__ == "__main__":
+    if "--dedupe-results" in sys.argv[1:]:
+        results, answers = dedupe_results()
+        print(f"🔧 Удалено повторных результатов: {results}, ответов к ним: {answers}")
+    try:
+        ran = bootstrap()
+    except DuplicateResultsError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    if ran:
+        print(f"✅ Выполнены шаги: {', '.join(ran)}")
+    else:
+        print("✅ Схема уже актуальна")
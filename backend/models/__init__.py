@@ -4,5 +4,14 @@ from .test import Test
 from .question import Question
 from .student_answer import StudentAnswer
 from .test_result import TestResult
+from .analytics import TestAnalytics, TestScoreBucket, TestCategoryAnalytics, QuestionOptionCount
+from .exam_attempt import ExamAttempt, AttemptAnswer
+from .cache_version import CacheVersion
+from .schema_migration import SchemaMigration
+from .import_job import ImportJob
 
-__all__ = ["User", "Category", "Test", "Question", "StudentAnswer", "TestResult"]
\ No newline at end of file
+__all__ = [
+    "User", "Category", "Test", "Question", "StudentAnswer", "TestResult",
+    "TestAnalytics", "TestScoreBucket", "TestCategoryAnalytics", "QuestionOptionCount",
+    "ExamAttempt", "AttemptAnswer", "CacheVersion", "SchemaMigration", "ImportJob"
+]
\ No newline at end of file
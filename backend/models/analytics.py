@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Float
+from database import Base
+
+# Aggregates maintained incrementally by submit_test (see services/analytics.py)
+
+class TestAnalytics(Base):
+    __tablename__ = "test_analytics"
+
+    test_id = Column(Integer, ForeignKey("tests.id"), primary_key=True)
+    submissions = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0)
+    score_squares_sum = Column(Float, nullable=False, default=0)
+
+class TestScoreBucket(Base):
+    __tablename__ = "test_score_buckets"
+
+    test_id = Column(Integer, ForeignKey("tests.id"), primary_key=True)
+    bucket = Column(Integer, primary_key=True)  # 0 = 0-10%, ..., 9 = 90-100%
+    count = Column(Integer, nullable=False, default=0)
+
+class TestCategoryAnalytics(Base):
+    __tablename__ = "test_category_analytics"
+
+    test_id = Column(Integer, ForeignKey("tests.id"), primary_key=True)
+    category = Column(String, primary_key=True)  # Category name as in category_breakdown
+    submissions = Column(Integer, nullable=False, default=0)
+    correct = Column(Integer, nullable=False, default=0)
+    total = Column(Integer, nullable=False, default=0)
+    percentage_sum = Column(Float, nullable=False, default=0)
+
+class QuestionOptionCount(Base):
+    __tablename__ = "question_option_counts"
+
+    question_id = Column(Integer, ForeignKey("questions.id"), primary_key=True)
+    answer = Column(String, primary_key=True)
+    test_id = Column(Integer, ForeignKey("tests.id"), nullable=False, index=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, String
+from database import Base
+
+# Cross-process cache invalidation (see services/cache_sync.py): one row per
+# invalidated key, stamped with the next value of a single global version
+
+class CacheVersion(Base):
+    __tablename__ = "cache_versions"
+
+    key = Column(String, primary_key=True)  # e.g. "test:12", "all", "principal:5"
+    version = Column(Integer, nullable=False, index=True)
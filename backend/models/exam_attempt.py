@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
+from sqlalchemy.sql import func
+from database import Base
+
+# Server-side exam sessions: answers are autosaved while the exam is taken
+# and graded from here on finalize (see services/exam_sessions.py)
+
+class ExamAttempt(Base):
+    __tablename__ = "exam_attempts"
+    __table_args__ = (
+        # One attempt per student and test, like test_results
+        Index("uq_exam_attempts_user_test", "user_id", "test_id", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    test_id = Column(Integer, ForeignKey("tests.id"), nullable=False, index=True)
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True))
+    result_id = Column(Integer, ForeignKey("test_results.id"))
+
+class AttemptAnswer(Base):
+    __tablename__ = "attempt_answers"
+
+    attempt_id = Column(Integer, ForeignKey("exam_attempts.id"), primary_key=True)
+    question_id = Column(Integer, primary_key=True)
+    answer = Column(String, nullable=False)
+    # Client-side change counter; an older autosave never overwrites a newer one
+    revision = Column(Integer, nullable=False, default=0)
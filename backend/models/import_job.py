@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, JSON, DateTime, Float
+from sqlalchemy.sql import func
+from database import Base
+
+# Background question imports (see services/import_jobs.py); kept in the
+# database so a status query can be answered by any worker process
+
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+
+    id = Column(String, primary_key=True)
+    test_id = Column(Integer, ForeignKey("tests.id"), nullable=False)
+    filename = Column(String, nullable=False)
+    format = Column(String, nullable=False)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    status = Column(String, nullable=False, default="queued", index=True)  # queued, running, completed, failed
+    rows_processed = Column(Integer, nullable=False, default=0)
+    rows_imported = Column(Integer, nullable=False, default=0)
+    rows_failed = Column(Integer, nullable=False, default=0)
+    categories_created = Column(Integer, nullable=False, default=0)
+    progress = Column(Float)
+    errors = Column(JSON, nullable=False, default=list)  # [[row, message], ...]
+    error = Column(String)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True))
+    # Uploaded file, removed when the job finishes
+    path = Column(String, nullable=False, default="")
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
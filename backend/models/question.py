@@ -6,8 +6,8 @@ class Question(Base):
     __tablename__ = "questions"
 
     id = Column(Integer, primary_key=True, index=True)
-    test_id = Column(Integer, ForeignKey("tests.id"), nullable=False)
-    category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
+    test_id = Column(Integer, ForeignKey("tests.id"), nullable=False, index=True)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=False, index=True)
     text = Column(Text, nullable=False)
     image_url = Column(String)
     table_data = Column(JSON)  # Store table data as JSON
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+from database import Base
+
+# Bootstrap steps already applied to this database (see migrations.bootstrap)
+
+class SchemaMigration(Base):
+    __tablename__ = "schema_migrations"
+
+    name = Column(String, primary_key=True)  # e.g. "schema-3f2a...", "seed-admin"
+    applied_at = Column(DateTime(timezone=True), server_default=func.now())
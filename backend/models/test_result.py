@@ -1,14 +1,20 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, JSON, DateTime, Float
+from sqlalchemy import Column, Integer, String, ForeignKey, JSON, DateTime, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
 
 class TestResult(Base):
     __tablename__ = "test_results"
+    __table_args__ = (
+        # One submission per student and test
+        Index("uq_test_results_user_test", "user_id", "test_id", unique=True),
+        # Class overview sorted by score, and its percentiles
+        Index("ix_test_results_test_score", "test_id", "score"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    test_id = Column(Integer, ForeignKey("tests.id"), nullable=False)
+    test_id = Column(Integer, ForeignKey("tests.id"), nullable=False, index=True)
     score = Column(Float, nullable=False)  # Overall score percentage
     category_breakdown = Column(JSON)  # Category-wise performance
     recommendation = Column(String)  # Teacher's recommendation
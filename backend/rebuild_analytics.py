@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Пересчет таблиц аналитики (ответы по вопросам, категории, распределение баллов)
+по сохраненным результатам и ответам студентов.
+Использование: python rebuild_analytics.py [test_id]
+"""
+
+import sys
+from sqlalchemy.orm import Session
+from database import engine, Base
+from models.test import Test
+from services.analytics import rebuild_analytics
+
+def rebuild(test_id: int = None) -> bool:
+    """Пересчитывает аналитику одного теста или всех тестов"""
+    Base.metadata.create_all(bind=engine)
+    
+    with Session(engine) as db:
+        if test_id is not None and db.get(Test, test_id) is None:
+            print(f"❌ Тест с ID {test_id} не найден!")
+            return False
+        
+        # Старые данные удаляются и пересчитываются в одной транзакции
+        submissions = rebuild_analytics(db, test_id)
+        db.commit()
+    
+    target = f"теста {test_id}" if test_id is not None else "всех тестов"
+    print(f"✅ Аналитика {target} пересчитана: учтено результатов: {submissions}")
+    return True
+
+if __name__ == "__main__":
+    test_id = None
+    if len(sys.argv) > 1:
+        try:
+            test_id = int(sys.argv[1])
+        except ValueError:
+            print("❌ Неверный ID теста!")
+            sys.exit(1)
+    
+    if not rebuild(test_id):
+        sys.exit(1)
@@ -1,5 +1,6 @@
 from .auth import router as auth_router
 from .teachers import router as teachers_router
 from .students import router as students_router
+from .exam_sessions import router as exam_sessions_router
 
-__all__ = ["auth_router", "teachers_router", "students_router"]
\ No newline at end of file
+__all__ = ["auth_router", "teachers_router", "students_router", "exam_sessions_router"]
\ No newline at end of file
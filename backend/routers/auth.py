@@ -1,16 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from database import get_db
 from models.user import User
 from schemas.user import UserLogin
-from auth.password import verify_password
+from auth.password import verify_password_async, HashingPoolBusy
 from auth.jwt_handler import create_access_token
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
 @router.post("/login")
-def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == user_credentials.username).first()
+async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
+    def find_user():
+        user = db.query(User).filter(User.username == user_credentials.username).first()
+        # The connection goes back to the pool before bcrypt runs
+        db.close()
+        return user
+    
+    user = await run_in_threadpool(find_user)
     
     if not user:
         raise HTTPException(
@@ -18,7 +25,17 @@ def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
             detail="Invalid credentials",
         )
     
-    if not verify_password(user_credentials.password, user.password_hash):
+    # bcrypt runs on the dedicated hashing pool, not on the request threadpool
+    try:
+        password_ok = await verify_password_async(user_credentials.password, user.password_hash)
+    except HashingPoolBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts, please retry",
+            headers={"Retry-After": "1"},
+        )
+    
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
@@ -37,4 +54,4 @@ def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
             "role": user.role.value,
             "name": user.name
         }
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,77 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from database import get_db
+from models.user import User
+from schemas.exam_session import AttemptAnswerSave, ExamAttemptResponse
+from schemas.test_result import TestResultResponse
+from dependencies.auth_dependencies import require_student
+from services.grading import InvalidAnswerError
+from services.exam_sessions import (
+    AttemptNotFound, AttemptFinished, TestAlreadySubmitted,
+    start_attempt, load_attempt, autosave_answer, finalize_attempt
+)
+
+# Server-side exam sessions: answers are autosaved one by one during the
+# exam and graded from the stored copy on finalize
+router = APIRouter(prefix="/student", tags=["exam sessions"])
+
+@router.post("/tests/{test_id}/attempts", response_model=ExamAttemptResponse)
+def start_exam_attempt(
+    test_id: int,
+    db: Session = Depends(get_db),
+    current_student: User = Depends(require_student)
+):
+    # Returns the already started attempt (with its saved answers) after a reload
+    try:
+        return start_attempt(db, current_student.id, test_id)
+    except AttemptNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except TestAlreadySubmitted as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/attempts/{attempt_id}", response_model=ExamAttemptResponse)
+def get_exam_attempt(
+    attempt_id: int,
+    db: Session = Depends(get_db),
+    current_student: User = Depends(require_student)
+):
+    try:
+        return load_attempt(db, current_student.id, attempt_id)
+    except AttemptNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.patch("/attempts/{attempt_id}/answers/{question_id}", status_code=status.HTTP_204_NO_CONTENT)
+def save_exam_answer(
+    attempt_id: int,
+    question_id: int,
+    answer: AttemptAnswerSave,
+    db: Session = Depends(get_db),
+    current_student: User = Depends(require_student)
+):
+    # Idempotent: repeating the same save (e.g. a client retry) is harmless
+    try:
+        autosave_answer(db, current_student.id, attempt_id, question_id, answer.answer, answer.revision)
+    except AttemptNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except AttemptFinished as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except InvalidAnswerError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.post("/attempts/{attempt_id}/finalize", response_model=TestResultResponse)
+def finalize_exam_attempt(
+    attempt_id: int,
+    db: Session = Depends(get_db),
+    current_student: User = Depends(require_student)
+):
+    try:
+        return finalize_attempt(db, current_student.id, attempt_id)
+    except AttemptNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Test already submitted"
+        )
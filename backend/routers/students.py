@@ -1,28 +1,63 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Header, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Dict, Any, Optional
 from database import get_db
 from models.user import User
 from models.test import Test
 from models.question import Question
 from models.student_answer import StudentAnswer
 from models.test_result import TestResult
-from models.category import Category
 from schemas.test import TestResponse
 from schemas.question import QuestionResponse
 from schemas.test_result import TestSubmission, TestResultResponse
 from schemas.student_answer import StudentAnswerResponse
+from schemas.submission import SubmissionReceiptResponse
 from dependencies.auth_dependencies import require_student, get_current_user
+from dependencies.pagination import page_params, list_page
+from services.grading import get_answer_key, grade_submission, save_graded_submission, InvalidAnswerError
+from services.question_payloads import get_student_payload
+from services.pagination import PageParams, SortOrder
+from services.submission_queue import Submission, SubmissionError, SubmissionTestNotFound, submission_queue
+from services.write_queue import run_write
 
 router = APIRouter(prefix="/student", tags=["students"])
 
+# Sort fields of the paginated lists besides "id"
+AVAILABLE_TEST_ORDER = SortOrder(Test.id, {"title": Test.title})
+RESULT_ORDER = SortOrder(TestResult.id, {"test_id": TestResult.test_id, "score": TestResult.score})
+
+def my_results_query(user_id: int, test_id: Optional[int] = None):
+    query = select(TestResult).where(TestResult.user_id == user_id)
+    if test_id:
+        query = query.where(TestResult.test_id == test_id)
+    return query
+
+def receipt_response(submission: Submission) -> JSONResponse:
+    # 202 while the submission waits for a grading worker
+    receipt = SubmissionReceiptResponse.model_validate(submission)
+    return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=jsonable_encoder(receipt))
+
+def submission_error(e: Exception) -> HTTPException:
+    if isinstance(e, SubmissionTestNotFound):
+        return HTTPException(status_code=404, detail=str(e))
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
 @router.get("/available-tests/", response_model=List[TestResponse])
 def get_available_tests(
+    response: Response,
+    search: Optional[str] = None,
+    page: PageParams = Depends(page_params),
     db: Session = Depends(get_db),
     current_student: User = Depends(require_student)
 ):
-    tests = db.query(Test).all()
-    return tests
+    query = select(Test).options(selectinload(Test.questions))
+    if search:
+        query = query.where(or_(Test.title.ilike(f"%{search}%"), Test.description.ilike(f"%{search}%")))
+    return list_page(db, response, query, AVAILABLE_TEST_ORDER, page)
 
 
 
@@ -30,113 +65,76 @@ def get_available_tests(
 @router.get("/test/{test_id}/questions", response_model=List[QuestionResponse])
 def get_test_questions(
     test_id: int,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_student: User = Depends(require_student)
 ):
-    test = db.query(Test).filter(Test.id == test_id).first()
-    if not test:
+    # Correct answers are hidden and "Не знаю" is added once per test, not per request
+    payload = get_student_payload(db, test_id)
+    if payload is None:
         raise HTTPException(status_code=404, detail="Test not found")
     
-    questions = db.query(Question).filter(Question.test_id == test_id).all()
-    
-    # Hide correct answers from students during test and add "Не знаю" option
-    for question in questions:
-        question.correct_answer = None
-        # Add "Не знаю" option if it's not already present
-        if "Не знаю" not in question.options:
-            question.options.append("Не знаю")
+    headers = {"ETag": payload.etag, "Cache-Control": "private, no-cache"}
+    if payload.matches(if_none_match):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
     
-    return questions
+    return Response(content=payload.body, media_type="application/json", headers=headers)
 
-@router.post("/submit-test/", response_model=TestResultResponse)
+@router.post(
+    "/submit-test/",
+    response_model=TestResultResponse,
+    responses={202: {"model": SubmissionReceiptResponse}}
+)
 def submit_test(
     submission: TestSubmission,
     db: Session = Depends(get_db),
     current_student: User = Depends(require_student)
 ):
-    # Check if test exists
-    test = db.query(Test).filter(Test.id == submission.test_id).first()
-    if not test:
-        raise HTTPException(status_code=404, detail="Test not found")
+    if submission_queue is not None:
+        # Journal the validated submission and answer with a receipt; the
+        # result appears under /student/results/{test_id} once graded
+        try:
+            return receipt_response(
+                submission_queue.submit(db, current_student.id, submission.test_id, submission.answers)
+            )
+        except (SubmissionError, InvalidAnswerError) as e:
+            raise submission_error(e)
     
-    # Check if student has already submitted this test
-    existing_result = db.query(TestResult).filter(
-        TestResult.user_id == current_student.id,
-        TestResult.test_id == submission.test_id
-    ).first()
+    # Cached answer key; None means the test does not exist
+    answer_key = get_answer_key(db, submission.test_id)
+    if answer_key is None:
+        raise HTTPException(status_code=404, detail="Test not found")
     
-    if existing_result:
+    # Grade the whole submission in memory
+    try:
+        graded = grade_submission(answer_key, current_student.id, submission.answers)
+    except InvalidAnswerError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Test already submitted"
+            detail=str(e)
         )
     
-    # Get all questions for this test
-    questions = db.query(Question).filter(Question.test_id == submission.test_id).all()
-    questions_dict = {q.id: q for q in questions}
-    
-    # Process answers and calculate score
-    correct_answers = 0
-    total_questions = len(questions)
-    category_scores = {}
-    
-    for answer in submission.answers:
-        question = questions_dict.get(answer.question_id)
-        if not question:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid question ID: {answer.question_id}"
-            )
-        
-        is_correct = answer.answer == question.correct_answer
-        if is_correct:
-            correct_answers += 1
-        
-        # Track category performance
-        category = db.query(Category).filter(Category.id == question.category_id).first()
-        if category:
-            if category.name not in category_scores:
-                category_scores[category.name] = {"correct": 0, "total": 0}
-            category_scores[category.name]["total"] += 1
-            if is_correct:
-                category_scores[category.name]["correct"] += 1
-        
-        # Save student answer
-        student_answer = StudentAnswer(
-            user_id=current_student.id,
-            question_id=answer.question_id,
-            answer=answer.answer,
-            is_correct=is_correct
+    # Save student answers in one bulk insert together with the test result;
+    # on SQLite the write goes through the single-writer queue. A repeated
+    # submission is rejected by the unique (user_id, test_id) index.
+    try:
+        test_result = run_write(
+            db,
+            lambda session: save_graded_submission(session, current_student.id, submission.test_id, graded)
+        )
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Test already submitted"
         )
-        db.add(student_answer)
-    
-    # Calculate overall score
-    score = (correct_answers / total_questions) * 100 if total_questions > 0 else 0
-    
-    # Calculate category breakdown
-    category_breakdown = {}
-    for category_name, scores in category_scores.items():
-        percentage = (scores["correct"] / scores["total"]) * 100 if scores["total"] > 0 else 0
-        category_breakdown[category_name] = {
-            "correct": scores["correct"],
-            "total": scores["total"],
-            "percentage": percentage
-        }
-    
-    # Save test result
-    test_result = TestResult(
-        user_id=current_student.id,
-        test_id=submission.test_id,
-        score=score,
-        category_breakdown=category_breakdown
-    )
-    db.add(test_result)
-    db.commit()
-    db.refresh(test_result)
     
     return test_result
 
-@router.get("/results/{test_id}", response_model=TestResultResponse)
+@router.get(
+    "/results/{test_id}",
+    response_model=TestResultResponse,
+    responses={202: {"model": SubmissionReceiptResponse}}
+)
 def get_test_result(
     test_id: int,
     db: Session = Depends(get_db),
@@ -147,11 +145,29 @@ def get_test_result(
         TestResult.test_id == test_id
     ).first()
     
+    if not test_result and submission_queue is not None:
+        # Submitted through the queue: pending (202 with the receipt) or rejected by grading
+        queued = submission_queue.latest(current_student.id, test_id)
+        if queued is not None and queued.status == "pending":
+            return receipt_response(queued)
+        if queued is not None and queued.status == "failed":
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=queued.error)
+    
     if not test_result:
         raise HTTPException(status_code=404, detail="Test result not found")
     
     return test_result
 
+@router.get("/submissions/{receipt_id}", response_model=SubmissionReceiptResponse)
+def get_submission(
+    receipt_id: str,
+    current_student: User = Depends(require_student)
+):
+    submission = submission_queue.get(current_student.id, receipt_id) if submission_queue is not None else None
+    if submission is None:
+        raise HTTPException(status_code=404, detail="Submission not found")
+    return submission
+
 @router.get("/results/{test_id}/detailed")
 def get_detailed_result(
     test_id: int,
@@ -199,8 +215,10 @@ def get_detailed_result(
 
 @router.get("/my-results/", response_model=List[TestResultResponse])
 def get_my_results(
+    response: Response,
+    test_id: Optional[int] = None,
+    page: PageParams = Depends(page_params),
     db: Session = Depends(get_db),
     current_student: User = Depends(require_student)
 ):
-    results = db.query(TestResult).filter(TestResult.user_id == current_student.id).all()
-    return results
\ No newline at end of file
+    return list_page(db, response, my_results_query(current_student.id, test_id), RESULT_ORDER, page)
\ No newline at end of file
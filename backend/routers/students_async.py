@@ -0,0 +1,99 @@
+from fastapi import APIRouter, Depends, HTTPException, Header, Response, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from database import get_async_db
+from models.user import User
+from schemas.question import QuestionResponse
+from schemas.test_result import TestSubmission, TestResultResponse
+from schemas.submission import SubmissionReceiptResponse
+from dependencies.auth_dependencies import require_student
+from dependencies.pagination import page_params, list_page_async
+from services.grading import (
+    get_answer_key_async, grade_submission, save_graded_submission, save_graded_submission_async,
+    InvalidAnswerError
+)
+from services.pagination import PageParams
+from services.question_payloads import get_student_payload_async
+from services.submission_queue import SubmissionError, submission_queue
+from services.write_queue import write_queue
+from routers.students import RESULT_ORDER, my_results_query, receipt_response, submission_error
+
+# Async versions of the hot student endpoints, mounted ahead of the sync
+# router in main.py when ASYNC_DB is enabled
+router = APIRouter(prefix="/student", tags=["students"])
+
+@router.get("/test/{test_id}/questions", response_model=List[QuestionResponse])
+async def get_test_questions_async(
+    test_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_student: User = Depends(require_student)
+):
+    payload = await get_student_payload_async(db, test_id)
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Test not found")
+    
+    headers = {"ETag": payload.etag, "Cache-Control": "private, no-cache"}
+    if payload.matches(if_none_match):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    return Response(content=payload.body, media_type="application/json", headers=headers)
+
+@router.post(
+    "/submit-test/",
+    response_model=TestResultResponse,
+    responses={202: {"model": SubmissionReceiptResponse}}
+)
+async def submit_test_async(
+    submission: TestSubmission,
+    db: AsyncSession = Depends(get_async_db),
+    current_student: User = Depends(require_student)
+):
+    if submission_queue is not None:
+        try:
+            return receipt_response(
+                await submission_queue.submit_async(db, current_student.id, submission.test_id, submission.answers)
+            )
+        except (SubmissionError, InvalidAnswerError) as e:
+            raise submission_error(e)
+    
+    answer_key = await get_answer_key_async(db, submission.test_id)
+    if answer_key is None:
+        raise HTTPException(status_code=404, detail="Test not found")
+    
+    try:
+        graded = grade_submission(answer_key, current_student.id, submission.answers)
+    except InvalidAnswerError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    try:
+        if write_queue is not None:
+            # SQLite: hand the write to the single-writer queue instead of the async engine
+            return await write_queue.run_async(
+                lambda session: save_graded_submission(session, current_student.id, submission.test_id, graded)
+            )
+        
+        test_result = await save_graded_submission_async(db, current_student.id, submission.test_id, graded)
+        await db.commit()
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Test already submitted"
+        )
+    await db.refresh(test_result)
+    
+    return test_result
+
+@router.get("/my-results/", response_model=List[TestResultResponse])
+async def get_my_results_async(
+    response: Response,
+    test_id: Optional[int] = None,
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
+    current_student: User = Depends(require_student)
+):
+    return await list_page_async(db, response, my_results_query(current_student.id, test_id), RESULT_ORDER, page)
@@ -1,66 +1,120 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from typing import List
-import csv
-import io
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional
 from database import get_db
 from models.user import User, UserRole
 from models.category import Category
 from models.test import Test
 from models.question import Question
-from models.student_answer import StudentAnswer
 from models.test_result import TestResult
-from schemas.user import UserCreate, UserResponse
+from schemas.user import UserCreate, UserResponse, UserRole as UserRoleFilter
 from schemas.category import CategoryCreate, CategoryResponse
 from schemas.test import TestCreate, TestResponse, TestUpdate
 from schemas.question import QuestionCreate, QuestionResponse, QuestionUpdate
 from schemas.test_result import TestResultResponse
+from schemas.import_job import ImportJobResponse
+from schemas.statistics import QuestionBankStatsResponse
+from schemas.analytics import TestAnalyticsResponse
+from schemas.item_analysis import TestItemAnalysisResponse
+from schemas.student_review import StudentResultsResponse, StudentTestReviewResponse
+from schemas.class_results import ClassResultsResponse
 from dependencies.auth_dependencies import require_teacher
-from auth.password import hash_password
+from dependencies.pagination import page_params, list_page
+from auth.password import hash_password_async, HashingPoolBusy
+from services.cache import invalidate_test, invalidate_all
+from services.exports import (
+    ExportFormat, EXPORTERS, EXPORT_MEDIA_TYPES,
+    has_results, export_category_names, export_filename, content_disposition
+)
+from services.import_jobs import import_jobs, upload_format, UploadTooLarge
+from services.statistics import get_question_bank_stats, invalidate_statistics
+from services.analytics import load_test_analytics, delete_test_analytics
+from services.item_analysis import get_item_analysis
+from services.pagination import PageParams, SortOrder, InvalidPageRequest
+from services.class_results import load_class_results
+from services.exam_sessions import delete_test_attempts
+from services.student_review import ReviewNotFound, load_student_results, load_student_test_review
 
 router = APIRouter(prefix="/teacher", tags=["teachers"])
 
+# Sort fields of the paginated lists besides "id"
+USER_ORDER = SortOrder(User.id, {"username": User.username, "name": User.name})
+TEST_ORDER = SortOrder(Test.id, {"title": Test.title, "created_by": Test.created_by})
+QUESTION_ORDER = SortOrder(Question.id, {
+    "test_id": Question.test_id, "category_id": Question.category_id, "text": Question.text
+})
+
 # User Management
 @router.post("/users/", response_model=UserResponse)
-def create_user(
+async def create_user(
     user: UserCreate,
     db: Session = Depends(get_db),
     current_teacher: User = Depends(require_teacher)
 ):
+    def username_taken() -> bool:
+        taken = db.query(User.id).filter(User.username == user.username).first() is not None
+        # The connection is not held while bcrypt runs
+        db.close()
+        return taken
+    
     # Check if username already exists
-    existing_user = db.query(User).filter(User.username == user.username).first()
-    if existing_user:
+    if await run_in_threadpool(username_taken):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered"
         )
     
     # Convert role string to proper enum value to ensure consistency
-    from models.user import UserRole
     if isinstance(user.role, str):
         role_value = UserRole.STUDENT if user.role.lower() == 'student' else UserRole.TEACHER
     else:
         role_value = user.role
     
-    db_user = User(
-        username=user.username,
-        password_hash=hash_password(user.password),
-        role=role_value,  # Use the proper enum value
-        name=user.name
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
+    # bcrypt runs on the dedicated hashing pool, not on the request threadpool
+    try:
+        password_hash = await hash_password_async(user.password)
+    except HashingPoolBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, please retry",
+            headers={"Retry-After": "1"},
+        )
+    
+    def save() -> User:
+        db_user = User(
+            username=user.username,
+            password_hash=password_hash,
+            role=role_value,  # Use the proper enum value
+            name=user.name
+        )
+        db.add(db_user)
+        db.commit()
+        db.refresh(db_user)
+        if db_user.role == UserRole.TEACHER:
+            invalidate_statistics()
+        return db_user
+    
+    return await run_in_threadpool(save)
 
 @router.get("/users/", response_model=List[UserResponse])
 def get_users(
+    response: Response,
+    role: Optional[UserRoleFilter] = None,
+    search: Optional[str] = None,
+    page: PageParams = Depends(page_params),
     db: Session = Depends(get_db),
     current_teacher: User = Depends(require_teacher)
 ):
-    users = db.query(User).all()
-    return users
+    # Keyset-paginated with ?limit=&cursor=&sort=; totals and next cursor in headers
+    query = select(User)
+    if role:
+        query = query.where(User.role == UserRole(role.value))
+    if search:
+        query = query.where(or_(User.username.ilike(f"%{search}%"), User.name.ilike(f"%{search}%")))
+    return list_page(db, response, query, USER_ORDER, page)
 
 # Category Management
 @router.post("/categories/", response_model=CategoryResponse)
@@ -73,6 +127,7 @@ def create_category(
     db.add(db_category)
     db.commit()
     db.refresh(db_category)
+    invalidate_statistics()
     return db_category
 
 @router.get("/categories/", response_model=List[CategoryResponse])
@@ -97,6 +152,8 @@ def update_category(
     db_category.name = category.name
     db.commit()
     db.refresh(db_category)
+    # Category names are part of every cached answer key
+    invalidate_all()
     return db_category
 
 @router.delete("/categories/{category_id}")
@@ -111,6 +168,7 @@ def delete_category(
     
     db.delete(db_category)
     db.commit()
+    invalidate_all()
     return {"message": "Category deleted successfully"}
 
 # Test Management
@@ -128,15 +186,25 @@ def create_test(
     db.add(db_test)
     db.commit()
     db.refresh(db_test)
+    invalidate_statistics()
     return db_test
 
 @router.get("/tests/", response_model=List[TestResponse])
 def get_tests(
+    response: Response,
+    search: Optional[str] = None,
+    created_by: Optional[int] = None,
+    page: PageParams = Depends(page_params),
     db: Session = Depends(get_db),
     current_teacher: User = Depends(require_teacher)
 ):
-    tests = db.query(Test).all()
-    return tests
+    # Questions of the whole page are loaded in one extra query
+    query = select(Test).options(selectinload(Test.questions))
+    if search:
+        query = query.where(or_(Test.title.ilike(f"%{search}%"), Test.description.ilike(f"%{search}%")))
+    if created_by:
+        query = query.where(Test.created_by == created_by)
+    return list_page(db, response, query, TEST_ORDER, page)
 
 @router.get("/tests/{test_id}", response_model=TestResponse)
 def get_test(
@@ -167,6 +235,7 @@ def update_test(
     
     db.commit()
     db.refresh(db_test)
+    invalidate_statistics()
     return db_test
 
 @router.delete("/tests/{test_id}")
@@ -179,8 +248,11 @@ def delete_test(
     if not db_test:
         raise HTTPException(status_code=404, detail="Test not found")
     
+    delete_test_analytics(db, test_id)
+    delete_test_attempts(db, test_id)
     db.delete(db_test)
     db.commit()
+    invalidate_test(test_id)
     return {"message": "Test deleted successfully"}
 
 # Question Management
@@ -202,19 +274,27 @@ def create_question(
     db.add(db_question)
     db.commit()
     db.refresh(db_question)
+    invalidate_test(db_question.test_id)
     return db_question
 
 @router.get("/questions/", response_model=List[QuestionResponse])
 def get_questions(
+    response: Response,
     test_id: int = None,
+    category_id: Optional[int] = None,
+    search: Optional[str] = None,
+    page: PageParams = Depends(page_params),
     db: Session = Depends(get_db),
     current_teacher: User = Depends(require_teacher)
 ):
-    query = db.query(Question)
+    query = select(Question)
     if test_id:
-        query = query.filter(Question.test_id == test_id)
-    questions = query.all()
-    return questions
+        query = query.where(Question.test_id == test_id)
+    if category_id:
+        query = query.where(Question.category_id == category_id)
+    if search:
+        query = query.where(Question.text.ilike(f"%{search}%"))
+    return list_page(db, response, query, QUESTION_ORDER, page)
 
 @router.put("/questions/{question_id}", response_model=QuestionResponse)
 def update_question(
@@ -233,6 +313,7 @@ def update_question(
     
     db.commit()
     db.refresh(db_question)
+    invalidate_test(db_question.test_id)
     return db_question
 
 @router.delete("/questions/{question_id}")
@@ -245,79 +326,122 @@ def delete_question(
     if not db_question:
         raise HTTPException(status_code=404, detail="Question not found")
     
+    test_id = db_question.test_id
     db.delete(db_question)
     db.commit()
+    invalidate_test(test_id)
     return {"message": "Question deleted successfully"}
 
-# Student Review
-@router.get("/student/{user_id}/test/{test_id}")
-def get_student_test_answers(
-    user_id: int,
+# Bulk question import (CSV, JSON or XLSX), processed in the background
+@router.post("/tests/{test_id}/import", response_model=ImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def import_questions(
     test_id: int,
+    file: UploadFile = File(...),
     db: Session = Depends(get_db),
     current_teacher: User = Depends(require_teacher)
 ):
-    student = db.query(User).filter(User.id == user_id, User.role == UserRole.STUDENT).first()
-    if not student:
-        raise HTTPException(status_code=404, detail="Student not found")
-    
     test = db.query(Test).filter(Test.id == test_id).first()
     if not test:
         raise HTTPException(status_code=404, detail="Test not found")
+    db.close()
     
-    # Get all questions for this test
-    questions = db.query(Question).filter(Question.test_id == test_id).all()
-    
-    # Get student's answers
-    answers = db.query(StudentAnswer).filter(
-        StudentAnswer.user_id == user_id,
-        StudentAnswer.question_id.in_([q.id for q in questions])
-    ).all()
+    format = upload_format(file.filename)
+    if format is None:
+        raise HTTPException(status_code=400, detail="File type not allowed. Allowed types: .csv, .json, .xlsx")
     
-    # Get test result
-    test_result = db.query(TestResult).filter(
-        TestResult.user_id == user_id,
-        TestResult.test_id == test_id
-    ).first()
+    # Copied to disk in chunks; the import itself runs on a background worker
+    try:
+        path = import_jobs.save_upload(file.file, file.filename)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     
-    return {
-        "student": student,
-        "test": test,
-        "questions": questions,
-        "answers": answers,
-        "result": test_result
-    }
+    job = import_jobs.submit(test_id, path, file.filename, format, current_teacher.id)
+    return ImportJobResponse.from_job(job)
+
+@router.get("/tests/{test_id}/import/{job_id}", response_model=ImportJobResponse)
+def get_import_job(
+    test_id: int,
+    job_id: str,
+    current_teacher: User = Depends(require_teacher)
+):
+    job = import_jobs.get(job_id)
+    if not job or job.test_id != test_id:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return ImportJobResponse.from_job(job)
+
+# Question bank statistics (cached until questions, tests or categories change)
+@router.get("/statistics", response_model=QuestionBankStatsResponse)
+def get_statistics(
+    db: Session = Depends(get_db),
+    current_teacher: User = Depends(require_teacher)
+):
+    return get_question_bank_stats(db)
+
+# Item statistics from the incrementally maintained analytics tables
+@router.get("/tests/{test_id}/analytics", response_model=TestAnalyticsResponse)
+def get_test_analytics(
+    test_id: int,
+    db: Session = Depends(get_db),
+    current_teacher: User = Depends(require_teacher)
+):
+    test = db.query(Test).filter(Test.id == test_id).first()
+    if not test:
+        raise HTTPException(status_code=404, detail="Test not found")
+    return load_test_analytics(db, test_id)
+
+# Psychometric item analysis (difficulty, discrimination, KR-20, distractors)
+@router.get("/tests/{test_id}/item-analysis", response_model=TestItemAnalysisResponse)
+def get_test_item_analysis(
+    test_id: int,
+    db: Session = Depends(get_db),
+    current_teacher: User = Depends(require_teacher)
+):
+    test = db.query(Test).filter(Test.id == test_id).first()
+    if not test:
+        raise HTTPException(status_code=404, detail="Test not found")
+    return get_item_analysis(db, test_id)
+
+# Class overview: every student's result of a test plus score statistics
+@router.get("/tests/{test_id}/results", response_model=ClassResultsResponse)
+def get_test_results(
+    test_id: int,
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(get_db),
+    current_teacher: User = Depends(require_teacher)
+):
+    test = db.query(Test).filter(Test.id == test_id).first()
+    if not test:
+        raise HTTPException(status_code=404, detail="Test not found")
+    try:
+        return load_class_results(db, test_id, page)
+    except InvalidPageRequest as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+# Student Review
+@router.get("/student/{user_id}/test/{test_id}", response_model=StudentTestReviewResponse)
+def get_student_test_answers(
+    user_id: int,
+    test_id: int,
+    db: Session = Depends(get_db),
+    current_teacher: User = Depends(require_teacher)
+):
+    # Student with the result, test with its questions, then the answers
+    try:
+        return load_student_test_review(db, user_id, test_id)
+    except ReviewNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
-@router.get("/student/{user_id}/results")
+@router.get("/student/{user_id}/results", response_model=StudentResultsResponse)
 def get_student_results(
     user_id: int,
     db: Session = Depends(get_db),
     current_teacher: User = Depends(require_teacher)
 ):
-    # Get student
-    student = db.query(User).filter(User.id == user_id, User.role == UserRole.STUDENT).first()
-    if not student:
-        raise HTTPException(status_code=404, detail="Student not found")
-    
-    # Get all test results for this student
-    results = db.query(TestResult).filter(TestResult.user_id == user_id).all()
-    
-    # Get test details for each result
-    results_with_tests = []
-    for result in results:
-        test = db.query(Test).filter(Test.id == result.test_id).first()
-        results_with_tests.append({
-            "id": result.id,
-            "test_id": result.test_id,
-            "test_title": test.title if test else f"Test {result.test_id}",
-            "score": result.score,
-            "timestamp": result.timestamp
-        })
-    
-    return {
-        "student": student,
-        "results": results_with_tests
-    }
+    # Result summaries come with their test titles from one joined query
+    try:
+        return load_student_results(db, user_id)
+    except ReviewNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
 @router.put("/test-result/{result_id}/recommendation")
 def update_recommendation(
@@ -335,10 +459,11 @@ def update_recommendation(
     db.refresh(test_result)
     return test_result
 
-# Export test results to CSV
+# Export test results (CSV, Parquet, Arrow IPC or XLSX)
 @router.get("/tests/{test_id}/export-results")
 def export_test_results(
     test_id: int,
+    format: ExportFormat = ExportFormat.CSV,
     db: Session = Depends(get_db),
     current_teacher: User = Depends(require_teacher)
 ):
@@ -347,61 +472,16 @@ def export_test_results(
     if not test:
         raise HTTPException(status_code=404, detail="Test not found")
     
-    # Get all test results for this test
-    test_results = db.query(TestResult).filter(TestResult.test_id == test_id).all()
-    
-    if not test_results:
+    if not has_results(db, test_id):
         raise HTTPException(status_code=404, detail="No results found for this test")
     
-    # Get all categories used in this test to determine columns
-    questions = db.query(Question).filter(Question.test_id == test_id).all()
-    category_ids = list(set([q.category_id for q in questions if q.category_id]))
-    categories = db.query(Category).filter(Category.id.in_(category_ids)).all() if category_ids else []
-    category_names = [cat.name for cat in categories]
-    
-    # Create CSV data
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Write header
-    header = ["Name", "Username", "Overall Score (%)"] + [f"{cat_name} Score (%)" for cat_name in category_names]
-    writer.writerow(header)
-    
-    # Write data rows
-    for result in test_results:
-        user = result.user
-        row = [
-            user.name,
-            user.username,
-            f"{result.score:.1f}"
-        ]
-        
-        # Add category scores
-        category_breakdown = result.category_breakdown or {}
-        for cat_name in category_names:
-            # Find category score in breakdown
-            category_score = ""
-            if category_breakdown and cat_name in category_breakdown:
-                score_data = category_breakdown[cat_name]
-                if isinstance(score_data, dict) and 'percentage' in score_data:
-                    category_score = f"{score_data['percentage']:.1f}"
-                elif isinstance(score_data, (int, float)):
-                    category_score = f"{score_data:.1f}"
-                else:
-                    category_score = str(score_data) if score_data else ""
-            row.append(category_score)
-        
-        writer.writerow(row)
-    
-    # Prepare response
-    output.seek(0)
-    
-    # Create filename with test title
-    safe_title = "".join(c for c in test.title if c.isalnum() or c in (' ', '-', '_')).rstrip()
-    filename = f"{safe_title}_results.csv"
+    # Category columns come from the categories used in this test
+    category_names = export_category_names(db, test_id)
+    filename = export_filename(test.title, format.value)
     
+    # Rows are streamed page by page, so memory does not grow with the result count
     return StreamingResponse(
-        io.BytesIO(output.getvalue().encode('utf-8')),
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
-    )
\ No newline at end of file
+        EXPORTERS[format](test_id, category_names),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": content_disposition(filename)}
+    )
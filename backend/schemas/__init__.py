@@ -4,6 +4,14 @@ from .test import TestCreate, TestResponse, TestUpdate
 from .question import QuestionCreate, QuestionResponse, QuestionUpdate
 from .student_answer import StudentAnswerCreate, StudentAnswerResponse
 from .test_result import TestResultResponse, TestSubmission
+from .import_job import ImportJobResponse, ImportRowError
+from .statistics import QuestionBankStatsResponse
+from .analytics import TestAnalyticsResponse
+from .item_analysis import TestItemAnalysisResponse
+from .student_review import StudentResultsResponse, StudentTestReviewResponse
+from .class_results import ClassResultsResponse
+from .exam_session import AttemptAnswerSave, ExamAttemptResponse
+from .submission import SubmissionReceiptResponse
 
 __all__ = [
     "UserCreate", "UserResponse", "UserLogin",
@@ -11,5 +19,9 @@ __all__ = [
     "TestCreate", "TestResponse", "TestUpdate",
     "QuestionCreate", "QuestionResponse", "QuestionUpdate",
     "StudentAnswerCreate", "StudentAnswerResponse",
-    "TestResultResponse", "TestSubmission"
+    "TestResultResponse", "TestSubmission",
+    "ImportJobResponse", "ImportRowError",
+    "QuestionBankStatsResponse", "TestAnalyticsResponse", "TestItemAnalysisResponse",
+    "StudentResultsResponse", "StudentTestReviewResponse", "ClassResultsResponse",
+    "AttemptAnswerSave", "ExamAttemptResponse", "SubmissionReceiptResponse"
 ]
\ No newline at end of file
@@ -0,0 +1,53 @@
+from pydantic import BaseModel
+from typing import Optional, List
+
+class OptionAnalyticsResponse(BaseModel):
+    answer: str
+    count: int
+    is_correct: bool
+    share: float
+
+    class Config:
+        from_attributes = True
+
+class QuestionAnalyticsResponse(BaseModel):
+    id: int
+    text: str
+    category: Optional[str]
+    correct_answer: str
+    answered: int
+    correct: int
+    percent_correct: Optional[float]
+    options: List[OptionAnalyticsResponse]
+
+    class Config:
+        from_attributes = True
+
+class CategoryAnalyticsResponse(BaseModel):
+    name: str
+    submissions: int
+    correct: int
+    total: int
+    average_percentage: float
+
+    class Config:
+        from_attributes = True
+
+class ScoreBucketResponse(BaseModel):
+    label: str
+    count: int
+
+    class Config:
+        from_attributes = True
+
+class TestAnalyticsResponse(BaseModel):
+    test_id: int
+    submissions: int
+    average_score: Optional[float]
+    score_std: Optional[float]
+    score_distribution: List[ScoreBucketResponse]
+    categories: List[CategoryAnalyticsResponse]
+    questions: List[QuestionAnalyticsResponse]
+
+    class Config:
+        from_attributes = True
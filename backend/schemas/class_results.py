@@ -0,0 +1,39 @@
+from pydantic import BaseModel
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+from .analytics import ScoreBucketResponse
+
+class ClassResultRow(BaseModel):
+    id: int
+    user_id: int
+    username: str
+    name: str
+    score: float
+    category_breakdown: Optional[Dict[str, Any]]
+    recommendation: Optional[str]
+    timestamp: datetime
+
+    class Config:
+        from_attributes = True
+
+class ScoreSummaryResponse(BaseModel):
+    students: int
+    mean: Optional[float]
+    median: Optional[float]
+    std: Optional[float]
+    min: Optional[float]
+    max: Optional[float]
+    percentiles: Dict[str, float]
+    histogram: List[ScoreBucketResponse]
+
+    class Config:
+        from_attributes = True
+
+class ClassResultsResponse(BaseModel):
+    test_id: int
+    summary: ScoreSummaryResponse
+    results: List[ClassResultRow]
+    next_cursor: Optional[str]
+
+    class Config:
+        from_attributes = True
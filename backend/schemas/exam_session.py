@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import Optional, Dict
+from datetime import datetime
+
+class AttemptAnswerSave(BaseModel):
+    answer: str
+    # Increase with every change of the answer on the client
+    revision: int = 0
+
+class ExamAttemptResponse(BaseModel):
+    id: int
+    test_id: int
+    started_at: datetime
+    finished_at: Optional[datetime]
+    result_id: Optional[int]
+    answers: Dict[int, str]
+    revisions: Dict[int, int]
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+
+class ImportRowError(BaseModel):
+    row: int
+    message: str
+
+class ImportJobResponse(BaseModel):
+    id: str
+    test_id: int
+    filename: str
+    format: str
+    status: str
+    rows_processed: int
+    rows_imported: int
+    rows_failed: int
+    categories_created: int
+    progress: Optional[float]
+    errors: List[ImportRowError]
+    error: Optional[str]
+    created_at: datetime
+    finished_at: Optional[datetime]
+
+    @classmethod
+    def from_job(cls, job) -> "ImportJobResponse":
+        return cls(
+            **{name: getattr(job, name) for name in cls.model_fields if name != "errors"},
+            errors=[ImportRowError(row=row, message=message) for row, message in job.errors]
+        )
@@ -0,0 +1,35 @@
+from pydantic import BaseModel
+from typing import Optional, List
+
+class DistractorStatsResponse(BaseModel):
+    answer: str
+    share: float
+    discrimination: Optional[float]
+    flags: List[str]
+
+    class Config:
+        from_attributes = True
+
+class ItemStatsResponse(BaseModel):
+    question_id: int
+    text: str
+    p_value: Optional[float]
+    discrimination: Optional[float]
+    no_option_share: float
+    flags: List[str]
+    distractors: List[DistractorStatsResponse]
+
+    class Config:
+        from_attributes = True
+
+class TestItemAnalysisResponse(BaseModel):
+    test_id: int
+    students: int
+    questions: int
+    mean_score: Optional[float]
+    score_std: Optional[float]
+    kr20: Optional[float]
+    items: List[ItemStatsResponse]
+
+    class Config:
+        from_attributes = True
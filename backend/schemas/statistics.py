@@ -0,0 +1,45 @@
+from pydantic import BaseModel
+from typing import Optional, List, Dict
+from datetime import datetime
+
+class TestStatsResponse(BaseModel):
+    id: int
+    title: str
+    description: Optional[str]
+    created_by: int
+    created_at: datetime
+    question_count: int
+    categories: Dict[str, int]
+
+    class Config:
+        from_attributes = True
+
+class CategoryStatsResponse(BaseModel):
+    id: int
+    name: str
+    question_count: int
+    test_count: int
+
+    class Config:
+        from_attributes = True
+
+class TeacherStatsResponse(BaseModel):
+    id: int
+    username: str
+    name: str
+    test_count: int
+    question_count: int
+
+    class Config:
+        from_attributes = True
+
+class QuestionBankStatsResponse(BaseModel):
+    total_tests: int
+    total_questions: int
+    total_categories: int
+    tests: List[TestStatsResponse]
+    categories: List[CategoryStatsResponse]
+    teachers: List[TeacherStatsResponse]
+
+    class Config:
+        from_attributes = True
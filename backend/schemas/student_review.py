@@ -0,0 +1,69 @@
+from pydantic import BaseModel
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+from .user import UserResponse
+
+class StudentResultSummary(BaseModel):
+    id: int
+    test_id: int
+    test_title: str
+    score: float
+    timestamp: datetime
+
+    class Config:
+        from_attributes = True
+
+class StudentResultsResponse(BaseModel):
+    student: UserResponse
+    results: List[StudentResultSummary]
+
+    class Config:
+        from_attributes = True
+
+class ReviewTest(BaseModel):
+    id: int
+    title: str
+    description: Optional[str]
+
+    class Config:
+        from_attributes = True
+
+class ReviewQuestion(BaseModel):
+    id: int
+    category_id: int
+    text: str
+    image_url: Optional[str]
+    table_data: Optional[Dict[str, Any]]
+    options: List[str]
+    correct_answer: str
+
+    class Config:
+        from_attributes = True
+
+class ReviewAnswer(BaseModel):
+    question_id: int
+    answer: str
+    is_correct: bool
+
+    class Config:
+        from_attributes = True
+
+class ReviewResult(BaseModel):
+    id: int
+    score: float
+    category_breakdown: Optional[Dict[str, Any]]
+    recommendation: Optional[str]
+    timestamp: datetime
+
+    class Config:
+        from_attributes = True
+
+class StudentTestReviewResponse(BaseModel):
+    student: UserResponse
+    test: ReviewTest
+    questions: List[ReviewQuestion]
+    answers: List[ReviewAnswer]
+    result: Optional[ReviewResult]
+
+    class Config:
+        from_attributes = True
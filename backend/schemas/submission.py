@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class SubmissionReceiptResponse(BaseModel):
+    # Receipt id of a queued submission
+    id: str
+    test_id: int
+    # "pending", "ready" or "failed"
+    status: str
+    result_id: Optional[int]
+    error: Optional[str]
+    submitted_at: datetime
+    finished_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
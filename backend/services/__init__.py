@@ -0,0 +1,37 @@
+from .grading import (
+    AnswerKey, GradedSubmission, InvalidAnswerError,
+    load_answer_key, get_answer_key, grade_submission, save_graded_submission
+)
+from .question_payloads import QuestionPayload, get_student_payload
+from .cache import TestCache, invalidate_test, invalidate_all
+from .cache_sync import CacheSync, cache_sync
+from .question_import import ImportReport, QuestionImporter, RowError, import_questions
+from .question_stream import QuestionFileReader, SourceFormatError, stream_import_questions
+from .import_jobs import ImportJob, import_jobs
+from .question_excel import import_excel_questions
+from .analytics import load_test_analytics, rebuild_analytics
+from .item_analysis import TestItemAnalysis, get_item_analysis
+from .student_review import ReviewNotFound, load_student_results, load_student_test_review
+from .class_results import ClassResults, load_class_results
+from .write_behind import WriteBehindBuffer
+from .exam_sessions import AttemptState, start_attempt, autosave_answer, finalize_attempt, answer_buffer
+from .submission_queue import Submission, submission_queue
+from .statistics import QuestionBankStats, get_question_bank_stats, invalidate_statistics
+
+__all__ = [
+    "AnswerKey", "GradedSubmission", "InvalidAnswerError",
+    "load_answer_key", "get_answer_key", "grade_submission", "save_graded_submission",
+    "QuestionPayload", "get_student_payload",
+    "TestCache", "invalidate_test", "invalidate_all", "CacheSync", "cache_sync",
+    "ImportReport", "QuestionImporter", "RowError", "import_questions",
+    "QuestionFileReader", "SourceFormatError", "stream_import_questions",
+    "ImportJob", "import_jobs", "import_excel_questions",
+    "QuestionBankStats", "get_question_bank_stats", "invalidate_statistics",
+    "load_test_analytics", "rebuild_analytics",
+    "TestItemAnalysis", "get_item_analysis",
+    "ReviewNotFound", "load_student_results", "load_student_test_review",
+    "ClassResults", "load_class_results",
+    "WriteBehindBuffer",
+    "AttemptState", "start_attempt", "autosave_answer", "finalize_attempt", "answer_buffer",
+    "Submission", "submission_queue"
+]
@@ -0,0 +1,268 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from models.analytics import TestAnalytics, TestScoreBucket, TestCategoryAnalytics, QuestionOptionCount
+from models.category import Category
+from models.question import Question
+from models.student_answer import StudentAnswer
+from models.test_result import TestResult
+from .exports import category_percentage
+
+SCORE_BUCKETS = 10
+
+# table -> (key columns, counter columns)
+_COUNTERS = {
+    TestAnalytics: (("test_id",), ("submissions", "score_sum", "score_squares_sum")),
+    TestScoreBucket: (("test_id", "bucket"), ("count",)),
+    TestCategoryAnalytics: (("test_id", "category"), ("submissions", "correct", "total", "percentage_sum")),
+    QuestionOptionCount: (("question_id", "answer"), ("count",)),
+}
+_DIALECT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def score_bucket(score: float) -> int:
+    return min(max(int(score // (100 / SCORE_BUCKETS)), 0), SCORE_BUCKETS - 1)
+
+
+def _increment_statement(dialect_name: str, model):
+    """INSERT ... ON CONFLICT DO UPDATE adding the new values to the counters"""
+    keys, counters = _COUNTERS[model]
+    statement = _DIALECT_INSERTS[dialect_name](model)
+    table = model.__table__
+    return statement.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={name: table.c[name] + statement.excluded[name] for name in counters}
+    )
+
+
+def category_counts(values: Any) -> Optional[Tuple[int, int, float]]:
+    """
+    (correct, total, percentage) of one category_breakdown entry. Older
+    results store only the percentage, as a bare number: it counts towards
+    the average percentage but not the correct/total sums. None for an
+    entry without a readable percentage.
+    """
+    percentage = category_percentage(values)
+    if percentage is None:
+        return None
+    if not isinstance(values, dict):
+        return 0, 0, percentage
+    try:
+        return int(values.get("correct") or 0), int(values.get("total") or 0), percentage
+    except (TypeError, ValueError):
+        return 0, 0, percentage
+
+
+def submission_increments(
+    test_id: int,
+    score: float,
+    category_breakdown: Dict[str, Dict[str, Any]],
+    answer_rows: List[Dict[str, Any]]
+) -> List[Tuple[Any, List[Dict[str, Any]]]]:
+    """Counter increments of one graded submission, as (model, rows) pairs"""
+    categories = []
+    for name, values in (category_breakdown if isinstance(category_breakdown, dict) else {}).items():
+        counts = category_counts(values)
+        if counts is not None:
+            categories.append((name, *counts))
+    option_counts = Counter((row["question_id"], row["answer"]) for row in answer_rows)
+    increments = [
+        (TestAnalytics, [{
+            "test_id": test_id,
+            "submissions": 1,
+            "score_sum": score,
+            "score_squares_sum": score * score,
+        }]),
+        (TestScoreBucket, [{"test_id": test_id, "bucket": score_bucket(score), "count": 1}]),
+        (TestCategoryAnalytics, [
+            {
+                "test_id": test_id,
+                "category": name,
+                "submissions": 1,
+                "correct": correct,
+                "total": total,
+                "percentage_sum": percentage,
+            }
+            for name, correct, total, percentage in categories
+        ]),
+        (QuestionOptionCount, [
+            {"test_id": test_id, "question_id": question_id, "answer": answer, "count": count}
+            for (question_id, answer), count in option_counts.items()
+        ]),
+    ]
+    return [(model, rows) for model, rows in increments if rows]
+
+
+def record_submission(db: Session, test_id: int, graded):
+    """Add a GradedSubmission to the analytics tables, in the caller's transaction"""
+    dialect_name = db.get_bind().dialect.name
+    for model, rows in submission_increments(test_id, graded.score, graded.category_breakdown, graded.answer_rows):
+        db.execute(_increment_statement(dialect_name, model), rows)
+
+
+async def record_submission_async(db: AsyncSession, test_id: int, graded):
+    """record_submission for the async database path"""
+    dialect_name = db.bind.dialect.name
+    for model, rows in submission_increments(test_id, graded.score, graded.category_breakdown, graded.answer_rows):
+        await db.execute(_increment_statement(dialect_name, model), rows)
+
+
+def delete_test_analytics(db: Session, test_id: Optional[int] = None):
+    """Remove the aggregates of one test, or of all tests"""
+    for model in _COUNTERS:
+        statement = delete(model)
+        if test_id is not None:
+            statement = statement.where(model.test_id == test_id)
+        db.execute(statement)
+
+
+def rebuild_analytics(db: Session, test_id: Optional[int] = None) -> int:
+    """
+    Recompute the aggregates of one test (or all tests) from test_results and
+    student_answers. Returns the number of submissions counted (results that
+    cannot be read are skipped with a warning); the caller commits.
+    """
+    delete_test_analytics(db, test_id)
+    dialect_name = db.get_bind().dialect.name
+
+    results = select(TestResult.id, TestResult.test_id, TestResult.score, TestResult.category_breakdown)
+    if test_id is not None:
+        results = results.where(TestResult.test_id == test_id)
+    submissions = 0
+    for row in db.execute(results.execution_options(yield_per=1000)):
+        try:
+            increments = submission_increments(row.test_id, row.score, row.category_breakdown or {}, [])
+        except (TypeError, ValueError) as e:
+            # A malformed stored result is left out rather than failing the whole rebuild
+            print(f"⚠️  Analytics: skipped test result {row.id} ({e})")
+            continue
+        for model, rows in increments:
+            db.execute(_increment_statement(dialect_name, model), rows)
+        submissions += 1
+
+    option_counts = (
+        select(Question.test_id, StudentAnswer.question_id, StudentAnswer.answer, func.count().label("count"))
+        .join(Question, Question.id == StudentAnswer.question_id)
+        .group_by(Question.test_id, StudentAnswer.question_id, StudentAnswer.answer)
+    )
+    if test_id is not None:
+        option_counts = option_counts.where(Question.test_id == test_id)
+    rows = [dict(row._mapping) for row in db.execute(option_counts)]
+    if rows:
+        db.execute(_increment_statement(dialect_name, QuestionOptionCount), rows)
+    return submissions
+
+
+@dataclass
+class OptionAnalytics:
+    answer: str
+    count: int
+    is_correct: bool
+    # Share of the students who answered the question
+    share: float
+
+
+@dataclass
+class QuestionAnalytics:
+    id: int
+    text: str
+    category: Optional[str]
+    correct_answer: str
+    answered: int
+    correct: int
+    percent_correct: Optional[float]
+    options: List[OptionAnalytics] = field(default_factory=list)
+
+
+@dataclass
+class CategoryAnalytics:
+    name: str
+    submissions: int
+    correct: int
+    total: int
+    average_percentage: float
+
+
+@dataclass
+class ScoreBucketAnalytics:
+    label: str
+    count: int
+
+
+@dataclass
+class TestAnalyticsReport:
+    test_id: int
+    submissions: int
+    average_score: Optional[float]
+    score_std: Optional[float]
+    score_distribution: List[ScoreBucketAnalytics]
+    categories: List[CategoryAnalytics]
+    questions: List[QuestionAnalytics]
+
+
+def load_test_analytics(db: Session, test_id: int) -> TestAnalyticsReport:
+    """Read a test's aggregates; the cost depends on its questions, not on its submissions"""
+    totals = db.get(TestAnalytics, test_id)
+    submissions = totals.submissions if totals else 0
+    average = std = None
+    if submissions:
+        average = totals.score_sum / submissions
+        std = max(totals.score_squares_sum / submissions - average * average, 0) ** 0.5
+
+    buckets = dict(db.execute(
+        select(TestScoreBucket.bucket, TestScoreBucket.count).where(TestScoreBucket.test_id == test_id)
+    ).all())
+    width = 100 // SCORE_BUCKETS
+    distribution = [
+        ScoreBucketAnalytics(f"{bucket * width}-{(bucket + 1) * width}", buckets.get(bucket, 0))
+        for bucket in range(SCORE_BUCKETS)
+    ]
+
+    categories = [
+        CategoryAnalytics(row.category, row.submissions, row.correct, row.total, row.percentage_sum / row.submissions)
+        for row in db.execute(
+            select(TestCategoryAnalytics)
+            .where(TestCategoryAnalytics.test_id == test_id)
+            .order_by(TestCategoryAnalytics.category)
+        ).scalars()
+    ]
+
+    option_counts: Dict[int, Dict[str, int]] = {}
+    for question_id, answer, count in db.execute(
+        select(QuestionOptionCount.question_id, QuestionOptionCount.answer, QuestionOptionCount.count)
+        .where(QuestionOptionCount.test_id == test_id)
+    ):
+        option_counts.setdefault(question_id, {})[answer] = count
+
+    questions = []
+    for question_id, text, options, correct_answer, category in db.execute(
+        select(Question.id, Question.text, Question.options, Question.correct_answer, Category.name)
+        .outerjoin(Category, Category.id == Question.category_id)
+        .where(Question.test_id == test_id)
+        .order_by(Question.id)
+    ):
+        counts = option_counts.get(question_id, {})
+        answered = sum(counts.values())
+        correct = counts.get(correct_answer, 0)
+        # Options in their original order, then answers outside the options (e.g. "Не знаю")
+        answers = list(options or []) + sorted(answer for answer in counts if answer not in (options or []))
+        questions.append(QuestionAnalytics(
+            id=question_id,
+            text=text,
+            category=category,
+            correct_answer=correct_answer,
+            answered=answered,
+            correct=correct,
+            percent_correct=correct / answered * 100 if answered else None,
+            options=[
+                OptionAnalytics(answer, counts.get(answer, 0), answer == correct_answer,
+                                counts.get(answer, 0) / answered if answered else 0.0)
+                for answer in answers
+            ],
+        ))
+
+    return TestAnalyticsReport(test_id, submissions, average, std, distribution, categories, questions)
@@ -0,0 +1,124 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from .cache_sync import on_invalidation, publish_invalidation
+
+# All caches whose contents are derived from a test's questions
+_registry: List["TestCache"] = []
+
+
+class TestCache:
+    """
+    Thread-safe, bounded (LRU) process-level cache of values derived from
+    one test's questions, keyed by test_id.
+
+    Every invalidation bumps a generation (per test, or a global epoch for
+    a full flush), so a value loaded concurrently with an invalidation is
+    never stored.
+    """
+
+    def __init__(self, name: str, max_entries: int = 256):
+        self.name = name
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, Any]" = OrderedDict()
+        self._generations: Dict[int, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        _registry.append(self)
+
+    def get_or_load(self, test_id: int, loader: Callable[[], Optional[Any]]) -> Optional[Any]:
+        """Return the cached value or call loader(); a None result is not cached"""
+        found, value = self._lookup(test_id)
+        if found:
+            return value
+        generation = value
+        return self._store(test_id, generation, loader())
+
+    async def get_or_load_async(
+        self,
+        test_id: int,
+        loader: Callable[[], Awaitable[Optional[Any]]]
+    ) -> Optional[Any]:
+        """Same as get_or_load for an async loader"""
+        found, value = self._lookup(test_id)
+        if found:
+            return value
+        generation = value
+        return self._store(test_id, generation, await loader())
+
+    def _lookup(self, test_id: int) -> Tuple[bool, Any]:
+        """(True, value) on a hit, (False, current generation) on a miss"""
+        with self._lock:
+            if test_id in self._entries:
+                self._entries.move_to_end(test_id)
+                self.hits += 1
+                return True, self._entries[test_id]
+            self.misses += 1
+            return False, (self._epoch, self._generations.get(test_id, 0))
+
+    def _store(self, test_id: int, generation: Tuple[int, int], value: Optional[Any]) -> Optional[Any]:
+        if value is None:
+            return None
+        with self._lock:
+            if (self._epoch, self._generations.get(test_id, 0)) == generation:
+                self._entries[test_id] = value
+                self._entries.move_to_end(test_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, test_id: Optional[int] = None):
+        with self._lock:
+            if test_id is None:
+                self._entries.clear()
+                self._generations.clear()
+                self._epoch += 1
+            else:
+                self._entries.pop(test_id, None)
+                self._generations[test_id] = self._generations.get(test_id, 0) + 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class BankCache(TestCache):
+    """
+    Cache of values derived from the whole question bank: invalidating any
+    single test drops every entry.
+    """
+
+    def invalidate(self, test_id: Optional[int] = None):
+        super().invalidate()
+
+
+def _drop_test(test_id: int):
+    for cache in _registry:
+        cache.invalidate(test_id)
+
+
+def _drop_all():
+    for cache in _registry:
+        cache.invalidate()
+
+
+def invalidate_test(test_id: int):
+    """Drop every cached value derived from this test's questions, in every worker"""
+    _drop_test(test_id)
+    publish_invalidation("test", str(test_id))
+
+
+def invalidate_all():
+    """Drop every cached test value, e.g. after a category rename, in every worker"""
+    _drop_all()
+    publish_invalidation("all")
+
+
+on_invalidation("test", lambda value: _drop_test(int(value)))
+on_invalidation("all", lambda value: _drop_all())
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    return {cache.name: cache.stats() for cache in _registry}
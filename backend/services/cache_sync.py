@@ -0,0 +1,170 @@
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Set
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from database import DATABASE_URL, engine, is_memory_sqlite
+from models.cache_version import CacheVersion
+
+# Poll the database for cache invalidations published by other processes:
+# the other workers and the command-line import scripts, which write questions
+# without going through the server. Invalidations are always published;
+# CACHE_SYNC=false only stops this process from applying the others'
+CACHE_SYNC = os.getenv("CACHE_SYNC", "true").lower() in ("1", "true", "yes")
+# How often every worker checks for invalidations published elsewhere
+CACHE_SYNC_INTERVAL_MS = float(os.getenv("CACHE_SYNC_INTERVAL_MS", "500"))
+
+_DIALECT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+# Invalidation kind ("test", "all", ...) -> applies one to this process's caches
+_handlers: Dict[str, Callable[[str], None]] = {}
+
+
+def on_invalidation(kind: str, handler: Callable[[str], None]):
+    """Register how an invalidation of this kind published by another worker is applied"""
+    _handlers[kind] = handler
+
+
+def publish_invalidation(kind: str, value: str = ""):
+    """
+    Tell the other processes; the caller has already invalidated its own
+    caches. Never raises: the change being invalidated is already committed,
+    so a failed publish is logged and retried by the polling thread.
+    """
+    if cache_sync is None:
+        return
+    key = f"{kind}:{value}"
+    try:
+        cache_sync.publish(key)
+    except Exception as e:
+        cache_sync.defer(key)
+        print(f"⚠️  Cache invalidation {key} not published: {e}")
+
+
+class CacheSync:
+    """
+    Cross-process invalidation channel without an external service. Publishing
+    stamps the key's row in cache_versions with the next global version; every
+    worker polls for versions above the last one it has seen (an index range
+    scan that is almost always empty) and applies the keys it finds. A change
+    reaches every worker within one poll interval plus the poll itself.
+    """
+
+    def __init__(self, bind: Engine, interval_ms: float, polling: bool = True):
+        self.bind = bind
+        self.interval = interval_ms / 1000
+        self.polling = polling
+        self._seen: Optional[int] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Keys whose publish failed, published again before the next poll
+        self._deferred: Set[str] = set()
+        self._published = 0
+        self._failed_publishes = 0
+        self._applied = 0
+        self._polls = 0
+        self._failed_polls = 0
+
+    def publish(self, key: str):
+        # A single statement: the version is read and written under the same write lock
+        next_version = select(func.coalesce(func.max(CacheVersion.version), 0) + 1).scalar_subquery()
+        with self.bind.begin() as connection:
+            if connection.dialect.name == "postgresql":
+                # Versions must be committed in the order they are assigned
+                connection.execute(text("LOCK TABLE cache_versions IN EXCLUSIVE MODE"))
+            statement = _DIALECT_INSERTS[connection.dialect.name](CacheVersion).values(key=key, version=next_version)
+            connection.execute(statement.on_conflict_do_update(
+                index_elements=["key"], set_={"version": statement.excluded.version}
+            ))
+        with self._lock:
+            self._published += 1
+
+    def defer(self, key: str):
+        """Keep a key that could not be published for the polling thread to publish"""
+        with self._lock:
+            self._failed_publishes += 1
+            self._deferred.add(key)
+
+    def publish_deferred(self) -> int:
+        """Publish the deferred keys; a key that fails again stays deferred"""
+        with self._lock:
+            keys, self._deferred = self._deferred, set()
+        published = 0
+        try:
+            for key in keys:
+                self.publish(key)
+                published += 1
+        finally:
+            with self._lock:
+                self._deferred.update(list(keys)[published:])
+        return published
+
+    def poll(self) -> int:
+        """Apply invalidations published since the last poll; returns how many"""
+        with self.bind.connect() as connection:
+            if self._seen is None:
+                # Nothing is cached yet when a worker starts
+                self._seen = connection.scalar(select(func.coalesce(func.max(CacheVersion.version), 0)))
+                return 0
+            rows = connection.execute(
+                select(CacheVersion.key, CacheVersion.version)
+                .where(CacheVersion.version > self._seen)
+                .order_by(CacheVersion.version)
+            ).all()
+        for key, version in rows:
+            kind, _, value = key.partition(":")
+            handler = _handlers.get(kind)
+            if handler is not None:
+                handler(value)
+            self._seen = version
+        with self._lock:
+            self._polls += 1
+            self._applied += len(rows)
+        return len(rows)
+
+    def start(self):
+        # Without polling the thread still publishes deferred keys
+        if self._thread is None:
+            if self.polling:
+                self.poll()
+            self._thread = threading.Thread(target=self._loop, name="cache-sync", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "polling": self.polling,
+                "interval_ms": self.interval * 1000,
+                "last_version": self._seen,
+                "polls": self._polls,
+                "failed_polls": self._failed_polls,
+                "published": self._published,
+                "failed_publishes": self._failed_publishes,
+                "deferred": len(self._deferred),
+                "applied": self._applied,
+            }
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.publish_deferred()
+                if self.polling:
+                    self.poll()
+            except Exception as e:
+                with self._lock:
+                    self._failed_polls += 1
+                print(f"⚠️  Cache sync poll failed: {e}")
+
+
+cache_sync: Optional[CacheSync] = None
+
+if not is_memory_sqlite(DATABASE_URL):
+    cache_sync = CacheSync(engine, CACHE_SYNC_INTERVAL_MS, polling=CACHE_SYNC)
@@ -0,0 +1,132 @@
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+from models.test_result import TestResult
+from models.user import User
+from .analytics import SCORE_BUCKETS, ScoreBucketAnalytics
+from .pagination import PageParams, PageQuery, SortOrder
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+# Sort fields of the class overview besides "id" (submission order)
+CLASS_RESULT_ORDER = SortOrder(TestResult.id, {
+    "score": TestResult.score, "name": User.name, "username": User.username
+})
+
+
+@dataclass
+class ScoreSummary:
+    students: int
+    mean: Optional[float]
+    median: Optional[float]
+    std: Optional[float]
+    min: Optional[float]
+    max: Optional[float]
+    # "p10" -> 10th percentile of the scores
+    percentiles: Dict[str, float]
+    histogram: List[ScoreBucketAnalytics]
+
+
+@dataclass
+class ClassResults:
+    test_id: int
+    summary: ScoreSummary
+    # Rows of (id, user_id, username, name, score, category_breakdown, recommendation, timestamp)
+    results: List[Any]
+    next_cursor: Optional[str]
+
+
+def _percentile_positions(students: int) -> Dict[int, List[int]]:
+    """Percentile -> 0-based positions of the sorted scores it interpolates between"""
+    positions = {}
+    for q in PERCENTILES:
+        position = (students - 1) * q / 100
+        positions[q] = sorted({math.floor(position), math.ceil(position)})
+    return positions
+
+
+def summarize_scores(db: Session, test_id: int) -> ScoreSummary:
+    """
+    Whole-class statistics computed by the database: aggregates, a GROUP BY
+    of the score buckets and one pass over the (test_id, score) index for
+    the percentiles, which are interpolated like numpy.percentile.
+    """
+    of_test = TestResult.test_id == test_id
+    students, mean, mean_square, low, high = db.execute(
+        select(
+            func.count(),
+            func.avg(TestResult.score),
+            func.avg(TestResult.score * TestResult.score),
+            func.min(TestResult.score),
+            func.max(TestResult.score),
+        ).where(of_test)
+    ).one()
+
+    width = 100 // SCORE_BUCKETS
+    bucket = case(
+        *[(TestResult.score < (index + 1) * width, index) for index in range(SCORE_BUCKETS - 1)],
+        else_=SCORE_BUCKETS - 1
+    )
+    counts = dict(db.execute(select(bucket, func.count()).where(of_test).group_by(bucket)).all())
+    buckets = [
+        ScoreBucketAnalytics(f"{index * width}-{(index + 1) * width}", counts.get(index, 0))
+        for index in range(SCORE_BUCKETS)
+    ]
+    if not students:
+        return ScoreSummary(0, None, None, None, None, None, {}, buckets)
+
+    positions = _percentile_positions(students)
+    ranked = (
+        select(TestResult.score, (func.row_number().over(order_by=TestResult.score) - 1).label("position"))
+        .where(of_test)
+        .subquery()
+    )
+    wanted = sorted({position for pair in positions.values() for position in pair})
+    scores = dict(db.execute(select(ranked.c.position, ranked.c.score).where(ranked.c.position.in_(wanted))).all())
+
+    percentiles = {}
+    for q, pair in positions.items():
+        position = (students - 1) * q / 100
+        lower, upper = scores[pair[0]], scores[pair[-1]]
+        percentiles[f"p{q}"] = float(lower + (upper - lower) * (position - pair[0]))
+
+    return ScoreSummary(
+        students=students,
+        mean=float(mean),
+        median=percentiles["p50"],
+        std=math.sqrt(max(float(mean_square) - float(mean) ** 2, 0.0)),
+        min=float(low),
+        max=float(high),
+        percentiles=percentiles,
+        histogram=buckets,
+    )
+
+
+def load_class_results(db: Session, test_id: int, params: PageParams) -> ClassResults:
+    """
+    One keyset page of a test's results with the students' names, plus
+    summary statistics of the whole class computed by SQL aggregates, so
+    a page costs the same whatever the class size.
+    Raises InvalidPageRequest for an unknown sort field or a bad cursor.
+    """
+    query = PageQuery(
+        select(
+            TestResult.id,
+            TestResult.user_id,
+            User.username,
+            User.name,
+            TestResult.score,
+            TestResult.category_breakdown,
+            TestResult.recommendation,
+            TestResult.timestamp,
+        )
+        .join(User, User.id == TestResult.user_id)
+        .where(TestResult.test_id == test_id),
+        CLASS_RESULT_ORDER,
+        params,
+    )
+    summary = summarize_scores(db, test_id)
+    page = query.page(db.execute(query.statement).all(), summary.students)
+    return ClassResults(test_id, summary, page.items, page.next_cursor)
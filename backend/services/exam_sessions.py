@@ -0,0 +1,272 @@
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Optional
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from database import SessionLocal, WEB_CONCURRENCY
+from models.exam_attempt import ExamAttempt, AttemptAnswer
+from models.question import Question
+from models.test_result import TestResult
+from .grading import get_answer_key, grade_submission, save_graded_submission, InvalidAnswerError
+from .write_behind import WriteBehindBuffer
+from .write_queue import run_write, write_queue
+
+# Buffer autosaved answers in memory and write them in batches. Off by default
+# with several workers: finalize can only flush its own worker's buffer
+ANSWER_BUFFER = os.getenv("ANSWER_BUFFER", "true" if WEB_CONCURRENCY == 1 else "false").lower() in ("1", "true", "yes")
+ANSWER_FLUSH_INTERVAL_MS = float(os.getenv("ANSWER_FLUSH_INTERVAL_MS", "250"))
+ANSWER_FLUSH_MAX_ENTRIES = int(os.getenv("ANSWER_FLUSH_MAX_ENTRIES", "500"))
+
+_DIALECT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+class AttemptError(Exception):
+    pass
+
+
+class AttemptNotFound(AttemptError):
+    def __init__(self, detail: str = "Exam attempt not found"):
+        super().__init__(detail)
+
+
+class AttemptFinished(AttemptError):
+    def __init__(self):
+        super().__init__("Exam attempt already finished")
+
+
+class TestAlreadySubmitted(AttemptError):
+    def __init__(self):
+        super().__init__("Test already submitted")
+
+
+@dataclass
+class AttemptState:
+    id: int
+    test_id: int
+    started_at: datetime
+    finished_at: Optional[datetime]
+    result_id: Optional[int]
+    # question_id -> saved answer, and the revision it was saved with
+    answers: Dict[int, str] = field(default_factory=dict)
+    revisions: Dict[int, int] = field(default_factory=dict)
+
+
+def attempt_state(db: Session, attempt: ExamAttempt) -> AttemptState:
+    answers, revisions = {}, {}
+    for question_id, answer, revision in db.execute(
+        select(AttemptAnswer.question_id, AttemptAnswer.answer, AttemptAnswer.revision)
+        .where(AttemptAnswer.attempt_id == attempt.id)
+    ):
+        answers[question_id] = answer
+        revisions[question_id] = revision
+    if answer_buffer is not None:
+        # Answers accepted but not written yet
+        for row in answer_buffer.pending(lambda key, row: row["attempt_id"] == attempt.id):
+            if row["revision"] >= revisions.get(row["question_id"], row["revision"]):
+                answers[row["question_id"]] = row["answer"]
+                revisions[row["question_id"]] = row["revision"]
+    return AttemptState(
+        attempt.id, attempt.test_id, attempt.started_at, attempt.finished_at, attempt.result_id, answers, revisions
+    )
+
+
+def _owned_attempt(db: Session, user_id: int, attempt_id: int, lock: bool = False) -> ExamAttempt:
+    # lock: SELECT ... FOR UPDATE (PostgreSQL; SQLite writes are serialized anyway)
+    attempt = db.get(ExamAttempt, attempt_id, with_for_update=lock)
+    # Another student's attempt looks exactly like a missing one
+    if attempt is None or attempt.user_id != user_id:
+        raise AttemptNotFound()
+    return attempt
+
+
+def start_attempt(db: Session, user_id: int, test_id: int) -> AttemptState:
+    """
+    Open the student's attempt at a test, or return the existing one with
+    its saved answers so that a reloaded page can carry on.
+    """
+    query = select(ExamAttempt).where(ExamAttempt.user_id == user_id, ExamAttempt.test_id == test_id)
+    attempt = db.scalar(query)
+    if attempt is not None:
+        return attempt_state(db, attempt)
+
+    if get_answer_key(db, test_id) is None:
+        raise AttemptNotFound("Test not found")
+    if db.scalar(select(TestResult.id).where(TestResult.user_id == user_id, TestResult.test_id == test_id)):
+        raise TestAlreadySubmitted()
+    try:
+        attempt = run_write(db, lambda session: _add_attempt(session, user_id, test_id))
+    except IntegrityError:
+        # Started concurrently by another request of the same student. run_write
+        # has released the session's connection, so release the new one too
+        state = attempt_state(db, db.scalar(query))
+        db.close()
+        return state
+    return AttemptState(attempt.id, attempt.test_id, attempt.started_at, None, None)
+
+
+def _add_attempt(session: Session, user_id: int, test_id: int) -> ExamAttempt:
+    attempt = ExamAttempt(user_id=user_id, test_id=test_id)
+    session.add(attempt)
+    return attempt
+
+
+def delete_test_attempts(db: Session, test_id: int):
+    """Drop a test's attempts and their saved answers, in the caller's transaction"""
+    attempt_ids = select(ExamAttempt.id).where(ExamAttempt.test_id == test_id)
+    db.execute(delete(AttemptAnswer).where(AttemptAnswer.attempt_id.in_(attempt_ids)))
+    db.execute(delete(ExamAttempt).where(ExamAttempt.test_id == test_id))
+
+
+def load_attempt(db: Session, user_id: int, attempt_id: int) -> AttemptState:
+    return attempt_state(db, _owned_attempt(db, user_id, attempt_id))
+
+
+def save_answer_statement(dialect_name: str):
+    """
+    Upsert of autosaved answers. Repeating a save changes nothing, and a
+    save with a lower revision than the stored one (a late retry) is ignored.
+    """
+    statement = _DIALECT_INSERTS[dialect_name](AttemptAnswer)
+    return statement.on_conflict_do_update(
+        index_elements=["attempt_id", "question_id"],
+        set_={"answer": statement.excluded.answer, "revision": statement.excluded.revision},
+        where=statement.excluded.revision >= AttemptAnswer.revision,
+    )
+
+
+def open_attempt_rows(session: Session, rows):
+    """
+    The answer rows whose attempt exists and is still open and whose question
+    belongs to the attempt's test. The attempts stay locked until the caller
+    commits, so finalize cannot close one between this check and the write.
+    """
+    attempts = dict(session.execute(
+        select(ExamAttempt.id, ExamAttempt.test_id)
+        .where(ExamAttempt.id.in_({row["attempt_id"] for row in rows}), ExamAttempt.finished_at.is_(None))
+        .with_for_update()
+    ).all())
+    question_tests = dict(session.execute(
+        select(Question.id, Question.test_id).where(Question.id.in_({row["question_id"] for row in rows}))
+    ).all())
+    return [
+        row for row in rows
+        if row["attempt_id"] in attempts and question_tests.get(row["question_id"]) == attempts[row["attempt_id"]]
+    ]
+
+
+def write_answers(rows):
+    """
+    Write a batch of buffered answers in one transaction. Answers that can no
+    longer be stored (the attempt was finalized or deleted, or the question
+    removed, after the answer was accepted) are skipped.
+    """
+    def save(session: Session):
+        valid = open_attempt_rows(session, rows)
+        if len(valid) < len(rows):
+            print(f"⚠️  Skipped {len(rows) - len(valid)} autosaved answers of closed attempts or removed questions")
+        if valid:
+            session.execute(save_answer_statement(session.get_bind().dialect.name), valid)
+
+    if write_queue is not None:
+        write_queue.run(save)
+        return
+    with SessionLocal() as session:
+        save(session)
+        session.commit()
+
+
+# Keyed by (user_id, question_id): repeated changes of one answer are
+# coalesced and only the latest revision is written
+answer_buffer = None
+if ANSWER_BUFFER:
+    answer_buffer = WriteBehindBuffer(
+        "answer-buffer",
+        write_answers,
+        flush_interval_ms=ANSWER_FLUSH_INTERVAL_MS,
+        max_entries=ANSWER_FLUSH_MAX_ENTRIES,
+        supersedes=lambda old, new: new["revision"] >= old["revision"],
+        # write_answers skips rows of deleted attempts and questions; this only
+        # catches a question deleted between that check and the insert, which
+        # PostgreSQL's foreign keys reject
+        rejects=lambda error: isinstance(error, IntegrityError),
+    )
+
+
+def check_open_attempt(
+    session: Session, user_id: int, attempt_id: int, question_id: int, lock: bool = False
+) -> ExamAttempt:
+    """The attempt must belong to the student, be open and contain the question"""
+    attempt = _owned_attempt(session, user_id, attempt_id, lock)
+    if attempt.finished_at is not None:
+        raise AttemptFinished()
+    answer_key = get_answer_key(session, attempt.test_id)
+    if answer_key is None:
+        raise AttemptNotFound("Test not found")
+    if question_id not in answer_key.answers:
+        raise InvalidAnswerError(question_id)
+    return attempt
+
+
+def autosave_answer(db: Session, user_id: int, attempt_id: int, question_id: int, answer: str, revision: int = 0):
+    """
+    Store one answer of an open attempt. With the answer buffer this is a
+    primary key lookup and the write happens later, batched with other
+    answers; without it, one small upsert committed through the SQLite
+    writer queue together with other requests' writes.
+    """
+    row = {"attempt_id": attempt_id, "question_id": question_id, "answer": answer, "revision": revision}
+    if answer_buffer is not None:
+        check_open_attempt(db, user_id, attempt_id, question_id)
+        answer_buffer.put((user_id, question_id), row)
+        return
+
+    def save(session: Session):
+        # Locked until the answer is committed, so a concurrent finalize grades it or rejects it
+        check_open_attempt(session, user_id, attempt_id, question_id, lock=True)
+        session.execute(save_answer_statement(session.get_bind().dialect.name), [row])
+
+    run_write(db, save)
+
+
+def finalize_attempt(db: Session, user_id: int, attempt_id: int) -> TestResult:
+    """
+    Grade an attempt from its stored answers and close it. Finalizing again
+    returns the same result. Unanswered questions count as wrong; answers to
+    questions removed from the test since they were saved are skipped.
+    Raises IntegrityError if the test was already submitted another way.
+    """
+    if answer_buffer is not None:
+        # Grade the latest answers, including the ones still buffered
+        try:
+            answer_buffer.flush()
+        except Exception:
+            # Only a failure to write this attempt's own answers stops it being graded
+            if answer_buffer.pending(lambda key, row: row["attempt_id"] == attempt_id):
+                raise
+
+    def finalize(session: Session) -> TestResult:
+        # Autosaves of this attempt written after this lock find it finished
+        attempt = _owned_attempt(session, user_id, attempt_id, lock=True)
+        if attempt.result_id is not None:
+            return session.get(TestResult, attempt.result_id)
+
+        answer_key = get_answer_key(session, attempt.test_id)
+        if answer_key is None:
+            raise AttemptNotFound("Test not found")
+        saved = session.execute(
+            select(AttemptAnswer.question_id, AttemptAnswer.answer)
+            .where(AttemptAnswer.attempt_id == attempt_id)
+            .order_by(AttemptAnswer.question_id)
+        ).all()
+        graded = grade_submission(
+            answer_key, user_id, [row for row in saved if row.question_id in answer_key.answers]
+        )
+        test_result = save_graded_submission(session, user_id, attempt.test_id, graded)
+        attempt.finished_at = func.now()
+        attempt.result_id = test_result.id
+        return test_result
+
+    return run_write(db, finalize)
@@ -0,0 +1,254 @@
+import csv
+import io
+import os
+import tempfile
+from enum import Enum
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models.category import Category
+from models.question import Question
+from models.test_result import TestResult
+from models.user import User
+
+# Results fetched per keyset page while streaming an export
+EXPORT_PAGE_SIZE = int(os.getenv("EXPORT_PAGE_SIZE", "1000"))
+
+ResultRow = Tuple[int, str, str, float, Optional[Dict[str, Any]]]
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    PARQUET = "parquet"
+    ARROW = "arrow"
+    XLSX = "xlsx"
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+    ExportFormat.ARROW: "application/vnd.apache.arrow.stream",
+    ExportFormat.XLSX: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def export_category_names(db: Session, test_id: int) -> List[str]:
+    """Names of the categories used by a test's questions, in category id order"""
+    return list(db.scalars(
+        select(Category.name)
+        .where(Category.id.in_(select(Question.category_id).where(Question.test_id == test_id)))
+        .order_by(Category.id)
+    ))
+
+
+def has_results(db: Session, test_id: int) -> bool:
+    return db.scalar(select(TestResult.id).where(TestResult.test_id == test_id).limit(1)) is not None
+
+
+def iter_result_pages(test_id: int, page_size: int = EXPORT_PAGE_SIZE) -> Iterator[List[ResultRow]]:
+    """
+    Page through a test's results joined with their users, keyset-paginated
+    on TestResult.id. Uses its own session, so it can outlive the request's.
+    """
+    last_id = 0
+    with SessionLocal() as db:
+        while True:
+            rows = db.execute(
+                select(TestResult.id, User.name, User.username, TestResult.score, TestResult.category_breakdown)
+                .join(User, User.id == TestResult.user_id)
+                .where(TestResult.test_id == test_id, TestResult.id > last_id)
+                .order_by(TestResult.id)
+                .limit(page_size)
+            ).all()
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1][0]
+
+
+def format_category_score(score_data: Any) -> str:
+    if isinstance(score_data, dict) and 'percentage' in score_data:
+        return f"{score_data['percentage']:.1f}"
+    if isinstance(score_data, (int, float)):
+        return f"{score_data:.1f}"
+    return str(score_data) if score_data else ""
+
+
+def category_percentage(score_data: Any) -> Optional[float]:
+    """format_category_score as a number, for the typed export formats"""
+    if isinstance(score_data, dict):
+        score_data = score_data.get('percentage')
+    if isinstance(score_data, bool) or score_data is None:
+        return None
+    try:
+        return float(score_data)
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_results_csv(test_id: int, category_names: List[str], page_size: int = EXPORT_PAGE_SIZE) -> Iterator[bytes]:
+    """Yield the results CSV as encoded chunks, one chunk per page of results"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(["Name", "Username", "Overall Score (%)"] + [category_column(name) for name in category_names])
+
+    for rows in iter_result_pages(test_id, page_size):
+        for _, name, username, score, category_breakdown in rows:
+            category_breakdown = category_breakdown or {}
+            writer.writerow(
+                [name, username, f"{score:.1f}"]
+                + [format_category_score(category_breakdown.get(cat_name)) for cat_name in category_names]
+            )
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def category_column(category_name: str) -> str:
+    return f"{category_name} Score (%)"
+
+
+def results_schema(category_names: List[str]):
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            pa.field("Name", pa.string()),
+            pa.field("Username", pa.string()),
+            pa.field("Overall Score (%)", pa.float64()),
+        ]
+        + [pa.field(category_column(name), pa.float64()) for name in category_names]
+    )
+
+
+def iter_result_batches(test_id: int, category_names: List[str], page_size: int = EXPORT_PAGE_SIZE):
+    """
+    Yield one Arrow RecordBatch per page of results. The category_breakdown
+    JSON of the whole page is converted to a typed struct array in one call
+    and each category column is extracted from it, with no per-row Python code.
+    Pages with breakdowns in an older format (e.g. a bare number instead of
+    {"percentage": ...}) are normalized value by value instead.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    schema = results_schema(category_names)
+    breakdown_type = pa.struct([
+        pa.field(name, pa.struct([pa.field("percentage", pa.float64())]))
+        for name in category_names
+    ])
+
+    for rows in iter_result_pages(test_id, page_size):
+        _, names, usernames, scores, breakdowns = zip(*rows)
+        try:
+            breakdown = pa.array(breakdowns, type=breakdown_type)
+            categories = [pc.struct_field(breakdown, [name, "percentage"]) for name in category_names]
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            categories = [
+                pa.array([
+                    category_percentage(row.get(name)) if isinstance(row, dict) else None for row in breakdowns
+                ], pa.float64())
+                for name in category_names
+            ]
+        yield pa.record_batch(
+            [
+                pa.array(names, pa.string()),
+                pa.array(usernames, pa.string()),
+                pa.array(scores, pa.float64()),
+            ]
+            + categories,
+            schema=schema,
+        )
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose contents are drained chunk by chunk"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_results_parquet(test_id: int, category_names: List[str], page_size: int = EXPORT_PAGE_SIZE) -> Iterator[bytes]:
+    """Parquet file streamed as one row group per page of results"""
+    import pyarrow.parquet as pq
+
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, results_schema(category_names)) as writer:
+        for batch in iter_result_batches(test_id, category_names, page_size):
+            writer.write_batch(batch)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def iter_results_arrow(test_id: int, category_names: List[str], page_size: int = EXPORT_PAGE_SIZE) -> Iterator[bytes]:
+    """Arrow IPC stream, one record batch per page of results"""
+    import pyarrow as pa
+
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, results_schema(category_names)) as writer:
+        for batch in iter_result_batches(test_id, category_names, page_size):
+            writer.write_batch(batch)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def iter_results_xlsx(test_id: int, category_names: List[str], page_size: int = EXPORT_PAGE_SIZE) -> Iterator[bytes]:
+    """
+    XLSX through openpyxl's write-only mode. An XLSX file is a zip archive
+    that can only be finished at the end, so it is spooled to a temporary
+    file page by page and then streamed from disk.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Results")
+    sheet.append(results_schema(category_names).names)
+    for batch in iter_result_batches(test_id, category_names, page_size):
+        for row in zip(*(column.to_pylist() for column in batch.columns)):
+            sheet.append(row)
+
+    with tempfile.TemporaryFile() as spool:
+        workbook.save(spool)
+        spool.seek(0)
+        while True:
+            chunk = spool.read(64 * 1024)
+            if not chunk:
+                break
+            yield chunk
+
+
+EXPORTERS = {
+    ExportFormat.CSV: iter_results_csv,
+    ExportFormat.PARQUET: iter_results_parquet,
+    ExportFormat.ARROW: iter_results_arrow,
+    ExportFormat.XLSX: iter_results_xlsx,
+}
+
+
+def export_filename(test_title: str, extension: str) -> str:
+    safe_title = "".join(c for c in test_title if c.isalnum() or c in (' ', '-', '_')).rstrip()
+    return f"{safe_title}_results.{extension}"
+
+
+def content_disposition(filename: str) -> str:
+    """Attachment header that also works for non-ASCII (e.g. Cyrillic) test titles"""
+    ascii_name = filename.encode("ascii", "ignore").decode() or "results"
+    return f"attachment; filename=\"{ascii_name}\"; filename*=UTF-8''{quote(filename)}"
@@ -0,0 +1,197 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from models.category import Category
+from models.question import Question
+from models.student_answer import StudentAnswer
+from models.test import Test
+from models.test_result import TestResult
+from .analytics import record_submission, record_submission_async
+from .cache import TestCache
+
+# Process-level cache of answer keys; invalidated by the teacher question CRUD
+answer_key_cache = TestCache("answer_keys")
+
+
+@dataclass(frozen=True)
+class AnswerKey:
+    """Correct answers of one test, without question text or options"""
+    test_id: int
+    # question_id -> (correct_answer, index into categories or None)
+    answers: Dict[int, Tuple[str, Optional[int]]]
+    categories: Tuple[str, ...]
+
+    def __len__(self) -> int:
+        return len(self.answers)
+
+
+@dataclass
+class GradedSubmission:
+    score: float
+    category_breakdown: Dict[str, Dict[str, Any]]
+    answer_rows: List[Dict[str, Any]]
+
+
+class InvalidAnswerError(ValueError):
+    def __init__(self, question_id: int):
+        super().__init__(f"Invalid question ID: {question_id}")
+        self.question_id = question_id
+
+
+def answer_key_query(test_id: int):
+    """Single joined SELECT of question ids, correct answers and category names"""
+    return (
+        select(Question.id, Question.correct_answer, Category.name)
+        .outerjoin(Category, Category.id == Question.category_id)
+        .where(Question.test_id == test_id)
+        .order_by(Question.id)
+    )
+
+
+def build_answer_key(test_id: int, rows: Iterable[Tuple[int, str, Optional[str]]]) -> AnswerKey:
+    answers = {}
+    categories = []
+    category_index = {}
+
+    for question_id, correct_answer, category_name in rows:
+        index = None
+        if category_name is not None:
+            index = category_index.get(category_name)
+            if index is None:
+                index = category_index[category_name] = len(categories)
+                categories.append(category_name)
+        answers[question_id] = (correct_answer, index)
+
+    return AnswerKey(test_id=test_id, answers=answers, categories=tuple(categories))
+
+
+def load_answer_key(db: Session, test_id: int) -> AnswerKey:
+    return build_answer_key(test_id, db.execute(answer_key_query(test_id)).all())
+
+
+def get_answer_key(db: Session, test_id: int) -> Optional[AnswerKey]:
+    """Cached answer key of a test, or None if the test does not exist"""
+    def load():
+        answer_key = load_answer_key(db, test_id)
+        if not answer_key.answers and db.get(Test, test_id) is None:
+            return None
+        return answer_key
+
+    return answer_key_cache.get_or_load(test_id, load)
+
+
+async def get_answer_key_async(db: AsyncSession, test_id: int) -> Optional[AnswerKey]:
+    """get_answer_key for the async database path"""
+    async def load():
+        rows = (await db.execute(answer_key_query(test_id))).all()
+        if not rows and await db.get(Test, test_id) is None:
+            return None
+        return build_answer_key(test_id, rows)
+
+    return await answer_key_cache.get_or_load_async(test_id, load)
+
+
+def grade_submission(answer_key: AnswerKey, user_id: int, answers: Iterable[Any]) -> GradedSubmission:
+    """
+    Grade a whole submission in memory.
+
+    `answers` are objects with `question_id` and `answer` attributes
+    (e.g. StudentAnswerCreate). Raises InvalidAnswerError for a question
+    that does not belong to the test.
+    """
+    key = answer_key.answers
+    correct_by_category = [0] * len(answer_key.categories)
+    total_by_category = [0] * len(answer_key.categories)
+    correct_answers = 0
+    answer_rows = []
+
+    for answer in answers:
+        entry = key.get(answer.question_id)
+        if entry is None:
+            raise InvalidAnswerError(answer.question_id)
+
+        correct_answer, category = entry
+        is_correct = answer.answer == correct_answer
+        if is_correct:
+            correct_answers += 1
+        if category is not None:
+            total_by_category[category] += 1
+            if is_correct:
+                correct_by_category[category] += 1
+
+        answer_rows.append({
+            "user_id": user_id,
+            "question_id": answer.question_id,
+            "answer": answer.answer,
+            "is_correct": is_correct,
+        })
+
+    total_questions = len(key)
+    score = (correct_answers / total_questions) * 100 if total_questions > 0 else 0
+
+    category_breakdown = {}
+    for index, category_name in enumerate(answer_key.categories):
+        total = total_by_category[index]
+        if total == 0:
+            continue
+        category_breakdown[category_name] = {
+            "correct": correct_by_category[index],
+            "total": total,
+            "percentage": (correct_by_category[index] / total) * 100,
+        }
+
+    return GradedSubmission(
+        score=score,
+        category_breakdown=category_breakdown,
+        answer_rows=answer_rows,
+    )
+
+
+def new_test_result(user_id: int, test_id: int, graded: GradedSubmission) -> TestResult:
+    return TestResult(
+        user_id=user_id,
+        test_id=test_id,
+        score=graded.score,
+        category_breakdown=graded.category_breakdown
+    )
+
+
+def save_graded_submission(
+    db: Session,
+    user_id: int,
+    test_id: int,
+    graded: GradedSubmission
+) -> TestResult:
+    """
+    Insert the TestResult row, then all StudentAnswer rows in one bulk INSERT,
+    and add the submission to the analytics counters in the same transaction.
+    The result goes first so a duplicate submission fails on the
+    (user_id, test_id) unique index before any answers are written.
+    """
+    test_result = new_test_result(user_id, test_id, graded)
+    db.add(test_result)
+    db.flush()
+
+    if graded.answer_rows:
+        db.execute(insert(StudentAnswer), graded.answer_rows)
+    record_submission(db, test_id, graded)
+    return test_result
+
+
+async def save_graded_submission_async(
+    db: AsyncSession,
+    user_id: int,
+    test_id: int,
+    graded: GradedSubmission
+) -> TestResult:
+    """save_graded_submission for the async database path"""
+    test_result = new_test_result(user_id, test_id, graded)
+    db.add(test_result)
+    await db.flush()
+
+    if graded.answer_rows:
+        await db.execute(insert(StudentAnswer), graded.answer_rows)
+    await record_submission_async(db, test_id, graded)
+    return test_result
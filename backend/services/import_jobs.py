@@ -0,0 +1,194 @@
+import os
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Dict, Optional, Set
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models.import_job import ImportJob
+from .question_stream import SOURCE_FORMATS, StreamProgress, stream_import_questions
+from .write_queue import run_write
+
+# Where uploaded question files wait for their import job (not under the public uploads dir)
+IMPORT_DIR = os.getenv("IMPORT_DIR", os.path.join(tempfile.gettempdir(), "synapse_imports"))
+IMPORT_MAX_UPLOAD_MB = int(os.getenv("IMPORT_MAX_UPLOAD_MB", "100"))
+# SQLite has a single writer, so imports run one at a time by default
+IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", "1"))
+# Finished jobs kept for status queries
+IMPORT_JOBS_KEPT = int(os.getenv("IMPORT_JOBS_KEPT", "100"))
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLarge(ValueError):
+    """The uploaded file is larger than IMPORT_MAX_UPLOAD_MB"""
+
+
+class ImportInterrupted(RuntimeError):
+    """The server is shutting down; batches committed so far are kept"""
+
+
+class ImportJobManager:
+    """
+    Runs question imports in background worker threads. Job status and
+    progress are kept in the import_jobs table, so a status query can be
+    answered by any worker process, not only the one running the import.
+    These small status writes go through run_write (the SQLite writer queue);
+    the imported batches do not, since one batch would hold the writer for
+    as long as thousands of small writes. Uploaded files are removed when
+    their job finishes.
+    """
+
+    def __init__(self, upload_dir: str, workers: int, max_upload_bytes: int, jobs_kept: int):
+        self.upload_dir = upload_dir
+        self.workers = workers
+        self.max_upload_bytes = max_upload_bytes
+        self.jobs_kept = jobs_kept
+        # Jobs of this process that have not started yet, cancelled on shutdown
+        self._queued: Set[str] = set()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stopping = threading.Event()
+
+    def save_upload(self, source: BinaryIO, filename: str) -> str:
+        """Copy an upload to the import directory in chunks and return its path"""
+        os.makedirs(self.upload_dir, exist_ok=True)
+        extension = os.path.splitext(filename)[1].lower()
+        path = os.path.join(self.upload_dir, f"{uuid.uuid4().hex}{extension}")
+        size = 0
+        try:
+            with open(path, "wb") as destination:
+                while True:
+                    chunk = source.read(UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > self.max_upload_bytes:
+                        raise UploadTooLarge(f"File too large. Maximum size is {self.max_upload_bytes // (1024 * 1024)}MB")
+                    destination.write(chunk)
+        except BaseException:
+            _remove(path)
+            raise
+        return path
+
+    def submit(self, test_id: int, path: str, filename: str, format: str, created_by: int) -> ImportJob:
+        job = ImportJob(id=uuid.uuid4().hex, test_id=test_id, filename=filename, format=format,
+                        created_by=created_by, status="queued", path=path, rows_processed=0, rows_imported=0,
+                        rows_failed=0, categories_created=0, errors=[])
+        def add(session: Session) -> ImportJob:
+            self._forget_old_jobs(session)
+            session.add(job)
+            return job
+
+        job = run_write(SessionLocal(), add)
+        with self._lock:
+            self._queued.add(job.id)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="question-import")
+            self._executor.submit(self._run, job.id, test_id, path, format)
+        return job
+
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        with SessionLocal() as db:
+            return db.get(ImportJob, job_id)
+
+    def shutdown(self, wait: bool = True):
+        """Cancel queued jobs and stop running ones after their current batch"""
+        self._stopping.set()
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+        with self._lock:
+            cancelled, self._queued = self._queued, set()
+        for job_id in cancelled:
+            self._finish(job_id, error="Import cancelled by server shutdown")
+
+    def stats(self) -> Dict[str, int]:
+        """Jobs of all worker processes by status"""
+        with SessionLocal() as db:
+            counts = dict(db.execute(select(ImportJob.status, func.count()).group_by(ImportJob.status)).all())
+        stats = {"workers": self.workers}
+        for status in ("queued", "running", "completed", "failed"):
+            stats[status] = counts.get(status, 0)
+        return stats
+
+    def _run(self, job_id: str, test_id: int, path: str, format: str):
+        with self._lock:
+            self._queued.discard(job_id)
+        self._update(job_id, status="running")
+
+        def on_progress(progress: StreamProgress):
+            if self._stopping.is_set():
+                raise ImportInterrupted("Import interrupted by server shutdown")
+            # Called after each batch is committed, so the import holds no write lock here
+            self._update(
+                job_id,
+                rows_processed=progress.rows_processed,
+                rows_imported=progress.rows_imported,
+                rows_failed=progress.rows_failed,
+                progress=progress.fraction,
+            )
+
+        try:
+            with SessionLocal() as db:
+                report = stream_import_questions(db, test_id, path, format=format, on_progress=on_progress)
+            self._finish(
+                job_id,
+                rows_processed=report.rows_total,
+                rows_imported=report.rows_imported,
+                rows_failed=report.rows_failed,
+                categories_created=report.categories_created,
+                errors=[list(error) for error in report.errors],
+                progress=1.0,
+            )
+        except Exception as e:
+            self._finish(job_id, error=str(e))
+
+    def _update(self, job_id: str, **values):
+        run_write(SessionLocal(), lambda session: session.execute(
+            update(ImportJob).where(ImportJob.id == job_id).values(**values)
+        ))
+
+    def _finish(self, job_id: str, error: Optional[str] = None, **values):
+        def finish(session: Session) -> Optional[str]:
+            session.execute(update(ImportJob).where(ImportJob.id == job_id).values(
+                error=error, finished_at=func.now(), status="failed" if error else "completed", **values
+            ))
+            return session.scalar(select(ImportJob.path).where(ImportJob.id == job_id))
+
+        path = run_write(SessionLocal(), finish)
+        if path:
+            _remove(path)
+            _remove(f"{path}.import-state.json")
+
+    def _forget_old_jobs(self, db: Session):
+        old = (
+            select(ImportJob.id)
+            .where(ImportJob.status.in_(("completed", "failed")))
+            .order_by(ImportJob.created_at.desc(), ImportJob.id)
+            .offset(self.jobs_kept)
+        )
+        db.execute(delete(ImportJob).where(ImportJob.id.in_(old)), execution_options={"synchronize_session": False})
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def upload_format(filename: str) -> Optional[str]:
+    return SOURCE_FORMATS.get(os.path.splitext(filename or "")[1].lower())
+
+
+import_jobs = ImportJobManager(
+    IMPORT_DIR,
+    workers=IMPORT_WORKERS,
+    max_upload_bytes=IMPORT_MAX_UPLOAD_MB * 1024 * 1024,
+    jobs_kept=IMPORT_JOBS_KEPT,
+)
@@ -0,0 +1,228 @@
+import math
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from models.question import Question
+from models.student_answer import StudentAnswer
+from models.test_result import TestResult
+from .cache import TestCache
+
+# Cached per test together with the (latest submission timestamp, result count) it was computed for
+item_analysis_cache = TestCache("item_analysis", max_entries=64)
+
+# Thresholds for the flags
+TOO_HARD_P = 0.2
+TOO_EASY_P = 0.9
+LOW_DISCRIMINATION = 0.2
+MIN_DISTRACTOR_SHARE = 0.05
+
+# Response codes besides option indexes
+NOT_AN_OPTION = -1  # e.g. "Не знаю"
+NO_ANSWER = -2
+
+
+@dataclass
+class ResponseMatrix:
+    """Answers of one test as a students x questions matrix of option indexes"""
+    question_ids: List[int]
+    question_texts: List[str]
+    options: List[List[str]]
+    # Index of the correct option per question, -3 if it is not among the options
+    correct: np.ndarray
+    codes: np.ndarray
+
+
+@dataclass
+class DistractorStats:
+    answer: str
+    share: float
+    # Correlation of choosing this option with the rest score; should be negative
+    discrimination: Optional[float]
+    flags: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ItemStats:
+    question_id: int
+    text: str
+    p_value: Optional[float]
+    # Point-biserial correlation of the item with the rest of the test
+    discrimination: Optional[float]
+    no_option_share: float
+    flags: List[str] = field(default_factory=list)
+    distractors: List[DistractorStats] = field(default_factory=list)
+
+
+@dataclass
+class TestItemAnalysis:
+    test_id: int
+    students: int
+    questions: int
+    mean_score: Optional[float]
+    score_std: Optional[float]
+    kr20: Optional[float]
+    items: List[ItemStats]
+
+
+def load_response_matrix(db: Session, test_id: int) -> ResponseMatrix:
+    """Questions of the test, then all of its answers in a single query"""
+    questions = db.execute(
+        select(Question.id, Question.text, Question.options, Question.correct_answer)
+        .where(Question.test_id == test_id)
+        .order_by(Question.id)
+    ).all()
+    question_ids = [row.id for row in questions]
+    options = [list(row.options or []) for row in questions]
+    correct = np.array(
+        [opts.index(row.correct_answer) if row.correct_answer in opts else -3 for row, opts in zip(questions, options)],
+        dtype=np.int16,
+    )
+
+    answers = db.execute(
+        select(StudentAnswer.user_id, StudentAnswer.question_id, StudentAnswer.answer)
+        .join(Question, Question.id == StudentAnswer.question_id)
+        .where(Question.test_id == test_id)
+    ).all()
+    if not answers or not questions:
+        return ResponseMatrix(question_ids, [row.text for row in questions], options, correct,
+                              np.empty((0, len(questions)), dtype=np.int16))
+
+    user_ids, answer_question_ids, answer_texts = zip(*answers)
+    _, student_index = np.unique(np.array(user_ids), return_inverse=True)
+    question_index = np.searchsorted(np.array(question_ids), np.array(answer_question_ids))
+    option_codes = {
+        (question_id, option): index
+        for question_id, opts in zip(question_ids, options)
+        for index, option in enumerate(opts)
+    }
+    answer_codes = np.fromiter(
+        (option_codes.get(key, NOT_AN_OPTION) for key in zip(answer_question_ids, answer_texts)),
+        dtype=np.int16,
+        count=len(answers),
+    )
+
+    codes = np.full((student_index.max() + 1, len(question_ids)), NO_ANSWER, dtype=np.int16)
+    codes[student_index, question_index] = answer_codes
+    return ResponseMatrix(question_ids, [row.text for row in questions], options, correct, codes)
+
+
+def _column_correlation(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Pearson correlation of matching columns of x and y; NaN where a column is constant"""
+    x = x - x.mean(axis=0)
+    y = y - y.mean(axis=0)
+    denominator = np.sqrt((x * x).sum(axis=0) * (y * y).sum(axis=0))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(denominator > 0, (x * y).sum(axis=0) / denominator, np.nan)
+
+
+def _number(value: Any) -> Optional[float]:
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+def analyze_responses(test_id: int, matrix: ResponseMatrix) -> TestItemAnalysis:
+    """Difficulty, discrimination, KR-20 and distractor flags, computed column-wise"""
+    codes = matrix.codes
+    students, questions = codes.shape
+    if students == 0 or questions == 0:
+        return TestItemAnalysis(test_id, students, questions, None, None, None, [])
+
+    scored = (codes == matrix.correct[None, :]).astype(np.float64)
+    totals = scored.sum(axis=1)
+    # Rest score: total without the item itself, so an item does not correlate with itself
+    rest = totals[:, None] - scored
+
+    p_values = scored.mean(axis=0)
+    discrimination = _column_correlation(scored, rest)
+    no_option_share = (codes < 0).mean(axis=0)
+
+    total_variance = totals.var()
+    kr20 = None
+    if questions > 1 and total_variance > 0:
+        kr20 = questions / (questions - 1) * (1 - (p_values * (1 - p_values)).sum() / total_variance)
+
+    max_options = max((len(opts) for opts in matrix.options), default=0)
+    option_share = np.zeros((max_options, questions))
+    option_discrimination = np.full((max_options, questions), np.nan)
+    for option in range(max_options):
+        chosen = (codes == option).astype(np.float64)
+        option_share[option] = chosen.mean(axis=0)
+        option_discrimination[option] = _column_correlation(chosen, rest)
+
+    items = []
+    for column, question_id in enumerate(matrix.question_ids):
+        p_value = p_values[column]
+        item_discrimination = _number(discrimination[column])
+        flags = []
+        if p_value < TOO_HARD_P:
+            flags.append("too_hard")
+        elif p_value > TOO_EASY_P:
+            flags.append("too_easy")
+        if item_discrimination is not None:
+            if item_discrimination < 0:
+                flags.append("negative_discrimination")
+            elif item_discrimination < LOW_DISCRIMINATION:
+                flags.append("low_discrimination")
+        if matrix.correct[column] < 0:
+            flags.append("correct_answer_not_in_options")
+
+        distractors = []
+        for option, answer in enumerate(matrix.options[column]):
+            if option == matrix.correct[column]:
+                continue
+            share = float(option_share[option, column])
+            option_r = _number(option_discrimination[option, column])
+            distractor_flags = []
+            if share < MIN_DISTRACTOR_SHARE:
+                distractor_flags.append("rarely_chosen")
+            if option_r is not None and option_r > 0:
+                distractor_flags.append("attracts_strong_students")
+            distractors.append(DistractorStats(answer, share, option_r, distractor_flags))
+        if any(distractor.flags for distractor in distractors):
+            flags.append("weak_distractors")
+
+        items.append(ItemStats(
+            question_id=question_id,
+            text=matrix.question_texts[column],
+            p_value=float(p_value),
+            discrimination=item_discrimination,
+            no_option_share=float(no_option_share[column]),
+            flags=flags,
+            distractors=distractors,
+        ))
+
+    return TestItemAnalysis(
+        test_id=test_id,
+        students=students,
+        questions=questions,
+        mean_score=float(totals.mean() / questions * 100),
+        score_std=float(totals.std() / questions * 100),
+        kr20=_number(kr20) if kr20 is not None else None,
+        items=items,
+    )
+
+
+def submission_stamp(db: Session, test_id: int) -> Tuple[Any, int]:
+    """(latest submission timestamp, number of submissions) of a test"""
+    return tuple(db.execute(
+        select(func.max(TestResult.timestamp), func.count(TestResult.id)).where(TestResult.test_id == test_id)
+    ).one())
+
+
+def get_item_analysis(db: Session, test_id: int) -> TestItemAnalysis:
+    """
+    Cached item analysis, recomputed when a new submission arrives (the
+    stamp changes) or when the test's questions change (cache invalidation).
+    """
+    stamp = submission_stamp(db, test_id)
+
+    def load():
+        return stamp, analyze_responses(test_id, load_response_matrix(db, test_id))
+
+    cached_stamp, analysis = item_analysis_cache.get_or_load(test_id, load)
+    if cached_stamp != stamp:
+        item_analysis_cache.invalidate(test_id)
+        cached_stamp, analysis = item_analysis_cache.get_or_load(test_id, load)
+    return analysis
@@ -0,0 +1,147 @@
+import base64
+import binascii
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+# Upper bound for the limit query parameter of list endpoints
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "500"))
+
+
+class InvalidPageRequest(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class PageParams:
+    """limit / cursor / sort query parameters; no limit means the whole list"""
+    limit: Optional[int] = None
+    cursor: Optional[str] = None
+    sort: str = "id"
+
+
+@dataclass(frozen=True)
+class SortOrder:
+    """
+    Sortable columns of one list, by the name used in the sort parameter
+    ("title" ascending, "-title" descending). The id column breaks ties, so
+    (sort value, id) is unique and the keyset order is stable; "id" itself
+    is the creation order.
+    """
+    id_column: Any
+    columns: Dict[str, Any]
+
+    def resolve(self, sort: str) -> Tuple[str, Any, bool]:
+        descending = sort.startswith("-")
+        name = sort[1:] if descending else sort
+        if name == "id":
+            return sort, self.id_column, descending
+        column = self.columns.get(name)
+        if column is None:
+            allowed = ", ".join(["id", *self.columns])
+            raise InvalidPageRequest(f"Unknown sort field '{name}', expected one of: {allowed}")
+        return sort, column, descending
+
+
+@dataclass
+class Page:
+    items: List[Any]
+    total: int
+    next_cursor: Optional[str]
+
+    def headers(self) -> Dict[str, str]:
+        headers = {"X-Total-Count": str(self.total)}
+        if self.next_cursor is not None:
+            headers["X-Next-Cursor"] = self.next_cursor
+        return headers
+
+
+def encode_cursor(sort: str, value: Any, row_id: int, total: int) -> str:
+    """
+    Opaque cursor: the sort field and (sort value, id) of the last row of a
+    page, plus the total counted for the first page so that following
+    pages do not count again.
+    """
+    payload = json.dumps([sort, value, row_id, total], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, int, int]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, value, row_id, total = json.loads(payload)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise InvalidPageRequest("Invalid cursor")
+    if not isinstance(row_id, int) or not isinstance(total, int):
+        raise InvalidPageRequest("Invalid cursor")
+    if cursor_sort != sort:
+        raise InvalidPageRequest("Cursor was issued for a different sort order")
+    return value, row_id, total
+
+
+def _after(column: Any, id_column: Any, descending: bool, value: Any, row_id: int):
+    """Rows strictly after (value, row_id) in the page order"""
+    if column is id_column:
+        return id_column < row_id if descending else id_column > row_id
+    if descending:
+        return or_(column < value, and_(column == value, id_column < row_id))
+    return or_(column > value, and_(column == value, id_column > row_id))
+
+
+class PageQuery:
+    """Keyset pagination of a filtered SELECT of one entity"""
+
+    def __init__(self, statement: Select, order: SortOrder, params: PageParams):
+        self.sort, self.column, self.descending = order.resolve(params.sort)
+        self.id_column = order.id_column
+        self.limit = params.limit
+        self.total = None
+        self.count_statement = None
+        if self.limit is not None and params.cursor is None:
+            # Counted once, on the first page, without ORDER BY or the keyset condition
+            self.count_statement = select(func.count()).select_from(statement.order_by(None).subquery())
+
+        keys = [self.column, self.id_column] if self.column is not self.id_column else [self.id_column]
+        statement = statement.order_by(*(key.desc() if self.descending else key for key in keys))
+        if params.cursor is not None:
+            value, row_id, self.total = decode_cursor(params.cursor, self.sort)
+            statement = statement.where(_after(self.column, self.id_column, self.descending, value, row_id))
+        if self.limit is not None:
+            # One extra row tells whether there is a next page
+            statement = statement.limit(self.limit + 1)
+        self.statement = statement
+
+    def page(self, rows: List[Any], total: Optional[int]) -> Page:
+        if self.limit is None:
+            return Page(rows, len(rows), None)
+        total = self.total if total is None else total
+        next_cursor = None
+        if len(rows) > self.limit:
+            rows = rows[:self.limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(
+                self.sort, getattr(last, self.column.key), getattr(last, self.id_column.key), total
+            )
+        return Page(rows, total, next_cursor)
+
+
+def paginate(db: Session, statement: Select, order: SortOrder, params: PageParams) -> Page:
+    """
+    One page of `statement` (a select() of a mapped class) in the requested
+    order. Raises InvalidPageRequest for an unknown sort field or a bad cursor.
+    """
+    query = PageQuery(statement, order, params)
+    total = db.scalar(query.count_statement) if query.count_statement is not None else None
+    return query.page(list(db.scalars(query.statement)), total)
+
+
+async def paginate_async(db: AsyncSession, statement: Select, order: SortOrder, params: PageParams) -> Page:
+    """paginate for the async database path"""
+    query = PageQuery(statement, order, params)
+    total = await db.scalar(query.count_statement) if query.count_statement is not None else None
+    return query.page(list(await db.scalars(query.statement)), total)
@@ -0,0 +1,138 @@
+import json
+import re
+from typing import Any, Dict, List, Tuple
+import pandas as pd
+from sqlalchemy.orm import Session
+from .question_import import IMPORT_BATCH_SIZE, REQUIRED_FIELDS, ImportReport, QuestionImporter
+
+OPTIONS_SEPARATOR = ";"
+OPTIONAL_FIELDS = ("image_url", "table_data")
+# Characters json.dumps escapes in strings (other control characters become \uXXXX)
+_JSON_ESCAPES = {'"': '\\"', "\\": "\\\\", "\n": "\\n", "\r": "\\r", "\t": "\\t", "\b": "\\b", "\f": "\\f"}
+
+
+class ExcelColumnsError(ValueError):
+    """The sheet lacks one of the required question columns"""
+
+
+def read_question_sheet(source) -> pd.DataFrame:
+    """Read a question sheet as text columns, without fully blank rows"""
+    df = pd.read_excel(source, dtype=str)
+    df.columns = [str(name).strip() for name in df.columns]
+    missing = [name for name in REQUIRED_FIELDS if name not in df.columns]
+    if missing:
+        raise ExcelColumnsError(f"Missing required columns: {', '.join(missing)}")
+    for name in OPTIONAL_FIELDS:
+        if name not in df.columns:
+            df[name] = None
+
+    df = df[list(REQUIRED_FIELDS + OPTIONAL_FIELDS)]
+    # Row numbers count data rows from 1, as in the CSV and JSON importers
+    df.index = pd.RangeIndex(1, len(df) + 1)
+    text = df.apply(lambda column: column.str.strip())
+    return df[text.notna().any(axis=1) & text.ne("").any(axis=1)]
+
+
+def _clean_options(options: pd.Series) -> pd.Series:
+    """Option strings without whitespace and empty options around separators; empty rows get NaN"""
+    separator = re.escape(OPTIONS_SEPARATOR)
+    cleaned = (
+        options.str.replace(rf"\s*{separator}[\s{separator}]*", OPTIONS_SEPARATOR, regex=True)
+        .str.strip()
+        .str.strip(OPTIONS_SEPARATOR)
+    )
+    return cleaned.where(cleaned != "")
+
+
+def split_options(options: pd.Series) -> pd.Series:
+    """Option lists per row, stripped and without empty options; empty rows get NaN"""
+    return _clean_options(options).str.split(OPTIONS_SEPARATOR)
+
+
+def options_json(options: pd.Series) -> pd.Series:
+    """
+    The option lists of split_options as JSON arrays, exactly as
+    json.dumps(..., ensure_ascii=False) writes them, but built with column
+    string operations instead of a json.dumps call per row; empty rows get "[]"
+    """
+    escaped = _clean_options(options).str.replace(
+        r'["\\\x00-\x1f]',
+        lambda match: _JSON_ESCAPES.get(match.group(), f"\\u{ord(match.group()):04x}"),
+        regex=True,
+    )
+    return ('["' + escaped.str.replace(OPTIONS_SEPARATOR, '", "', regex=False) + '"]').fillna("[]")
+
+
+def prepare_question_records(df: pd.DataFrame) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[Tuple[int, str]]]:
+    """
+    Validate a question sheet column-wise and convert it to typed records for
+    QuestionImporter.add_normalized. Returns (numbered records, row errors).
+    Unlike the CSV and JSON importers, this also rejects rows whose
+    correct_answer is not one of the options: the sheet is typed by hand from
+    the template, where such a row is a typo that no student could answer.
+    """
+    text = df.apply(lambda column: column.str.strip())
+    blank = text.isna() | text.eq("")
+
+    options = split_options(df["options"])
+    exploded = options.explode()
+    no_options = options.isna() & ~blank["options"]
+    # correct_answer is compared with every option of its own row at once
+    answer_found = exploded.eq(text["correct_answer"].reindex(exploded.index)).groupby(level=0).any()
+    wrong_answer = ~answer_found.reindex(df.index, fill_value=False) & ~options.isna()
+
+    errors: Dict[int, str] = {}
+    required_blank = blank[list(REQUIRED_FIELDS)]
+    for row_number in required_blank.index[required_blank.any(axis=1)]:
+        missing = [name for name in REQUIRED_FIELDS if required_blank.at[row_number, name]]
+        errors[row_number] = f"missing {', '.join(missing)}"
+    for row_number in no_options.index[no_options]:
+        errors.setdefault(row_number, "options is empty")
+    for row_number in wrong_answer.index[wrong_answer]:
+        errors.setdefault(row_number, "correct_answer is not one of the options")
+
+    # table_data is free-form JSON and is only parsed where it is filled in
+    table_data = pd.Series([None] * len(df), index=df.index, dtype=object)
+    for row_number in blank.index[~blank["table_data"]]:
+        if row_number in errors:
+            continue
+        try:
+            value = json.loads(df.at[row_number, "table_data"])
+        except ValueError:
+            errors[row_number] = "table_data is not valid JSON"
+            continue
+        if value is not None and not isinstance(value, dict):
+            errors[row_number] = "table_data must be a JSON object"
+            continue
+        table_data.at[row_number] = value
+
+    valid = ~df.index.isin(list(errors))
+    records = pd.DataFrame({
+        "category": text["category"],
+        "text": df["text"],
+        "options": options,
+        "correct_answer": text["correct_answer"],
+        "image_url": text["image_url"].astype(object).where(~blank["image_url"], None),
+        "table_data": table_data,
+    })[valid]
+    # Column lists zipped into dicts; much cheaper than DataFrame.to_dict("records")
+    names = list(records.columns)
+    rows = zip(*(records[name].astype(object).tolist() for name in names))
+    numbered = [(row_number, dict(zip(names, row))) for row_number, row in zip(records.index.tolist(), rows)]
+    return numbered, sorted(errors.items())
+
+
+def import_excel_questions(
+    db: Session,
+    test_id: int,
+    source,
+    batch_size: int = IMPORT_BATCH_SIZE
+) -> ImportReport:
+    """Import an Excel question sheet straight into a test, in one transaction"""
+    records, errors = prepare_question_records(read_question_sheet(source))
+    importer = QuestionImporter(db, test_id, batch_size=batch_size)
+    for row_number, message in errors:
+        importer.add_error(row_number, message)
+    for row_number, record in records:
+        importer.add_normalized(row_number, record)
+    return importer.finish()
@@ -0,0 +1,226 @@
+import ast
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from models.category import Category
+from models.question import Question
+from .cache import invalidate_test
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+# Only the first errors are kept in the report; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+REQUIRED_FIELDS = ("category", "text", "options", "correct_answer")
+
+# repr() of a list of plain strings, e.g. "['A', 'B']"; parsed without ast
+_SIMPLE_LIST_LITERAL = re.compile(r"\[(?:'[^'\\]*'(?:, '[^'\\]*')*)?\]")
+_SIMPLE_LIST_ITEM = re.compile(r"'([^'\\]*)'")
+
+
+class RowError(ValueError):
+    """A single input row that cannot be imported"""
+
+
+@dataclass
+class ImportReport:
+    rows_total: int = 0
+    rows_imported: int = 0
+    rows_failed: int = 0
+    categories_created: int = 0
+    batches_committed: int = 0
+    # Rows skipped because a previous run already committed them
+    resumed_after_row: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+    def add_error(self, row_number: int, message: str):
+        self.rows_failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((row_number, message))
+
+
+def _is_blank(value: Any) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, float) and value != value:  # NaN from pandas
+        return True
+    return isinstance(value, str) and not value.strip()
+
+
+def parse_options(value: Any) -> List[str]:
+    """
+    Options as a list: a JSON list, a Python list literal (the format written
+    by excel_to_csv_converter.py) or a ";"-separated string.
+    """
+    if isinstance(value, (list, tuple)):
+        options = value
+    else:
+        text = str(value).strip()
+        if _SIMPLE_LIST_LITERAL.fullmatch(text):
+            options = _SIMPLE_LIST_ITEM.findall(text)
+        elif text.startswith("["):
+            try:
+                options = json.loads(text)
+            except ValueError:
+                try:
+                    options = ast.literal_eval(text)
+                except (ValueError, SyntaxError):
+                    raise RowError("options is not a valid list")
+        else:
+            options = text.split(";")
+    options = [str(option).strip() for option in options if not _is_blank(option)]
+    if not options:
+        raise RowError("options is empty")
+    return options
+
+
+def parse_table_data(value: Any) -> Optional[Dict[str, Any]]:
+    if _is_blank(value):
+        return None
+    if isinstance(value, dict):
+        return value
+    try:
+        table_data = json.loads(value)
+    except (TypeError, ValueError):
+        raise RowError("table_data is not valid JSON")
+    if table_data is not None and not isinstance(table_data, dict):
+        raise RowError("table_data must be a JSON object")
+    return table_data
+
+
+def normalize_record(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate one input row (CSV, JSON or Excel) and convert it to column values"""
+    missing = [name for name in REQUIRED_FIELDS if _is_blank(raw.get(name))]
+    if missing:
+        raise RowError(f"missing {', '.join(missing)}")
+
+    image_url = raw.get("image_url")
+    return {
+        "category": str(raw["category"]).strip(),
+        "text": str(raw["text"]),
+        "options": parse_options(raw["options"]),
+        "correct_answer": str(raw["correct_answer"]).strip(),
+        "image_url": None if _is_blank(image_url) else str(image_url).strip(),
+        "table_data": parse_table_data(raw.get("table_data")),
+    }
+
+
+class QuestionImporter:
+    """
+    Batched question import into one test.
+
+    Rows are validated and buffered; each full batch resolves its distinct
+    category names in one query, creates the missing ones in one bulk INSERT
+    and inserts its questions with one executemany INSERT. By default all
+    batches share one transaction, committed by finish(); with
+    commit_every_batch each batch is committed on its own.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        test_id: int,
+        batch_size: int = IMPORT_BATCH_SIZE,
+        commit_every_batch: bool = False,
+        on_batch=None
+    ):
+        self.db = db
+        self.test_id = test_id
+        self.batch_size = batch_size
+        self.commit_every_batch = commit_every_batch
+        # Called as on_batch(report, last_row_number) after every written batch
+        self.on_batch = on_batch
+        self.report = ImportReport()
+        self._category_ids: Dict[str, int] = {}
+        self._buffer: List[Dict[str, Any]] = []
+        self._last_row_number = 0
+
+    def add(self, row_number: int, raw: Dict[str, Any]):
+        self.report.rows_total += 1
+        self._last_row_number = row_number
+        try:
+            self._buffer.append(normalize_record(raw))
+        except RowError as e:
+            self.report.add_error(row_number, str(e))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def add_many(self, rows: Iterable[Tuple[int, Dict[str, Any]]]):
+        for row_number, raw in rows:
+            self.add(row_number, raw)
+
+    def add_error(self, row_number: int, message: str):
+        """Count a row that was rejected before reaching the importer"""
+        self.report.rows_total += 1
+        self.report.add_error(row_number, message)
+
+    def add_normalized(self, row_number: int, record: Dict[str, Any]):
+        """Add a row that was already validated, e.g. by a vectorized reader"""
+        self.report.rows_total += 1
+        self._last_row_number = row_number
+        self._buffer.append(record)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered rows as one batch"""
+        if self._buffer:
+            category_ids = self._resolve_categories({record["category"] for record in self._buffer})
+            self.db.execute(insert(Question), [
+                {
+                    "test_id": self.test_id,
+                    "category_id": category_ids[record["category"]],
+                    "text": record["text"],
+                    "image_url": record["image_url"],
+                    "table_data": record["table_data"],
+                    "options": record["options"],
+                    "correct_answer": record["correct_answer"],
+                }
+                for record in self._buffer
+            ])
+            self.report.rows_imported += len(self._buffer)
+            self._buffer = []
+
+        if self.commit_every_batch:
+            self.db.commit()
+            self.report.batches_committed += 1
+            invalidate_test(self.test_id)
+        if self.on_batch is not None:
+            self.on_batch(self.report, self._last_row_number)
+
+    def finish(self) -> ImportReport:
+        """Write the last batch, commit and invalidate the test's caches"""
+        self.flush()
+        self.db.commit()
+        invalidate_test(self.test_id)
+        return self.report
+
+    def _resolve_categories(self, names) -> Dict[str, int]:
+        unknown = [name for name in names if name not in self._category_ids]
+        if unknown:
+            self._category_ids.update(
+                self.db.execute(select(Category.name, Category.id).where(Category.name.in_(unknown))).all()
+            )
+            missing = [name for name in unknown if name not in self._category_ids]
+            if missing:
+                self.db.execute(insert(Category), [{"name": name} for name in missing])
+                self._category_ids.update(
+                    self.db.execute(select(Category.name, Category.id).where(Category.name.in_(missing))).all()
+                )
+                self.report.categories_created += len(missing)
+        return self._category_ids
+
+
+def import_questions(
+    db: Session,
+    test_id: int,
+    rows: Iterable[Tuple[int, Dict[str, Any]]],
+    batch_size: int = IMPORT_BATCH_SIZE
+) -> ImportReport:
+    """Import numbered raw rows into a test in one transaction"""
+    importer = QuestionImporter(db, test_id, batch_size=batch_size)
+    importer.add_many(rows)
+    return importer.finish()
@@ -0,0 +1,75 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from models.question import Question
+from models.test import Test
+from schemas.question import QuestionResponse
+from .cache import TestCache
+
+DONT_KNOW_OPTION = "Не знаю"
+
+# Student-facing question lists; invalidated by the teacher question CRUD
+student_questions_cache = TestCache("student_questions")
+
+
+@dataclass(frozen=True)
+class QuestionPayload:
+    """Ready-to-send JSON body of a test's questions for students"""
+    body: bytes
+    etag: str
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """True if an If-None-Match header value covers this payload"""
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            if tag == "*" or tag == self.etag:
+                return True
+        return False
+
+
+def build_student_payload(questions) -> QuestionPayload:
+    """Validate once, hide correct answers, add the "Не знаю" option and serialize"""
+    items = []
+    for question in questions:
+        item = QuestionResponse.model_validate(question).model_dump(mode="json")
+        item["correct_answer"] = None
+        if DONT_KNOW_OPTION not in item["options"]:
+            item["options"].append(DONT_KNOW_OPTION)
+        items.append(item)
+
+    # Same encoding as FastAPI's JSONResponse
+    body = json.dumps(items, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    return QuestionPayload(body=body, etag=etag)
+
+
+def _questions_query(test_id: int):
+    return select(Question).where(Question.test_id == test_id).order_by(Question.id)
+
+
+def get_student_payload(db: Session, test_id: int) -> Optional[QuestionPayload]:
+    """Cached student question payload of a test, or None if the test does not exist"""
+    def load():
+        if db.get(Test, test_id) is None:
+            return None
+        return build_student_payload(db.scalars(_questions_query(test_id)).all())
+
+    return student_questions_cache.get_or_load(test_id, load)
+
+
+async def get_student_payload_async(db: AsyncSession, test_id: int) -> Optional[QuestionPayload]:
+    """get_student_payload for the async database path"""
+    async def load():
+        if await db.get(Test, test_id) is None:
+            return None
+        return build_student_payload((await db.scalars(_questions_query(test_id))).all())
+
+    return await student_questions_cache.get_or_load_async(test_id, load)
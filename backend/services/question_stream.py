@@ -0,0 +1,249 @@
+import csv
+import io
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional, Tuple
+from sqlalchemy.orm import Session
+from .question_import import IMPORT_BATCH_SIZE, ImportReport, QuestionImporter
+
+# Size of the chunks read from JSON files
+STREAM_READ_SIZE = 64 * 1024
+
+SOURCE_FORMATS = {".csv": "csv", ".json": "json", ".xlsx": "xlsx"}
+
+
+class SourceFormatError(ValueError):
+    """The question file is not a CSV, JSON or XLSX question bank"""
+
+
+def source_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SOURCE_FORMATS:
+        raise SourceFormatError(f"Unsupported file type: {extension or path}")
+    return SOURCE_FORMATS[extension]
+
+
+class QuestionFileReader:
+    """
+    Iterates over (row_number, raw_row) pairs of a question file without
+    loading it into memory. CSV is read line by line, JSON is decoded one
+    question at a time and XLSX is read with openpyxl in read-only mode.
+
+    JSON files may be either an array of questions or an object whose
+    "questions" key holds that array (the bulk_upload_json.py format).
+    """
+
+    def __init__(self, path: str, format: Optional[str] = None):
+        self.path = path
+        self.format = format or source_format(path)
+        self.total_bytes = os.path.getsize(path)
+        self.bytes_read = 0
+        self.total_rows: Optional[int] = None
+        self._xlsx_rows_read = 0
+
+    @property
+    def fraction(self) -> Optional[float]:
+        """Share of the file processed so far, if it can be estimated"""
+        if self.format == "xlsx":
+            return self._xlsx_rows_read / self.total_rows if self.total_rows else None
+        return self.bytes_read / self.total_bytes if self.total_bytes else 1.0
+
+    def __iter__(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        if self.format == "csv":
+            return self._iter_csv()
+        if self.format == "json":
+            return self._iter_json()
+        return self._iter_xlsx()
+
+    def _iter_csv(self):
+        with open(self.path, "rb") as raw:
+            file = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+            for row_number, row in enumerate(csv.DictReader(file), 1):
+                self.bytes_read = raw.tell()
+                yield row_number, row
+            self.bytes_read = self.total_bytes
+
+    def _iter_json(self):
+        with open(self.path, "r", encoding="utf-8-sig") as file:
+            stream = _JsonStream(file, self)
+            if stream.expect("{[") == "{":
+                # {"test_title": ..., "questions": [...]}
+                while True:
+                    key = stream.decode_value()
+                    stream.expect(":")
+                    if key == "questions":
+                        stream.expect("[")
+                        break
+                    stream.decode_value()
+                    if stream.expect(",}") == "}":
+                        raise SourceFormatError('JSON file has no "questions" array')
+
+            row_number = 0
+            if stream.peek() == "]":
+                return
+            while True:
+                row_number += 1
+                question = stream.decode_value()
+                if not isinstance(question, dict):
+                    raise SourceFormatError(f"Question {row_number} is not a JSON object")
+                yield row_number, question
+                if stream.expect(",]") == "]":
+                    break
+            self.bytes_read = self.total_bytes
+
+    def _iter_xlsx(self):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(self.path, read_only=True, data_only=True)
+        try:
+            sheet = workbook.active
+            rows = sheet.iter_rows(values_only=True)
+            header = [str(name).strip() if name is not None else "" for name in next(rows, ())]
+            if sheet.max_row:
+                self.total_rows = sheet.max_row - 1
+            for row_number, values in enumerate(rows, 1):
+                self._xlsx_rows_read = row_number
+                # Empty template rows are not questions
+                if all(value is None or str(value).strip() == "" for value in values):
+                    continue
+                yield row_number, dict(zip(header, values))
+        finally:
+            workbook.close()
+
+
+class _JsonStream:
+    """Minimal incremental reader over a text file, one JSON value at a time"""
+
+    def __init__(self, file, reader: QuestionFileReader):
+        self.file = file
+        self.reader = reader
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.file.read(STREAM_READ_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        self.reader.bytes_read = min(self.reader.bytes_read + len(chunk.encode("utf-8")), self.reader.total_bytes)
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise SourceFormatError("Unexpected end of JSON file")
+
+    def expect(self, characters: str) -> str:
+        character = self.peek()
+        if character not in characters:
+            raise SourceFormatError(f"Invalid JSON: expected one of {characters!r}, got {character!r}")
+        self.pos += 1
+        return character
+
+    def decode_value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                if self._fill():
+                    continue
+                raise SourceFormatError(f"Invalid JSON: {e.msg}")
+            # A value touching the end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+class ImportCheckpoint:
+    """
+    Last committed row of a streaming import, stored next to the source file
+    so that a failed import can be resumed.
+    """
+
+    def __init__(self, source_path: str, test_id: int):
+        self.path = f"{source_path}.import-state.json"
+        self.test_id = test_id
+        stat = os.stat(source_path)
+        self.source = {"size": stat.st_size, "mtime": int(stat.st_mtime)}
+
+    def load(self) -> int:
+        """Last committed row number, or 0 when there is nothing to resume"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                state = json.load(file)
+        except (OSError, ValueError):
+            return 0
+        if state.get("test_id") != self.test_id or state.get("source") != self.source:
+            return 0
+        return int(state.get("last_row", 0))
+
+    def save(self, last_row: int):
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump({"test_id": self.test_id, "source": self.source, "last_row": last_row}, file)
+        os.replace(temporary_path, self.path)
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+@dataclass
+class StreamProgress:
+    rows_processed: int
+    rows_imported: int
+    rows_failed: int
+    fraction: Optional[float]
+
+
+def stream_import_questions(
+    db: Session,
+    test_id: int,
+    path: str,
+    format: Optional[str] = None,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    resume: bool = False,
+    on_progress=None
+) -> ImportReport:
+    """
+    Import a question file of any size in bounded batches, committing each
+    batch. With resume=True rows up to the last committed batch of a previous
+    failed run are skipped. on_progress(StreamProgress) is called per batch.
+    """
+    reader = QuestionFileReader(path, format)
+    checkpoint = ImportCheckpoint(path, test_id)
+    resume_after = checkpoint.load() if resume else 0
+
+    def on_batch(report: ImportReport, last_row: int):
+        checkpoint.save(max(last_row, resume_after))
+        if on_progress is not None:
+            on_progress(StreamProgress(
+                rows_processed=report.resumed_after_row + report.rows_total,
+                rows_imported=report.rows_imported,
+                rows_failed=report.rows_failed,
+                fraction=reader.fraction
+            ))
+
+    importer = QuestionImporter(db, test_id, batch_size=batch_size, commit_every_batch=True, on_batch=on_batch)
+    importer.report.resumed_after_row = resume_after
+    for row_number, raw in reader:
+        if row_number > resume_after:
+            importer.add(row_number, raw)
+    report = importer.finish()
+    checkpoint.clear()
+    return report
@@ -0,0 +1,128 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from models.category import Category
+from models.question import Question
+from models.test import Test
+from models.user import User, UserRole
+from .cache import BankCache
+from .cache_sync import on_invalidation, publish_invalidation
+
+# Invalidated together with the per-test caches, i.e. whenever questions change
+statistics_cache = BankCache("question_bank_statistics", max_entries=1)
+_BANK_KEY = 0
+
+
+@dataclass
+class TestStats:
+    id: int
+    title: str
+    description: Optional[str]
+    created_by: int
+    created_at: datetime
+    question_count: int = 0
+    # category name -> number of questions of this test in it
+    categories: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class CategoryStats:
+    id: int
+    name: str
+    question_count: int = 0
+    test_count: int = 0
+
+
+@dataclass
+class TeacherStats:
+    id: int
+    username: str
+    name: str
+    test_count: int = 0
+    question_count: int = 0
+
+
+@dataclass
+class QuestionBankStats:
+    tests: List[TestStats]
+    categories: List[CategoryStats]
+    teachers: List[TeacherStats]
+
+    @property
+    def total_tests(self) -> int:
+        return len(self.tests)
+
+    @property
+    def total_questions(self) -> int:
+        return sum(test.question_count for test in self.tests)
+
+    @property
+    def total_categories(self) -> int:
+        return len(self.categories)
+
+    @property
+    def largest_test(self) -> Optional[TestStats]:
+        return max(self.tests, key=lambda test: test.question_count, default=None)
+
+    def test(self, test_id: int) -> Optional[TestStats]:
+        return next((test for test in self.tests if test.id == test_id), None)
+
+
+def load_question_bank_stats(db: Session) -> QuestionBankStats:
+    """Per-test, per-category and per-teacher counts in four queries"""
+    tests = {
+        row.id: TestStats(row.id, row.title, row.description, row.created_by, row.created_at, row.question_count)
+        for row in db.execute(
+            select(Test.id, Test.title, Test.description, Test.created_by, Test.created_at,
+                   func.count(Question.id).label("question_count"))
+            .outerjoin(Question, Question.test_id == Test.id)
+            .group_by(Test.id)
+            .order_by(Test.id)
+        )
+    }
+    categories = {
+        category_id: CategoryStats(category_id, name)
+        for category_id, name in db.execute(select(Category.id, Category.name).order_by(Category.name))
+    }
+    teachers = {
+        user_id: TeacherStats(user_id, username, name)
+        for user_id, username, name in db.execute(
+            select(User.id, User.username, User.name).where(User.role == UserRole.TEACHER).order_by(User.id)
+        )
+    }
+
+    for test_id, category_id, question_count in db.execute(
+        select(Question.test_id, Question.category_id, func.count())
+        .group_by(Question.test_id, Question.category_id)
+    ):
+        category = categories.get(category_id)
+        if category is None:
+            continue
+        category.question_count += question_count
+        category.test_count += 1
+        if test_id in tests:
+            tests[test_id].categories[category.name] = question_count
+
+    for test in tests.values():
+        teacher = teachers.get(test.created_by)
+        if teacher is not None:
+            teacher.test_count += 1
+            teacher.question_count += test.question_count
+
+    return QuestionBankStats(list(tests.values()), list(categories.values()), list(teachers.values()))
+
+
+def get_question_bank_stats(db: Session) -> QuestionBankStats:
+    """Cached question bank statistics; dropped whenever a test's questions change"""
+    return statistics_cache.get_or_load(_BANK_KEY, lambda: load_question_bank_stats(db))
+
+
+def invalidate_statistics():
+    """For changes that do not touch questions: new tests, categories or teachers"""
+    statistics_cache.invalidate()
+    publish_invalidation("statistics")
+
+
+on_invalidation("statistics", lambda value: statistics_cache.invalidate())
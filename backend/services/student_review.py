@@ -0,0 +1,86 @@
+from dataclasses import dataclass
+from typing import Any, List, Optional
+from sqlalchemy import String, and_, cast, func, select
+from sqlalchemy.orm import Session, joinedload
+from models.question import Question
+from models.student_answer import StudentAnswer
+from models.test import Test
+from models.test_result import TestResult
+from models.user import User, UserRole
+
+
+class ReviewNotFound(LookupError):
+    pass
+
+
+@dataclass
+class StudentResults:
+    student: User
+    # Rows of (id, test_id, test_title, score, timestamp)
+    results: List[Any]
+
+
+@dataclass
+class StudentTestReview:
+    student: User
+    test: Test
+    questions: List[Question]
+    # Rows of (question_id, answer, is_correct)
+    answers: List[Any]
+    result: Optional[TestResult]
+
+
+def load_student(db: Session, user_id: int) -> User:
+    student = db.scalar(select(User).where(User.id == user_id, User.role == UserRole.STUDENT))
+    if student is None:
+        raise ReviewNotFound("Student not found")
+    return student
+
+
+def load_student_results(db: Session, user_id: int) -> StudentResults:
+    """A student and the summaries of all their results: two queries in total"""
+    student = load_student(db, user_id)
+    results = db.execute(
+        select(
+            TestResult.id,
+            TestResult.test_id,
+            func.coalesce(Test.title, "Test " + cast(TestResult.test_id, String)).label("test_title"),
+            TestResult.score,
+            TestResult.timestamp,
+        )
+        .outerjoin(Test, Test.id == TestResult.test_id)
+        .where(TestResult.user_id == user_id)
+        .order_by(TestResult.id)
+    ).all()
+    return StudentResults(student, results)
+
+
+def load_student_test_review(db: Session, user_id: int, test_id: int) -> StudentTestReview:
+    """
+    A student's answers to one test next to its questions, in three queries:
+    the student with their result, the test with its questions, the answers.
+    """
+    row = db.execute(
+        select(User, TestResult)
+        .outerjoin(TestResult, and_(TestResult.user_id == User.id, TestResult.test_id == test_id))
+        .where(User.id == user_id, User.role == UserRole.STUDENT)
+    ).first()
+    if row is None:
+        raise ReviewNotFound("Student not found")
+    student, result = row
+
+    test = db.scalars(
+        select(Test).options(joinedload(Test.questions)).where(Test.id == test_id)
+    ).unique().first()
+    if test is None:
+        raise ReviewNotFound("Test not found")
+
+    answers = db.execute(
+        select(StudentAnswer.question_id, StudentAnswer.answer, StudentAnswer.is_correct)
+        .join(Question, Question.id == StudentAnswer.question_id)
+        .where(StudentAnswer.user_id == user_id, Question.test_id == test_id)
+        .order_by(StudentAnswer.question_id)
+    ).all()
+
+    questions = sorted(test.questions, key=lambda question: question.id)
+    return StudentTestReview(student, test, questions, answers, result)
@@ -0,0 +1,438 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models.test_result import TestResult
+from .grading import (
+    AnswerKey, get_answer_key, get_answer_key_async, grade_submission, save_graded_submission,
+    InvalidAnswerError
+)
+from .write_queue import write_queue
+
+# Accept test submissions into a local journal and grade them in background workers
+SUBMISSION_QUEUE = os.getenv("SUBMISSION_QUEUE", "false").lower() in ("1", "true", "yes")
+SUBMISSION_JOURNAL = os.getenv("SUBMISSION_JOURNAL", "./submission_journal.db")
+# FULL syncs every accepted submission to disk; NORMAL survives a process crash only
+SUBMISSION_JOURNAL_SYNCHRONOUS = os.getenv("SUBMISSION_JOURNAL_SYNCHRONOUS", "FULL")
+SUBMISSION_WORKERS = int(os.getenv("SUBMISSION_WORKERS", "2"))
+SUBMISSION_BATCH = int(os.getenv("SUBMISSION_BATCH", "64"))
+# A submission claimed longer ago than this (by a worker that died) is graded again
+SUBMISSION_LEASE_S = float(os.getenv("SUBMISSION_LEASE_S", "60"))
+
+PENDING = "pending"
+GRADING = "grading"
+READY = "ready"
+FAILED = "failed"
+
+JOURNAL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    id TEXT PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    test_id INTEGER NOT NULL,
+    answers TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    claimed_at REAL,
+    result_id INTEGER,
+    error TEXT,
+    submitted_at TEXT NOT NULL,
+    finished_at TEXT
+);
+-- One live submission per student and test; a failed one may be submitted again
+CREATE UNIQUE INDEX IF NOT EXISTS uq_submissions_user_test
+    ON submissions (user_id, test_id) WHERE status != 'failed';
+CREATE INDEX IF NOT EXISTS ix_submissions_status ON submissions (status, claimed_at);
+"""
+
+
+class SubmissionError(Exception):
+    pass
+
+
+class SubmissionTestNotFound(SubmissionError):
+    def __init__(self):
+        super().__init__("Test not found")
+
+
+class AlreadySubmitted(SubmissionError):
+    def __init__(self):
+        super().__init__("Test already submitted")
+
+
+class JournalAnswer(NamedTuple):
+    question_id: int
+    answer: str
+
+
+@dataclass
+class Submission:
+    """A journal entry; its id is the receipt id returned to the student"""
+    id: str
+    user_id: int
+    test_id: int
+    answers: List[JournalAnswer]
+    state: str
+    result_id: Optional[int]
+    error: Optional[str]
+    submitted_at: datetime
+    finished_at: Optional[datetime]
+
+    @property
+    def status(self) -> str:
+        # A claimed submission is still pending for the student
+        return PENDING if self.state == GRADING else self.state
+
+
+_COLUMNS = "id, user_id, test_id, answers, status, result_id, error, submitted_at, finished_at"
+
+
+def _submission(row: Tuple) -> Submission:
+    id, user_id, test_id, answers, state, result_id, error, submitted_at, finished_at = row
+    return Submission(
+        id=id,
+        user_id=user_id,
+        test_id=test_id,
+        answers=[JournalAnswer(question_id, answer) for question_id, answer in json.loads(answers)],
+        state=state,
+        result_id=result_id,
+        error=error,
+        submitted_at=datetime.fromisoformat(submitted_at),
+        finished_at=datetime.fromisoformat(finished_at) if finished_at else None,
+    )
+
+
+class SubmissionJournal:
+    """
+    SQLite file of accepted submissions, separate from the main database so
+    that accepting does not wait for the main database's writer. An entry
+    goes pending -> grading (claimed by a worker) -> ready or failed.
+    """
+
+    def __init__(self, path: str, synchronous: str, lease_s: float):
+        self.path = path
+        self.synchronous = synchronous
+        self.lease_s = lease_s
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            # isolation_level=None: every statement commits unless a transaction is opened explicitly
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(f"PRAGMA synchronous={self.synchronous}")
+            connection.execute("PRAGMA busy_timeout=5000")
+            connection.executescript(JOURNAL_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def append(self, user_id: int, test_id: int, answers: Iterable[Any]) -> Submission:
+        """Durably record a submission; raises AlreadySubmitted for a second live one"""
+        submission = Submission(
+            id=uuid.uuid4().hex,
+            user_id=user_id,
+            test_id=test_id,
+            answers=[JournalAnswer(answer.question_id, answer.answer) for answer in answers],
+            state=PENDING,
+            result_id=None,
+            error=None,
+            submitted_at=datetime.utcnow(),
+            finished_at=None,
+        )
+        with self._lock:
+            try:
+                self._connect().execute(
+                    "INSERT INTO submissions (id, user_id, test_id, answers, submitted_at) VALUES (?, ?, ?, ?, ?)",
+                    (submission.id, user_id, test_id,
+                     json.dumps(submission.answers, separators=(",", ":")), submission.submitted_at.isoformat()),
+                )
+            except sqlite3.IntegrityError:
+                raise AlreadySubmitted()
+        return submission
+
+    def claim(self, limit: int) -> List[Submission]:
+        """Hand the oldest pending (or abandoned) submissions to one worker"""
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                rows = connection.execute(
+                    f"SELECT {_COLUMNS} FROM submissions"
+                    " WHERE status = ? OR (status = ? AND claimed_at < ?) ORDER BY rowid LIMIT ?",
+                    (PENDING, GRADING, now - self.lease_s, limit),
+                ).fetchall()
+                connection.executemany(
+                    "UPDATE submissions SET status = ?, claimed_at = ? WHERE id = ?",
+                    [(GRADING, now, row[0]) for row in rows],
+                )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return [_submission(row) for row in rows]
+
+    def complete(self, outcomes: List[Tuple[str, Optional[int], Optional[str]]]):
+        """Record (id, result_id, error) of graded submissions in one transaction"""
+        finished_at = datetime.utcnow().isoformat()
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.executemany(
+                    "UPDATE submissions SET status = ?, result_id = ?, error = ?, finished_at = ? WHERE id = ?",
+                    [(FAILED if error else READY, result_id, error, finished_at, id)
+                     for id, result_id, error in outcomes],
+                )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+    def get(self, submission_id: str) -> Optional[Submission]:
+        with self._lock:
+            row = self._connect().execute(
+                f"SELECT {_COLUMNS} FROM submissions WHERE id = ?", (submission_id,)
+            ).fetchone()
+        return _submission(row) if row else None
+
+    def latest(self, user_id: int, test_id: int) -> Optional[Submission]:
+        """The student's most recent submission of a test"""
+        with self._lock:
+            row = self._connect().execute(
+                f"SELECT {_COLUMNS} FROM submissions WHERE user_id = ? AND test_id = ? ORDER BY rowid DESC LIMIT 1",
+                (user_id, test_id),
+            ).fetchone()
+        return _submission(row) if row else None
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._connect().execute("SELECT status, count(*) FROM submissions GROUP BY status").fetchall()
+        counts = dict.fromkeys((PENDING, GRADING, READY, FAILED), 0)
+        counts.update(rows)
+        return counts
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+def already_submitted_query(user_id: int, test_id: int):
+    return select(TestResult.id).where(TestResult.user_id == user_id, TestResult.test_id == test_id)
+
+
+class SubmissionQueue:
+    """
+    Accepts validated submissions into the journal and returns at once;
+    background workers claim them in batches, grade them and write the
+    TestResult and StudentAnswer rows. Submissions still in the journal
+    when the server stops are graded after the next start.
+    """
+
+    def __init__(self, journal: SubmissionJournal, workers: int, batch_size: int, poll_interval_s: float = 1.0):
+        self.journal = journal
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval_s
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._stopping = False
+        # Set when stop() gave up waiting for the workers
+        self._abandoned = False
+        self._accepted = 0
+        self._graded = 0
+        self._failed = 0
+
+    def submit(self, db: Session, user_id: int, test_id: int, answers: List[Any]) -> Submission:
+        """
+        Validate a submission against the cached answer key and journal it.
+        The request session is closed before the journal write, like run_write.
+        Raises SubmissionTestNotFound, InvalidAnswerError or AlreadySubmitted.
+        """
+        answer_key = get_answer_key(db, test_id)
+        submitted = answer_key is not None and db.scalar(already_submitted_query(user_id, test_id)) is not None
+        db.close()
+        return self._accept(answer_key, submitted, user_id, test_id, answers)
+
+    async def submit_async(self, db: AsyncSession, user_id: int, test_id: int, answers: List[Any]) -> Submission:
+        """submit for the async database path; the journal write runs in a thread"""
+        answer_key = await get_answer_key_async(db, test_id)
+        submitted = answer_key is not None and await db.scalar(already_submitted_query(user_id, test_id)) is not None
+        return await asyncio.to_thread(self._accept, answer_key, submitted, user_id, test_id, answers)
+
+    def _accept(self, answer_key: Optional[AnswerKey], submitted: bool, user_id: int, test_id: int,
+                answers: List[Any]) -> Submission:
+        if answer_key is None:
+            raise SubmissionTestNotFound()
+        for answer in answers:
+            if answer.question_id not in answer_key.answers:
+                raise InvalidAnswerError(answer.question_id)
+        if submitted:
+            raise AlreadySubmitted()
+
+        submission = self.journal.append(user_id, test_id, answers)
+        self.start()
+        with self._lock:
+            self._accepted += 1
+            self._wakeup.notify()
+        return submission
+
+    def get(self, user_id: int, submission_id: str) -> Optional[Submission]:
+        submission = self.journal.get(submission_id)
+        # Another student's receipt looks exactly like a missing one
+        if submission is None or submission.user_id != user_id:
+            return None
+        return submission
+
+    def latest(self, user_id: int, test_id: int) -> Optional[Submission]:
+        return self.journal.latest(user_id, test_id)
+
+    def start(self):
+        """Start the workers; on startup they pick up what an earlier run left pending"""
+        with self._lock:
+            if self._threads or self._stopping:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._loop, name=f"submission-grader-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout: float = 10):
+        """
+        Let the workers finish their current batch; the rest stays journaled.
+        A worker still grading after the timeout does not record its batch,
+        which is graded again after the next start, and the journal is left
+        open for it.
+        """
+        with self._lock:
+            self._stopping = True
+            threads, self._threads = self._threads, []
+            self._wakeup.notify_all()
+        deadline = time.monotonic() + timeout
+        for thread in threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        running = [thread.name for thread in threads if thread.is_alive()]
+        if running:
+            with self._lock:
+                self._abandoned = True
+            print(f"⚠️  Submission queue did not stop cleanly: {', '.join(running)} still grading; "
+                  f"their submissions are graded again after the next start")
+            return
+        self.journal.close()
+
+    def stats(self) -> Dict[str, Any]:
+        counts = self.journal.counts()
+        with self._lock:
+            return {
+                "workers": len(self._threads),
+                "pending": counts[PENDING] + counts[GRADING],
+                "ready": counts[READY],
+                "failed": counts[FAILED],
+                "accepted": self._accepted,
+                "graded": self._graded,
+                "grading_failed": self._failed,
+            }
+
+    def _loop(self):
+        while True:
+            with self._lock:
+                if self._stopping:
+                    return
+            try:
+                batch = self.journal.claim(self.batch_size)
+                if batch:
+                    outcomes = self._grade(batch)
+                    with self._lock:
+                        if self._abandoned:
+                            # The batch stays claimed and is graded again once its lease expires
+                            return
+                    self.journal.complete(outcomes)
+                    continue
+            except Exception as e:
+                # The claimed submissions are graded again once their lease expires
+                print(f"⚠️  Submission grading failed: {e}")
+            with self._lock:
+                if not self._stopping:
+                    self._wakeup.wait(self.poll_interval)
+
+    def _grade(self, batch: List[Submission]) -> List[Tuple[str, Optional[int], Optional[str]]]:
+        outcomes = []
+        graded = []
+        with SessionLocal() as db:
+            for submission in batch:
+                answer_key = get_answer_key(db, submission.test_id)
+                if answer_key is None:
+                    outcomes.append((submission.id, None, "Test not found"))
+                    continue
+                try:
+                    graded.append((submission, grade_submission(answer_key, submission.user_id, submission.answers)))
+                except InvalidAnswerError as e:
+                    # The question was deleted after the submission was accepted
+                    outcomes.append((submission.id, None, str(e)))
+
+            for (submission, _), result in zip(graded, self._save(db, graded)):
+                if isinstance(result, IntegrityError):
+                    # Already written by an earlier run that died before completing
+                    # the journal entry, or submitted another way in the meantime
+                    result_id = db.scalar(already_submitted_query(submission.user_id, submission.test_id))
+                    outcomes.append((submission.id, result_id, None if result_id else "Test already submitted"))
+                elif isinstance(result, Exception):
+                    outcomes.append((submission.id, None, str(result)))
+                else:
+                    outcomes.append((submission.id, result, None))
+
+        with self._lock:
+            self._graded += sum(1 for _, _, error in outcomes if error is None)
+            self._failed += sum(1 for _, _, error in outcomes if error is not None)
+        return outcomes
+
+    def _save(self, db: Session, graded: List[Tuple[Submission, Any]]) -> List[Any]:
+        """The new TestResult id, or the exception, of every graded submission"""
+        def job(submission, result):
+            return lambda session: save_graded_submission(session, submission.user_id, submission.test_id, result)
+
+        results = []
+        if write_queue is not None:
+            # Submitted together, so the writer commits them in a few batches
+            futures = [write_queue.submit(job(submission, result)) for submission, result in graded]
+            for future in futures:
+                try:
+                    results.append(future.result().id)
+                except Exception as e:
+                    results.append(e)
+            return results
+
+        for submission, result in graded:
+            try:
+                test_result = job(submission, result)(db)
+                db.commit()
+                results.append(test_result.id)
+            except Exception as e:
+                db.rollback()
+                results.append(e)
+        return results
+
+
+submission_queue: Optional[SubmissionQueue] = None
+
+if SUBMISSION_QUEUE:
+    submission_queue = SubmissionQueue(
+        SubmissionJournal(SUBMISSION_JOURNAL, SUBMISSION_JOURNAL_SYNCHRONOUS, SUBMISSION_LEASE_S),
+        workers=SUBMISSION_WORKERS,
+        batch_size=SUBMISSION_BATCH,
+    )
@@ -0,0 +1,179 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+Row = Dict[str, Any]
+
+
+class WriteBehindBuffer:
+    """
+    In-process write-behind buffer: rows are keyed, a newer row replaces the
+    buffered one with the same key, and a background thread hands everything
+    buffered to `write` (one batched transaction) every flush_interval_ms or
+    as soon as max_entries keys are waiting.
+
+    Rows being written stay visible through pending() until the write has
+    committed. When a batch fails, its rows are written one by one: a row
+    failing with an error that `rejects` says can never succeed (e.g. its
+    parent row was deleted) is logged and dropped into dead_letters, so it
+    cannot block every later flush; rows failing otherwise are put back,
+    unless superseded in the meantime, and retried on the next flush.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        write: Callable[[List[Row]], None],
+        flush_interval_ms: float,
+        max_entries: int,
+        supersedes: Callable[[Row, Row], bool] = lambda old, new: True,
+        rejects: Callable[[Exception], bool] = lambda error: False
+    ):
+        self.name = name
+        self.write = write
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_entries = max_entries
+        self.supersedes = supersedes
+        self.rejects = rejects
+        # Last rows dropped because they can never be written, with the error
+        self.dead_letters: "deque[Tuple[Row, str]]" = deque(maxlen=100)
+        self._entries: Dict[Hashable, Row] = {}
+        self._flushing: Dict[Hashable, Row] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        # Only one flush writes at a time, so rows reach the database in order
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._puts = 0
+        self._coalesced = 0
+        self._flushes = 0
+        self._rows_written = 0
+        self._failed_flushes = 0
+        self._dropped = 0
+        self._latencies: "deque[float]" = deque(maxlen=1000)
+
+    def put(self, key: Hashable, row: Row):
+        with self._lock:
+            old = self._entries.get(key) or self._flushing.get(key)
+            if old is not None and not self.supersedes(old, row):
+                return
+            if key in self._entries:
+                self._coalesced += 1
+            self._entries[key] = row
+            self._puts += 1
+            if self._thread is None and not self._stopping:
+                self._thread = threading.Thread(target=self._loop, name=f"{self.name}-flusher", daemon=True)
+                self._thread.start()
+            if len(self._entries) >= self.max_entries:
+                self._wakeup.notify()
+
+    def pending(self, match: Callable[[Hashable, Row], bool]) -> List[Row]:
+        """Buffered or in-flight rows that are not committed yet"""
+        with self._lock:
+            rows = {key: row for key, row in self._flushing.items() if match(key, row)}
+            rows.update((key, row) for key, row in self._entries.items() if match(key, row))
+        return list(rows.values())
+
+    def flush(self) -> int:
+        """Write everything buffered now and wait for it; returns the number of rows written"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._entries = self._entries, {}
+                self._flushing = batch
+            if not batch:
+                return 0
+            started = time.perf_counter()
+            try:
+                self.write(list(batch.values()))
+                written, retry, error = len(batch), {}, None
+            except Exception:
+                written, retry, error = self._write_rows(batch)
+            with self._lock:
+                for key, row in retry.items():
+                    newer = self._entries.get(key)
+                    if newer is None or not self.supersedes(row, newer):
+                        self._entries[key] = row
+                self._flushing = {}
+                self._rows_written += written
+                if error is not None:
+                    self._failed_flushes += 1
+                else:
+                    self._flushes += 1
+                    self._latencies.append((time.perf_counter() - started) * 1000)
+            if error is not None:
+                raise error
+            return written
+
+    def _write_rows(self, batch: Dict[Hashable, Row]) -> Tuple[int, Dict[Hashable, Row], Optional[Exception]]:
+        """
+        Write a failed batch row by row. Returns the number of rows written,
+        the rows to retry and the error that made them fail, if any.
+        """
+        written, retry, error = 0, {}, None
+        for key, row in batch.items():
+            if error is not None:
+                # Not a problem of one row (e.g. the database is locked): keep the rest for the next flush
+                retry[key] = row
+                continue
+            try:
+                self.write([row])
+                written += 1
+            except Exception as e:
+                if not self.rejects(e):
+                    retry[key], error = row, e
+                    continue
+                print(f"⚠️  {self.name}: dropped a row that cannot be written: {row} ({e})")
+                with self._lock:
+                    self._dropped += 1
+                    self.dead_letters.append((row, str(e)))
+        return written, retry, error
+
+    def stop(self, timeout: float = 10):
+        """Stop the background thread and write whatever is still buffered"""
+        with self._lock:
+            self._stopping = True
+            thread, self._thread = self._thread, None
+            self._wakeup.notify()
+        if thread is not None:
+            thread.join(timeout)
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            return {
+                "queue_depth": len(self._entries),
+                "in_flight": len(self._flushing),
+                "puts": self._puts,
+                "coalesced": self._coalesced,
+                "flushes": self._flushes,
+                "rows_written": self._rows_written,
+                "failed_flushes": self._failed_flushes,
+                "dropped_rows": self._dropped,
+                "flush_latency_ms": _latency_summary(latencies),
+            }
+
+    def _loop(self):
+        while True:
+            with self._lock:
+                if not self._stopping and len(self._entries) < self.max_entries:
+                    self._wakeup.wait(self.flush_interval)
+                if self._stopping:
+                    return
+            try:
+                self.flush()
+            except Exception:
+                # Counted in stats; the failed rows stay buffered for the next flush
+                time.sleep(self.flush_interval)
+
+
+def _latency_summary(latencies: List[float]) -> Optional[Dict[str, float]]:
+    if not latencies:
+        return None
+
+    def at(q: float) -> float:
+        return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))], 2)
+
+    return {"p50": at(0.5), "p99": at(0.99), "max": round(latencies[-1], 2)}
@@ -0,0 +1,191 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.orm import Session, sessionmaker
+from database import DATABASE_URL, apply_sqlite_pragmas, is_memory_sqlite
+
+# Funnel SQLite result writes through one writer thread (file databases only)
+SQLITE_WRITE_QUEUE = os.getenv("SQLITE_WRITE_QUEUE", "true").lower() in ("1", "true", "yes")
+WRITE_QUEUE_MAX_BATCH = int(os.getenv("WRITE_QUEUE_MAX_BATCH", "64"))
+# How long the writer waits for more jobs to join a batch
+WRITE_QUEUE_MAX_WAIT_MS = float(os.getenv("WRITE_QUEUE_MAX_WAIT_MS", "2"))
+
+WriteJob = Callable[[Session], Any]
+
+
+class WriteQueue:
+    """
+    Single writer thread that group-commits write jobs.
+
+    Each job runs inside its own SAVEPOINT, so a failing job is rolled back
+    alone, and every job in a batch shares one COMMIT. The futures resolve
+    only after that commit. A job's ORM result is refreshed before the
+    commit and stays readable after the writer session is closed.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], max_batch: int, max_wait_ms: float):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[Optional[Tuple[WriteJob, Future]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._jobs = 0
+        self._failed_commits = 0
+
+    def submit(self, job: WriteJob) -> Future:
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((job, future))
+        return future
+
+    def run(self, job: WriteJob) -> Any:
+        """Run a job on the writer thread and wait for its commit"""
+        return self.submit(job).result()
+
+    async def run_async(self, job: WriteJob) -> Any:
+        return await asyncio.wrap_future(self.submit(job))
+
+    def stop(self, timeout: float = 10):
+        """Finish queued jobs and stop the writer thread"""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "batches": self._batches,
+            "jobs": self._jobs,
+            "avg_batch_size": round(self._jobs / self._batches, 2) if self._batches else 0,
+            "failed_commits": self._failed_commits,
+        }
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="sqlite-writer", daemon=True)
+                self._thread.start()
+
+    def _next_batch(self) -> Tuple[List[Tuple[WriteJob, Future]], bool]:
+        """Block for one job, then collect more for up to max_wait"""
+        item = self._queue.get()
+        if item is None:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _loop(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = self._next_batch()
+            if batch:
+                self._write_batch(batch)
+
+    def _write_batch(self, batch: List[Tuple[WriteJob, Future]]):
+        done = []
+        with self.session_factory() as session:
+            try:
+                for job, future in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    savepoint = session.begin_nested()
+                    try:
+                        result = job(session)
+                        session.flush()
+                        if inspect(result, raiseerr=False) is not None:
+                            session.refresh(result)
+                        savepoint.commit()
+                    except Exception as e:
+                        savepoint.rollback()
+                        future.set_exception(e)
+                        continue
+                    done.append((future, result))
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                self._failed_commits += 1
+                for future, _ in done:
+                    future.set_exception(e)
+                return
+
+        self._batches += 1
+        self._jobs += len(done)
+        for future, result in done:
+            future.set_result(result)
+
+
+def _create_writer_session_factory() -> Callable[[], Session]:
+    """
+    Dedicated one-connection engine for the writer. pysqlite is switched to
+    driver-level autocommit so SQLAlchemy emits BEGIN IMMEDIATE itself: the
+    write lock is taken when the batch starts and SAVEPOINTs work as expected.
+    """
+    writer_engine = create_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        pool_size=1,
+        max_overflow=0,
+    )
+
+    @event.listens_for(writer_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        apply_sqlite_pragmas(dbapi_connection)
+
+    @event.listens_for(writer_engine, "begin")
+    def _on_begin(connection):
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+    return sessionmaker(bind=writer_engine, autoflush=False, expire_on_commit=False)
+
+
+write_queue: Optional[WriteQueue] = None
+
+if SQLITE_WRITE_QUEUE and DATABASE_URL.startswith("sqlite") and not is_memory_sqlite(DATABASE_URL):
+    write_queue = WriteQueue(
+        _create_writer_session_factory(),
+        max_batch=WRITE_QUEUE_MAX_BATCH,
+        max_wait_ms=WRITE_QUEUE_MAX_WAIT_MS,
+    )
+
+
+def run_write(db: Session, job: WriteJob) -> Any:
+    """
+    Run a write job through the SQLite writer queue when it is enabled,
+    otherwise in the request's own session and transaction.
+
+    Either way the request session is closed, returning its pooled
+    connection right away instead of at dependency cleanup, which itself
+    needs a free threadpool thread; a burst of requests could otherwise
+    hold every connection. The returned ORM object is fully loaded.
+    """
+    if write_queue is not None:
+        db.close()
+        return write_queue.run(job)
+
+    result = job(db)
+    db.commit()
+    if inspect(result, raiseerr=False) is not None:
+        db.refresh(result)
+    db.close()
+    return result
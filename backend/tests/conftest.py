@@ -0,0 +1,41 @@
+"""
+Тесты работают на временной базе SQLite, а не на рабочей.
+Использование (из каталога backend): python -m pytest tests
+"""
+
+import os
+import sys
+import tempfile
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# До импорта database: переменная окружения рабочей базы здесь не действует
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='synapse_tests_'), 'test.db')}"
+# Один процесс: опрос cache_versions не нужен и попадал бы в подсчет SQL-запросов
+os.environ["CACHE_SYNC"] = "false"
+
+
+@pytest.fixture(scope="session")
+def schema():
+    """Таблицы и индексы текущих моделей"""
+    from database import engine, Base
+    from migrations import upgrade_indexes
+
+    Base.metadata.create_all(bind=engine)
+    upgrade_indexes()
+
+
+@pytest.fixture(scope="session")
+def client(schema):
+    """
+    Приложение с обработчиками startup и shutdown (очередь записи, буфер
+    ответов) на временной базе; останавливается после всех тестов.
+    """
+    from fastapi.testclient import TestClient
+    import main
+
+    with TestClient(main.app) as client:
+        yield client
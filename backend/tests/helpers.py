@@ -0,0 +1,141 @@
+"""
+Общие данные и утилиты тестов (их используют и бенчмарки): счетчик
+SQL-запросов, создание тестов, студентов и истории прохождения, горячие
+запросы для проверки планов.
+
+Модуль нужно импортировать после того, как задан DATABASE_URL временной базы
+(это делают tests/conftest.py и benchmarks.common).
+"""
+
+import random
+from types import SimpleNamespace
+from sqlalchemy import event, select, text
+from sqlalchemy.orm import Session
+from database import engine
+from models import User, Category, Test, Question, StudentAnswer, TestResult
+from models.user import UserRole
+from auth.jwt_handler import create_access_token
+from services.grading import load_answer_key, grade_submission, save_graded_submission
+
+CATEGORY_NAMES = ["Genetics", "Molecular Biology", "Cell Biology", "Ecology", "Evolution", "Biochemistry"]
+OPTIONS = ["A", "B", "C", "D", "E"]
+
+# Запросы экранов просмотра студента учителем вместе с сериализацией ответа;
+# не должны зависеть от количества пройденных тестов
+EXPECTED_REVIEW_QUERIES = {"results": 2, "test review": 3}
+
+# Горячие запросы по test_id / user_id / question_id: должны использовать индексы
+HOT_QUERIES = {
+    "duplicate submission (test_results by user_id, test_id)":
+        select(TestResult.id).where(TestResult.user_id == 1, TestResult.test_id == 1),
+    "student results (test_results by user_id)":
+        select(TestResult).where(TestResult.user_id == 1),
+    "test results export (test_results by test_id)":
+        select(TestResult).where(TestResult.test_id == 1),
+    "test questions (questions by test_id)":
+        select(Question).where(Question.test_id == 1),
+    "student answers (student_answers by user_id, question_id IN)":
+        select(StudentAnswer).where(StudentAnswer.user_id == 1, StudentAnswer.question_id.in_([1, 2, 3])),
+    "question answers (student_answers by question_id)":
+        select(StudentAnswer).where(StudentAnswer.question_id == 1),
+}
+
+
+class QueryCounter:
+    """Считает SQL-запросы, выполненные через engine"""
+
+    def __init__(self, bind=engine):
+        self.bind = bind
+        self.count = 0
+        self.statements = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append(statement)
+
+    def __enter__(self):
+        self.count = 0
+        self.statements = []
+        event.listen(self.bind, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.bind, "before_cursor_execute", self._on_execute)
+
+
+def query_plan(conn, statement) -> list:
+    """Строки EXPLAIN QUERY PLAN (SQLite)"""
+    sql = str(statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+    return [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+
+def is_full_scan(detail: str) -> bool:
+    # "SCAN <table>" without an index is a full table scan
+    return detail.startswith("SCAN") and "USING" not in detail
+
+
+def seed_test(db: Session, num_questions: int = 150, title: str = "Benchmark test") -> Test:
+    """Создает учителя (если нужно), категории и тест с num_questions вопросами"""
+    teacher = db.query(User).filter(User.role == UserRole.TEACHER).first()
+    if not teacher:
+        teacher = User(username="bench_teacher", password_hash="-", role=UserRole.TEACHER, name="Bench Teacher")
+        db.add(teacher)
+        db.flush()
+
+    categories = []
+    for name in CATEGORY_NAMES:
+        category = db.query(Category).filter(Category.name == name).first()
+        if not category:
+            category = Category(name=name)
+            db.add(category)
+        categories.append(category)
+    db.flush()
+
+    test = Test(title=title, created_by=teacher.id)
+    db.add(test)
+    db.flush()
+
+    for i in range(num_questions):
+        db.add(Question(
+            test_id=test.id,
+            category_id=categories[i % len(categories)].id,
+            text=f"Вопрос {i + 1}: " + "текст вопроса " * 20,
+            options=list(OPTIONS),
+            correct_answer=OPTIONS[i % len(OPTIONS)],
+            table_data={"rows": [["x", "y"], ["1", "2"]]}
+        ))
+    db.commit()
+    db.refresh(test)
+    return test
+
+
+def seed_students(db: Session, count: int, prefix: str = "bench_student", password_hash: str = "-"):
+    """Создает count студентов и возвращает их id"""
+    students = [
+        User(username=f"{prefix}_{i}", password_hash=password_hash, role=UserRole.STUDENT, name=f"Student {i}")
+        for i in range(count)
+    ]
+    db.add_all(students)
+    db.commit()
+    return [student.id for student in students]
+
+
+def seed_history(db: Session, count: int, num_questions: int = 30):
+    """Студент, прошедший count тестов; возвращает (id студента, id тестов)"""
+    user_id = seed_students(db, 1, prefix=f"review_{count}")[0]
+    test_ids = []
+    for i in range(count):
+        test = seed_test(db, num_questions, title=f"Review {count}.{i}")
+        answers = [SimpleNamespace(question_id=q.id, answer=random.choice(OPTIONS)) for q in test.questions]
+        graded = grade_submission(load_answer_key(db, test.id), user_id, answers)
+        save_graded_submission(db, user_id, test.id, graded)
+        db.commit()
+        test_ids.append(test.id)
+    return user_id, test_ids
+
+
+def auth_headers(user_id: int, db: Session) -> dict:
+    """Заголовок Authorization с токеном пользователя, как после входа"""
+    user = db.get(User, user_id)
+    token = create_access_token(data={"sub": user.username, "role": user.role.value, "user_id": user.id})
+    return {"Authorization": f"Bearer {token}"}
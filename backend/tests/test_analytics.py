@@ -0,0 +1,37 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from database import Base
+from migrations import bootstrap
+import models
+from services.analytics import load_test_analytics
+from tests.helpers import seed_test, seed_students
+
+
+def test_bootstrap_counts_legacy_category_breakdowns(tmp_path):
+    # Analytics tables created empty on a database whose older results store
+    # bare percentages in category_breakdown
+    bind = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    Base.metadata.create_all(bind=bind)
+    with Session(bind) as db:
+        test_id = seed_test(db, 5).id
+        students = seed_students(db, 3)
+        db.add_all([
+            models.TestResult(user_id=students[0], test_id=test_id, score=50.0,
+                              category_breakdown={"Genetics": 50.0, "Ecology": None}),
+            models.TestResult(user_id=students[1], test_id=test_id, score=100.0,
+                              category_breakdown={"Genetics": {"correct": 2, "total": 2, "percentage": 100.0}}),
+            models.TestResult(user_id=students[2], test_id=test_id, score=0.0, category_breakdown=None),
+        ])
+        db.commit()
+
+    bootstrap(bind)
+
+    with Session(bind) as db:
+        assert db.get(models.TestAnalytics, test_id).submissions == 3
+        genetics = db.get(models.TestCategoryAnalytics, (test_id, "Genetics"))
+        assert (genetics.submissions, genetics.correct, genetics.total) == (2, 2, 2)
+        assert genetics.percentage_sum == 150.0
+        assert db.get(models.TestCategoryAnalytics, (test_id, "Ecology")) is None
+        categories = load_test_analytics(db, test_id).categories
+    assert [(category.name, category.average_percentage) for category in categories] == [("Genetics", 75.0)]
+    bind.dispose()
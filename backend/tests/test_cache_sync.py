@@ -0,0 +1,42 @@
+import sys
+from sqlalchemy import create_engine, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from database import engine
+import models
+from services.cache_sync import CacheSync, cache_sync, publish_invalidation
+from tests.helpers import auth_headers, seed_test
+
+
+def test_failed_publish_is_retried(tmp_path, monkeypatch):
+    bind = create_engine(f"sqlite:///{tmp_path / 'cache_sync.db'}")
+    sync = CacheSync(bind, 500, polling=False)
+    # services.cache_sync, not the instance re-exported by services
+    monkeypatch.setattr(sys.modules["services.cache_sync"], "cache_sync", sync)
+    # No cache_versions table yet: the publish fails without raising
+    publish_invalidation("test", "1")
+    assert sync.stats()["deferred"] == 1
+
+    models.CacheVersion.__table__.create(bind)
+    assert sync.publish_deferred() == 1
+    assert sync.stats()["deferred"] == 0
+    with bind.connect() as conn:
+        assert conn.scalars(select(models.CacheVersion.key)).all() == ["test:1"]
+    bind.dispose()
+
+
+def test_failed_publish_does_not_fail_the_request(client, monkeypatch):
+    with Session(engine) as db:
+        test = seed_test(db, 1, title="Cache sync")
+        question_id = test.questions[0].id
+        headers = auth_headers(test.created_by, db)
+
+    def locked(key):
+        raise OperationalError("INSERT INTO cache_versions ...", {}, Exception("database is locked"))
+
+    failed = cache_sync.stats()["failed_publishes"]
+    monkeypatch.setattr(cache_sync, "publish", locked)
+    updated = client.put(f"/teacher/questions/{question_id}", json={"text": "Changed"}, headers=headers)
+    assert updated.status_code == 200
+    assert updated.json()["text"] == "Changed"
+    assert cache_sync.stats()["failed_publishes"] == failed + 1
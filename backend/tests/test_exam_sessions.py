@@ -0,0 +1,152 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from database import engine
+import models
+from services.exam_sessions import answer_buffer, write_answers
+from tests.helpers import OPTIONS, auth_headers, seed_test, seed_students
+
+
+@pytest.fixture
+def exam(schema):
+    """Новый тест и студент: (id теста, id вопросов, заголовки студента)"""
+    with Session(engine) as db:
+        test = seed_test(db, 5, title="Exam session")
+        question_ids = [question.id for question in test.questions]
+        student_id = seed_students(db, 1, prefix=f"exam_{test.id}")[0]
+        return test.id, question_ids, auth_headers(student_id, db)
+
+
+def flush_answers():
+    # Buffered answers reach attempt_answers
+    if answer_buffer is not None:
+        answer_buffer.flush()
+
+
+def stored_answer(attempt_id: int, question_id: int):
+    with Session(engine) as db:
+        return db.execute(
+            select(models.AttemptAnswer.answer, models.AttemptAnswer.revision)
+            .where(models.AttemptAnswer.attempt_id == attempt_id, models.AttemptAnswer.question_id == question_id)
+        ).one_or_none()
+
+
+def test_attempt_resumes_with_saved_answers(client, exam):
+    test_id, question_ids, headers = exam
+    started = client.post(f"/student/tests/{test_id}/attempts", headers=headers)
+    assert started.status_code == 200
+    attempt = started.json()
+    assert attempt["answers"] == {} and attempt["finished_at"] is None
+
+    saved = client.patch(
+        f"/student/attempts/{attempt['id']}/answers/{question_ids[0]}",
+        json={"answer": "B", "revision": 1}, headers=headers,
+    )
+    assert saved.status_code == 204
+
+    # A reloaded page gets the same attempt back, before and after the write
+    for _ in range(2):
+        resumed = client.post(f"/student/tests/{test_id}/attempts", headers=headers).json()
+        assert resumed["id"] == attempt["id"]
+        assert resumed["answers"] == {str(question_ids[0]): "B"}
+        assert resumed["revisions"] == {str(question_ids[0]): 1}
+        assert client.get(f"/student/attempts/{attempt['id']}", headers=headers).json() == resumed
+        flush_answers()
+
+
+def test_stale_revision_does_not_overwrite_newer_answer(client, exam):
+    test_id, question_ids, headers = exam
+    attempt_id = client.post(f"/student/tests/{test_id}/attempts", headers=headers).json()["id"]
+    url = f"/student/attempts/{attempt_id}/answers/{question_ids[0]}"
+
+    # A late retry arriving while the newer answer is still buffered
+    assert client.patch(url, json={"answer": "C", "revision": 2}, headers=headers).status_code == 204
+    assert client.patch(url, json={"answer": "A", "revision": 1}, headers=headers).status_code == 204
+    assert client.get(f"/student/attempts/{attempt_id}", headers=headers).json()["answers"] == {
+        str(question_ids[0]): "C"
+    }
+    flush_answers()
+    assert tuple(stored_answer(attempt_id, question_ids[0])) == ("C", 2)
+
+    # ... and after it was written
+    assert client.patch(url, json={"answer": "D", "revision": 1}, headers=headers).status_code == 204
+    flush_answers()
+    assert tuple(stored_answer(attempt_id, question_ids[0])) == ("C", 2)
+    assert client.patch(url, json={"answer": "E", "revision": 3}, headers=headers).status_code == 204
+    flush_answers()
+    assert tuple(stored_answer(attempt_id, question_ids[0])) == ("E", 3)
+
+
+def test_finalize_is_idempotent(client, exam):
+    test_id, question_ids, headers = exam
+    attempt_id = client.post(f"/student/tests/{test_id}/attempts", headers=headers).json()["id"]
+    # seed_test: question i has the correct answer OPTIONS[i % 5]
+    for i, question_id in enumerate(question_ids[:2]):
+        client.patch(
+            f"/student/attempts/{attempt_id}/answers/{question_id}",
+            json={"answer": OPTIONS[i], "revision": 1}, headers=headers,
+        )
+
+    first = client.post(f"/student/attempts/{attempt_id}/finalize", headers=headers)
+    assert first.status_code == 200
+    assert first.json()["score"] == pytest.approx(40.0)
+    second = client.post(f"/student/attempts/{attempt_id}/finalize", headers=headers)
+    assert second.status_code == 200
+    assert second.json() == first.json()
+
+    attempt = client.get(f"/student/attempts/{attempt_id}", headers=headers).json()
+    assert attempt["result_id"] == first.json()["id"]
+    assert attempt["finished_at"] is not None
+    late = client.patch(
+        f"/student/attempts/{attempt_id}/answers/{question_ids[2]}",
+        json={"answer": "A", "revision": 1}, headers=headers,
+    )
+    assert late.status_code == 409
+    with Session(engine) as db:
+        assert db.scalar(select(models.TestResult.id).where(models.TestResult.test_id == test_id)) == first.json()["id"]
+
+
+def test_submitting_twice_is_rejected(client, exam):
+    test_id, question_ids, headers = exam
+    attempt_id = client.post(f"/student/tests/{test_id}/attempts", headers=headers).json()["id"]
+    submitted = client.post(
+        "/student/submit-test/",
+        json={"test_id": test_id, "answers": [{"question_id": question_ids[0], "answer": "A"}]},
+        headers=headers,
+    )
+    assert submitted.status_code == 200
+
+    finalized = client.post(f"/student/attempts/{attempt_id}/finalize", headers=headers)
+    assert finalized.status_code == 400
+    assert finalized.json()["detail"] == "Test already submitted"
+    resubmitted = client.post(
+        "/student/submit-test/",
+        json={"test_id": test_id, "answers": [{"question_id": question_ids[0], "answer": "B"}]},
+        headers=headers,
+    )
+    assert resubmitted.status_code == 400
+
+
+def test_answers_that_cannot_be_stored_are_skipped(client, exam):
+    test_id, question_ids, headers = exam
+    attempt_id = client.post(f"/student/tests/{test_id}/attempts", headers=headers).json()["id"]
+    with Session(engine) as db:
+        other_question = seed_test(db, 1, title="Other test").questions[0].id
+    client.patch(
+        f"/student/attempts/{attempt_id}/answers/{question_ids[0]}",
+        json={"answer": "A", "revision": 1}, headers=headers,
+    )
+    assert client.post(f"/student/attempts/{attempt_id}/finalize", headers=headers).status_code == 200
+
+    # Accepted before finalize closed the attempt, written after it; then a
+    # question of another test and a missing attempt
+    write_answers([
+        {"attempt_id": attempt_id, "question_id": question_ids[1], "answer": "B", "revision": 1},
+        {"attempt_id": attempt_id, "question_id": question_ids[0], "answer": "C", "revision": 2},
+        {"attempt_id": attempt_id, "question_id": other_question, "answer": "A", "revision": 1},
+        {"attempt_id": attempt_id + 1000, "question_id": question_ids[0], "answer": "A", "revision": 1},
+    ])
+    assert stored_answer(attempt_id, question_ids[1]) is None
+    assert tuple(stored_answer(attempt_id, question_ids[0])) == ("A", 1)
+    assert stored_answer(attempt_id, other_question) is None
+    assert stored_answer(attempt_id + 1000, question_ids[0]) is None
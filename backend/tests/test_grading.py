@@ -0,0 +1,107 @@
+import random
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from database import engine
+import models
+from services.grading import (
+    InvalidAnswerError, get_answer_key, grade_submission, load_answer_key, save_graded_submission
+)
+from tests.helpers import OPTIONS, auth_headers, seed_test, seed_students
+
+
+def per_row_grading(db: Session, user_id: int, test_id: int, answers):
+    """Scoring of the original submit_test: a Category query for every answer"""
+    questions = {q.id: q for q in db.query(models.Question).filter(models.Question.test_id == test_id).all()}
+    correct_answers = 0
+    category_scores = {}
+    rows = []
+    for answer in answers:
+        question = questions[answer.question_id]
+        is_correct = answer.answer == question.correct_answer
+        if is_correct:
+            correct_answers += 1
+        category = db.query(models.Category).filter(models.Category.id == question.category_id).first()
+        if category:
+            scores = category_scores.setdefault(category.name, {"correct": 0, "total": 0})
+            scores["total"] += 1
+            if is_correct:
+                scores["correct"] += 1
+        rows.append({"user_id": user_id, "question_id": answer.question_id,
+                     "answer": answer.answer, "is_correct": is_correct})
+    score = (correct_answers / len(questions)) * 100 if questions else 0
+    breakdown = {
+        name: {**scores, "percentage": (scores["correct"] / scores["total"]) * 100 if scores["total"] > 0 else 0}
+        for name, scores in category_scores.items()
+    }
+    return score, breakdown, rows
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_grading_matches_per_row_scoring(schema, seed):
+    rng = random.Random(seed)
+    with Session(engine) as db:
+        test = seed_test(db, 40, title=f"Grading {seed}")
+        user_id = seed_students(db, 1, prefix=f"grading_{seed}")[0]
+        # Some questions unanswered, some answered "Не знаю"
+        questions = rng.sample(test.questions, rng.randint(0, len(test.questions)))
+        answers = [
+            SimpleNamespace(question_id=q.id, answer=rng.choice(OPTIONS + ["Не знаю"]))
+            for q in questions
+        ]
+
+        expected_score, expected_breakdown, expected_rows = per_row_grading(db, user_id, test.id, answers)
+        graded = grade_submission(load_answer_key(db, test.id), user_id, answers)
+        assert graded.score == expected_score
+        assert graded.category_breakdown == expected_breakdown
+        assert graded.answer_rows == expected_rows
+
+        result = save_graded_submission(db, user_id, test.id, graded)
+        db.commit()
+        stored = db.execute(
+            select(models.StudentAnswer.question_id, models.StudentAnswer.answer, models.StudentAnswer.is_correct)
+            .where(models.StudentAnswer.user_id == user_id)
+            .order_by(models.StudentAnswer.id)
+        ).all()
+        assert [tuple(row) for row in stored] == [
+            (row["question_id"], row["answer"], row["is_correct"]) for row in expected_rows
+        ]
+        assert db.get(models.TestResult, result.id).category_breakdown == expected_breakdown
+
+
+def test_grading_rejects_question_of_another_test(schema):
+    with Session(engine) as db:
+        test = seed_test(db, 3, title="Grading own questions")
+        other = seed_test(db, 1, title="Grading other questions")
+        answers = [SimpleNamespace(question_id=other.questions[0].id, answer="A")]
+        with pytest.raises(InvalidAnswerError):
+            grade_submission(load_answer_key(db, test.id), 1, answers)
+
+
+def test_answer_key_cache_follows_question_changes(client):
+    with Session(engine) as db:
+        test = seed_test(db, 3, title="Answer key cache")
+        test_id, category_id = test.id, test.questions[0].category_id
+        question_ids = [question.id for question in test.questions]
+        headers = auth_headers(test.created_by, db)
+        answer_key = get_answer_key(db, test_id)
+        assert get_answer_key(db, test_id) is answer_key
+
+    def cached_answers():
+        with Session(engine) as db:
+            return get_answer_key(db, test_id).answers
+
+    updated = client.put(f"/teacher/questions/{question_ids[0]}", json={"correct_answer": "E"}, headers=headers)
+    assert updated.status_code == 200
+    assert cached_answers()[question_ids[0]][0] == "E"
+
+    assert client.delete(f"/teacher/questions/{question_ids[1]}", headers=headers).status_code == 200
+    assert set(cached_answers()) == {question_ids[0], question_ids[2]}
+
+    created = client.post("/teacher/questions/", json={
+        "test_id": test_id, "category_id": category_id, "text": "New question",
+        "options": OPTIONS, "correct_answer": "B",
+    }, headers=headers)
+    assert created.status_code == 200
+    assert cached_answers()[created.json()["id"]][0] == "B"
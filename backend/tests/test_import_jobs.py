@@ -0,0 +1,42 @@
+import time
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from database import engine
+import models
+from services.write_queue import write_queue
+from tests.helpers import auth_headers, seed_test
+
+CSV = (
+    "category,text,options,correct_answer,image_url,table_data\n"
+    "Genetics,Question 1,A;B;C,A,,\n"
+    "New category,Question 2,A;B;C,B,,\n"
+    ",Question 3,A;B;C,C,,\n"
+    "Genetics,Question 4,A;B;C,C,,\n"
+)
+
+
+def test_import_job_runs_in_background(client):
+    with Session(engine) as db:
+        test = seed_test(db, 0, title="Import job")
+        test_id = test.id
+        headers = auth_headers(test.created_by, db)
+    writes = write_queue.stats()["jobs"] if write_queue is not None else 0
+
+    submitted = client.post(
+        f"/teacher/tests/{test_id}/import", files={"file": ("questions.csv", CSV, "text/csv")}, headers=headers
+    )
+    assert submitted.status_code == 202
+    job_url = f"/teacher/tests/{test_id}/import/{submitted.json()['id']}"
+    deadline = time.monotonic() + 10
+    while (job := client.get(job_url, headers=headers).json())["finished_at"] is None:
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+    assert job["status"] == "completed"
+    assert (job["rows_processed"], job["rows_imported"], job["rows_failed"]) == (4, 3, 1)
+    assert job["errors"] == [{"row": 3, "message": "missing category"}]
+    with Session(engine) as db:
+        assert db.scalar(select(func.count()).where(models.Question.test_id == test_id)) == 3
+    if write_queue is not None:
+        # Job created, started, progress and finish went through the writer queue
+        assert write_queue.stats()["jobs"] >= writes + 3
@@ -0,0 +1,34 @@
+import os
+import shutil
+from sqlalchemy import create_engine, inspect, select, text
+from sqlalchemy.orm import Session
+from migrations import bootstrap, bootstrap_steps
+import models
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_bootstrap_upgrades_pre_series_database(tmp_path):
+    # A copy of the bundled database, which predates the analytics tables and
+    # schema_migrations; the original must stay untouched
+    path = tmp_path / "biology_test.db"
+    shutil.copy(os.path.join(BACKEND_DIR, "biology_test.db"), path)
+    bind = create_engine(f"sqlite:///{path}")
+    with bind.begin() as conn:
+        # A result that cannot be counted must not stop the upgrade
+        conn.execute(text(
+            "INSERT INTO test_results (user_id, test_id, score, category_breakdown) "
+            "SELECT id, 2, 'n/a', NULL FROM users WHERE id NOT IN (SELECT user_id FROM test_results) LIMIT 1"
+        ))
+        results = conn.scalar(text("SELECT COUNT(*) FROM test_results"))
+
+    ran = bootstrap(bind)
+
+    assert ran == [name for name, _ in bootstrap_steps()]
+    assert bootstrap(bind) == []
+    indexes = {index["name"] for index in inspect(bind).get_indexes("test_results")}
+    assert {"uq_test_results_user_test", "ix_test_results_test_score"} <= indexes
+    with Session(bind) as db:
+        assert set(db.scalars(select(models.SchemaMigration.name))) == set(ran)
+        assert db.get(models.TestAnalytics, 2).submissions == results - 1
+    bind.dispose()
@@ -0,0 +1,11 @@
+import pytest
+from database import engine
+from tests.helpers import HOT_QUERIES, query_plan, is_full_scan
+
+
+@pytest.mark.parametrize("name", list(HOT_QUERIES))
+def test_hot_query_uses_index(schema, name):
+    with engine.connect() as conn:
+        plan = query_plan(conn, HOT_QUERIES[name])
+    assert not any(is_full_scan(detail) for detail in plan), plan
+    assert any("USING" in detail and "INDEX" in detail for detail in plan), plan
@@ -0,0 +1,25 @@
+import json
+import pandas as pd
+from services.question_excel import options_json, prepare_question_records, split_options
+from services.question_import import normalize_record
+
+ROW = {"category": "Genetics", "text": "Вопрос", "options": "A;B;C", "correct_answer": "D"}
+
+
+def test_only_excel_rows_need_correct_answer_among_options():
+    # CSV and JSON rows are stored as given, like questions created through the API
+    assert normalize_record(ROW)["correct_answer"] == "D"
+
+    sheet = pd.DataFrame([ROW, {**ROW, "correct_answer": "B"}], index=[1, 2])
+    sheet["image_url"] = sheet["table_data"] = None
+    records, errors = prepare_question_records(sheet)
+    assert errors == [(1, "correct_answer is not one of the options")]
+    assert [(row_number, record["correct_answer"]) for row_number, record in records] == [(2, "B")]
+
+
+def test_options_json_matches_json_dumps():
+    options = pd.Series(['A; B;;C ', 'say "hi"; back\\slash;\tline\nbreak', " ; ", None], dtype=str)
+    expected = split_options(options).map(
+        lambda value: json.dumps(value, ensure_ascii=False) if isinstance(value, list) else "[]"
+    )
+    assert options_json(options).tolist() == expected.tolist()
@@ -0,0 +1,38 @@
+from sqlalchemy.orm import Session
+from database import engine
+from services.question_payloads import DONT_KNOW_OPTION
+from tests.helpers import auth_headers, seed_test, seed_students
+
+
+def test_questions_etag_and_not_modified(client):
+    with Session(engine) as db:
+        test = seed_test(db, 3, title="Student questions")
+        test_id, question_id = test.id, test.questions[0].id
+        teacher_headers = auth_headers(test.created_by, db)
+        headers = auth_headers(seed_students(db, 1, prefix=f"questions_{test_id}")[0], db)
+    url = f"/student/test/{test_id}/questions"
+
+    first = client.get(url, headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    questions = first.json()
+    assert questions[0]["id"] == question_id
+    assert all(question["correct_answer"] is None for question in questions)
+    assert all(question["options"].count(DONT_KNOW_OPTION) == 1 for question in questions)
+
+    for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        cached = client.get(url, headers={**headers, "If-None-Match": if_none_match})
+        assert cached.status_code == 304
+        assert cached.headers["ETag"] == etag
+        assert cached.content == b""
+    assert client.get(url, headers={**headers, "If-None-Match": '"other"'}).status_code == 200
+
+    # A teacher's change gives the list a new ETag
+    updated = client.put(f"/teacher/questions/{question_id}", json={"text": "Changed"}, headers=teacher_headers)
+    assert updated.status_code == 200
+    changed = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()[0]["text"] == "Changed"
+
+    assert client.get("/student/test/999999/questions", headers=headers).status_code == 404
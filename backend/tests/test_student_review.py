@@ -0,0 +1,21 @@
+import pytest
+from sqlalchemy.orm import Session
+from database import engine
+from schemas.student_review import StudentResultsResponse, StudentTestReviewResponse
+from services.student_review import load_student_results, load_student_test_review
+from tests.helpers import EXPECTED_REVIEW_QUERIES, QueryCounter, seed_history
+
+
+@pytest.mark.parametrize("tests_taken", [1, 10])
+def test_review_query_count_does_not_grow(schema, tests_taken):
+    with Session(engine) as db:
+        user_id, test_ids = seed_history(db, tests_taken)
+
+    with Session(engine) as db, QueryCounter() as counter:
+        results = StudentResultsResponse.model_validate(load_student_results(db, user_id)).model_dump()
+    assert len(results["results"]) == tests_taken
+    assert counter.count == EXPECTED_REVIEW_QUERIES["results"]
+
+    with Session(engine) as db, QueryCounter() as counter:
+        StudentTestReviewResponse.model_validate(load_student_test_review(db, user_id, test_ids[-1])).model_dump()
+    assert counter.count == EXPECTED_REVIEW_QUERIES["test review"]
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { studentAPI } from '../../services/api';
 
@@ -7,6 +7,11 @@ const TakeTest = () => {
   const navigate = useNavigate();
   const [questions, setQuestions] = useState([]);
   const [answers, setAnswers] = useState({});
+  const [attemptId, setAttemptId] = useState(null);
+  // Per-question change counters sent with every autosave
+  const revisions = useRef({});
+  // Questions whose latest answer is not confirmed as saved yet
+  const unsaved = useRef(new Set());
   const [loading, setLoading] = useState(true);
   const [submitting, setSubmitting] = useState(false);
   const [error, setError] = useState('');
@@ -17,12 +22,18 @@ const TakeTest = () => {
 
   const fetchQuestions = async () => {
     try {
-      const response = await studentAPI.getTestQuestions(testId);
+      const [response, attemptResponse] = await Promise.all([
+        studentAPI.getTestQuestions(testId),
+        studentAPI.startAttempt(testId),
+      ]);
       setQuestions(response.data);
-      // Initialize answers object
+      setAttemptId(attemptResponse.data.id);
+      // Initialize answers object, restoring answers saved before a reload
+      const savedAnswers = attemptResponse.data.answers;
       const initialAnswers = {};
       response.data.forEach(question => {
-        initialAnswers[question.id] = '';
+        initialAnswers[question.id] = savedAnswers[question.id] || '';
+        revisions.current[question.id] = attemptResponse.data.revisions[question.id] || 0;
       });
       setAnswers(initialAnswers);
     } catch (err) {
@@ -38,6 +49,19 @@ const TakeTest = () => {
       ...prev,
       [questionId]: answer
     }));
+
+    saveAnswer(questionId, answer).catch(err => console.error(err));
+  };
+
+  // Autosave one answer on the server; unconfirmed saves are repeated on submit
+  const saveAnswer = async (questionId, answer) => {
+    const revision = (revisions.current[questionId] || 0) + 1;
+    revisions.current[questionId] = revision;
+    unsaved.current.add(questionId);
+    await studentAPI.saveAnswer(attemptId, questionId, answer, revision);
+    if (revisions.current[questionId] === revision) {
+      unsaved.current.delete(questionId);
+    }
   };
 
   const handleSubmit = async (e) => {
@@ -54,15 +78,11 @@ const TakeTest = () => {
     setError('');
 
     try {
-      const submission = {
-        test_id: parseInt(testId),
-        answers: questions.map(question => ({
-          question_id: question.id,
-          answer: answers[question.id]
-        }))
-      };
-
-      await studentAPI.submitTest(submission);
+      // Make sure the latest answers are stored before grading them
+      await Promise.all(
+        [...unsaved.current].map(questionId => saveAnswer(questionId, answers[questionId]))
+      );
+      await studentAPI.finalizeAttempt(attemptId);
       navigate(`/result/${testId}`);
     } catch (err) {
       setError(err.response?.data?.detail || 'Не удалось отправить экзамен');
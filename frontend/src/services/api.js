@@ -82,6 +82,10 @@ export const studentAPI = {
   getAvailableTests: () => api.get('/student/available-tests/'),
   getTestQuestions: (testId) => api.get(`/student/test/${testId}/questions`),
   submitTest: (submission) => api.post('/student/submit-test/', submission),
+  startAttempt: (testId) => api.post(`/student/tests/${testId}/attempts`),
+  saveAnswer: (attemptId, questionId, answer, revision) =>
+    api.patch(`/student/attempts/${attemptId}/answers/${questionId}`, { answer, revision }),
+  finalizeAttempt: (attemptId) => api.post(`/student/attempts/${attemptId}/finalize`),
   getTestResult: (testId) => api.get(`/student/results/${testId}`),
   getDetailedResult: (testId) => api.get(`/student/results/${testId}/detailed`),
   getMyResults: () => api.get('/student/my-results/'),